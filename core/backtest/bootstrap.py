@@ -0,0 +1,273 @@
+"""
+bootstrap.py
+
+Bootstrap por bloques (stationary de Politis-Romano o circular de bloque
+fijo) para series de retornos, y estadísticos de Sharpe corregidos por
+múltiples pruebas.
+
+Las réplicas no se generan una por una: cada chunk sortea de una vez los
+bloques (largo geométrico en stationary, fijo en circular) de todas sus
+réplicas, sin loops de Python por réplica ni por bloque. Las métricas que
+no dependen del orden (media, varianza, Sharpe, métricas de
+clasificación) salen de la matriz de conteos (cuántas veces entra cada
+observación en cada réplica) multiplicada por los vectores de la serie,
+un producto de matrices con BLAS; los conteos se arman directo desde los
+bloques. Solo las métricas de camino (max drawdown) piden la matriz de
+índices B x n. Los chunks se reparten en un pool de
+procesos y cada uno usa su propia semilla derivada (SeedSequence.spawn):
+el resultado no depende del número de workers.
+
+Deflated Sharpe (Bailey y López de Prado): probabilidad de que el Sharpe
+observado supere al máximo esperado entre `n_trials` pruebas sin skill,
+corrigiendo por asimetría y curtosis de los retornos.
+"""
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from statistics import NormalDist
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+EULER_GAMMA = 0.5772156649015329
+METHODS = ("stationary", "circular")
+_NORMAL = NormalDist()
+
+
+def default_block_length(n: int) -> int:
+    """Regla n^(1/3): bloques más largos cuanto más larga la serie."""
+    return max(1, int(round(n ** (1 / 3))))
+
+
+def bootstrap_indices(n: int, n_boot: int, block_length: float, method: str = "stationary",
+                      rng: np.random.Generator = None) -> np.ndarray:
+    """
+    Matriz (n_boot, n) de índices remuestreados por bloques circulares. En
+    cada posición arranca un bloque nuevo con probabilidad 1 / block_length
+    (stationary) o cada block_length posiciones (circular); dentro del bloque
+    los índices avanzan de a uno, así que idx = inicio del bloque + desplazamiento.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Método de bootstrap desconocido: {method} (opciones: {METHODS})")
+    rng = rng or np.random.default_rng()
+    dtype = np.int32 if n < 2**30 else np.int64          # la mitad de memoria y ancho de banda
+    cols = np.arange(n, dtype=dtype)
+    if method == "stationary":
+        new_block = rng.random((n_boot, n)) < 1.0 / block_length
+    else:
+        new_block = np.zeros((n_boot, n), dtype=bool)
+        new_block[:, ::max(1, int(block_length))] = True
+    new_block[:, 0] = True
+
+    block_id = np.cumsum(new_block, axis=1, dtype=dtype)             # bloque de cada posición (desde 1)
+    block_id -= 1
+    block_col = np.maximum.accumulate(np.where(new_block, cols, dtype(0)), axis=1)  # columna donde arrancó
+    starts = rng.integers(0, n, size=(n_boot, int(block_id[:, -1].max()) + 1), dtype=dtype)
+    idx = np.take_along_axis(starts, block_id, axis=1)
+    idx += cols
+    idx -= block_col
+    idx[idx >= n] -= n                                              # inicio + desplazamiento < 2n
+    return idx
+
+
+def bootstrap_counts(n: int, n_boot: int, block_length: float, method: str = "stationary",
+                     rng: np.random.Generator = None) -> np.ndarray:
+    """
+    Conteos (n_boot, n) de las mismas réplicas que bootstrap_indices sin
+    armar los índices: solo se sortean inicio y largo de cada bloque (~n /
+    block_length por réplica) y cada bloque suma +1 en su inicio y -1 al
+    final en un arreglo de diferencias (partido en dos si da la vuelta);
+    un cumsum por fila da los conteos.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Método de bootstrap desconocido: {method} (opciones: {METHODS})")
+    rng = rng or np.random.default_rng()
+    n_blocks = int(np.ceil(n / block_length * 1.5)) + 8
+    while True:
+        if method == "stationary":
+            lengths = rng.geometric(1.0 / block_length, size=(n_boot, n_blocks))
+        else:
+            lengths = np.full((n_boot, n_blocks), max(1, int(block_length)))
+        ends = np.cumsum(lengths, axis=1)
+        if ends[:, -1].min() >= n:
+            break
+        n_blocks *= 2                                   # raro: alguna réplica no llegó a n filas
+    # Se recorta cada réplica a n filas: el bloque que cruza n queda truncado, los siguientes vacíos
+    np.minimum(ends, n, out=ends)
+    lengths = np.diff(ends, axis=1, prepend=0)
+    starts = rng.integers(0, n, size=(n_boot, n_blocks))
+    stops = starts + lengths
+    wrap = stops > n
+
+    # +1 en el inicio, -1 en el fin; si da la vuelta, además +1 en 0 y -1 en stop - n.
+    # Los -1 en la posición n no hacen falta (quedan fuera de la fila).
+    offset = (np.arange(n_boot) * n)[:, None]
+    rows = np.nonzero(wrap)[0]
+    inside = stops < n
+    positions = np.concatenate([(starts + offset).ravel(), (stops + offset)[inside],
+                                rows * n, rows * n + (stops[wrap] - n)])
+    weights = np.concatenate([np.ones(starts.size), -np.ones(int(inside.sum())),
+                              np.ones(len(rows)), -np.ones(len(rows))])
+    counts = np.bincount(positions, weights=weights, minlength=n_boot * n).reshape(n_boot, n)
+    np.cumsum(counts, axis=1, out=counts)
+    return counts
+
+
+def index_counts(idx: np.ndarray, n: int) -> np.ndarray:
+    """Conteos (B, n): veces que entra cada observación en cada réplica (float64, listo para BLAS)."""
+    n_boot = idx.shape[0]
+    flat = idx + (np.arange(n_boot) * n)[:, None]
+    return np.bincount(flat.ravel(), minlength=n_boot * n).reshape(n_boot, n).astype(np.float64)
+
+
+def chunk_replicates(n: int, memory_budget_mb: int = 256) -> int:
+    """Réplicas por chunk: ~6 matrices de 8 bytes por elemento (máscara, índices, conteos) en el presupuesto."""
+    return max(1, int(memory_budget_mb * 2**20 // (6 * 8 * max(n, 1))))
+
+
+def _run_chunk(fn: Callable, n: int, n_boot: int, block_length: float, method: str, need_order: bool,
+               seed: np.random.SeedSequence) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    if not need_order:
+        return fn(bootstrap_counts(n, n_boot, block_length, method, rng), None)
+    idx = bootstrap_indices(n, n_boot, block_length, method, rng)
+    return fn(index_counts(idx, n), idx)
+
+
+def bootstrap_map(fn: Callable[[np.ndarray, np.ndarray], Dict[str, np.ndarray]], n: int, n_boot: int = 2000,
+                  block_length: float = None, method: str = "stationary", seed: int = 0,
+                  memory_budget_mb: int = 256, n_workers: int = None,
+                  need_order: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Corre `fn(counts, idx)` sobre chunks de réplicas y concatena sus salidas
+    ({nombre: array de largo B_chunk}). Solo con `need_order` se arma la
+    matriz de índices (si no, idx es None y los conteos salen directo de
+    los bloques). `fn` tiene que ser picklable (función de módulo o
+    partial) si n_workers > 1.
+    """
+    block_length = block_length or default_block_length(n)
+    size = chunk_replicates(n, memory_budget_mb)
+    sizes = [min(size, n_boot - start) for start in range(0, n_boot, size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    n_workers = min(n_workers or os.cpu_count() or 1, len(sizes))
+    tasks = [partial(_run_chunk, fn, n, b, block_length, method, need_order, s) for b, s in zip(sizes, seeds)]
+
+    if n_workers == 1:
+        parts = [task() for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            parts = list(pool.map(_call, tasks))
+    return {name: np.concatenate([p[name] for p in parts]) for name in parts[0]}
+
+
+def _call(task: Callable):
+    return task()
+
+
+# --- Estadísticos sobre réplicas ---------------------------------------------
+def moments_from_counts(counts: np.ndarray, values: np.ndarray):
+    """Media y desvío (ddof=0) de cada columna de `values` (n, k) en cada réplica: (B, k) y (B, k)."""
+    n = counts.shape[1]
+    values = values.reshape(n, -1)
+    mean = counts @ values / n
+    var = counts @ (values * values) / n - mean * mean
+    return mean, np.sqrt(np.maximum(var, 0.0))
+
+
+def sharpe_replicates(returns: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Sharpe por período de cada columna de `returns` (n, k) en cada réplica: (B, k)."""
+    mean, std = moments_from_counts(counts, returns)
+    return np.divide(mean, std, out=np.zeros_like(mean), where=std > 0)
+
+
+def max_drawdown_replicates(returns: np.ndarray, idx: np.ndarray) -> np.ndarray:
+    """Max drawdown de la serie remuestreada (depende del orden: se arma la matriz de retornos)."""
+    path = np.log1p(returns)[idx]
+    np.cumsum(path, axis=1, out=path)
+    return np.expm1((path - np.maximum.accumulate(path, axis=1)).min(axis=1))
+
+
+def _strategy_chunk(returns: np.ndarray, drawdown: bool, counts: np.ndarray, idx: np.ndarray) -> Dict[str, np.ndarray]:
+    sharpe = sharpe_replicates(returns, counts)
+    out = {f"sharpe_{j}": sharpe[:, j] for j in range(returns.shape[1])}
+    if drawdown:
+        for j in range(returns.shape[1]):
+            out[f"max_drawdown_{j}"] = max_drawdown_replicates(returns[:, j], idx)
+    return out
+
+
+def percentile_interval(replicates: np.ndarray, alpha: float = 0.05) -> List[float]:
+    low, high = np.nanpercentile(replicates, [100 * alpha / 2, 100 * (1 - alpha / 2)])
+    return [float(low), float(high)]
+
+
+# --- Sharpe probabilístico / deflactado --------------------------------------
+def probabilistic_sharpe(sharpe: float, n: int, skew: float, kurtosis: float, benchmark: float = 0.0) -> float:
+    """P(Sharpe real > benchmark) con Sharpe por período, corrigiendo por asimetría y curtosis (no exceso)."""
+    denom = 1.0 - skew * sharpe + (kurtosis - 1.0) / 4.0 * sharpe ** 2
+    if n < 2 or denom <= 0:
+        return float("nan")
+    return _NORMAL.cdf((sharpe - benchmark) * math.sqrt(n - 1) / math.sqrt(denom))
+
+
+def expected_max_sharpe(n_trials: int, sharpe_variance: float) -> float:
+    """Máximo Sharpe esperado entre n_trials pruebas independientes sin skill."""
+    if n_trials <= 1 or sharpe_variance <= 0:
+        return 0.0
+    return math.sqrt(sharpe_variance) * ((1 - EULER_GAMMA) * _NORMAL.inv_cdf(1 - 1 / n_trials)
+                                         + EULER_GAMMA * _NORMAL.inv_cdf(1 - 1 / (n_trials * math.e)))
+
+
+def sharpe_stats(returns: np.ndarray, trial_sharpes: Sequence[float] = None, n_trials: int = None) -> dict:
+    """
+    Sharpe por período, asimetría, curtosis, PSR contra 0 y deflated Sharpe
+    contra el máximo esperado de `n_trials` pruebas (varianza tomada de
+    `trial_sharpes`, los Sharpe por período de todas las variantes probadas).
+    """
+    r = np.asarray(returns, dtype=np.float64)
+    n, mean, std = len(r), r.mean(), r.std()
+    sharpe = float(mean / std) if std > 0 else 0.0
+    z = (r - mean) / std if std > 0 else np.zeros_like(r)
+    skew, kurtosis = float((z ** 3).mean()), float((z ** 4).mean())
+    trials = np.asarray(trial_sharpes if trial_sharpes is not None else [sharpe], dtype=np.float64)
+    n_trials = n_trials or len(trials)
+    benchmark = expected_max_sharpe(n_trials, float(np.nanvar(trials)))
+    return {
+        "sharpe": sharpe,
+        "skew": skew,
+        "kurtosis": kurtosis,
+        "psr": probabilistic_sharpe(sharpe, n, skew, kurtosis),
+        "n_trials": int(n_trials),
+        "expected_max_sharpe": benchmark,
+        "deflated_sharpe": probabilistic_sharpe(sharpe, n, skew, kurtosis, benchmark),
+    }
+
+
+def strategy_significance(returns: np.ndarray, names: Sequence[str], periods_per_year: float = 1.0,
+                          trial_sharpes: Sequence[float] = None, n_trials: int = None, n_boot: int = 2000,
+                          block_length: float = None, method: str = "stationary", alpha: float = 0.05,
+                          seed: int = 0, memory_budget_mb: int = 256, n_workers: int = None,
+                          drawdown: bool = True) -> Dict[str, dict]:
+    """
+    Para cada columna de `returns` (n, k): Sharpe anualizado con su IC
+    bootstrap, PSR, deflated Sharpe y, con `drawdown`, el IC del max
+    drawdown (depende del orden: es la parte cara, una matriz B x n por
+    serie). Todas las columnas usan las mismas réplicas.
+    """
+    returns = np.asarray(returns, dtype=np.float64).reshape(len(returns), -1)
+    block_length = block_length or default_block_length(len(returns))
+    reps = bootstrap_map(partial(_strategy_chunk, returns, drawdown), len(returns), n_boot, block_length, method,
+                         seed, memory_budget_mb, n_workers, need_order=drawdown)
+    scale = math.sqrt(periods_per_year)
+    out = {}
+    for j, name in enumerate(names):
+        stats = sharpe_stats(returns[:, j], trial_sharpes, n_trials)
+        out[name] = {
+            **stats,
+            "sharpe_annual": stats["sharpe"] * scale,
+            "sharpe_annual_ci": [v * scale for v in percentile_interval(reps[f"sharpe_{j}"], alpha)],
+        }
+        if drawdown:
+            out[name]["max_drawdown_ci"] = percentile_interval(reps[f"max_drawdown_{j}"], alpha)
+    return out
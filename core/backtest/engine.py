@@ -0,0 +1,190 @@
+"""
+engine.py
+
+Backtester vectorizado en NumPy sobre una matriz de señales.
+
+Cada columna de `positions` (T barras x P sets de parámetros) es la
+posición objetivo de una variante de la estrategia, decidida al cierre de
+la barra t y mantenida durante t + 1: el PnL de la barra t es
+pos[t - 1] * r[t], y cada cambio de posición paga fee + slippage sobre el
+nocional operado. Todas las variantes se simulan juntas, por bloques de
+columnas (memoria acotada), sin loops de Python por barra ni por set.
+
+Métricas por columna: retorno total, Sharpe anualizado, max drawdown,
+turnover anualizado, número de operaciones y exposición media.
+"""
+from dataclasses import dataclass
+from typing import Callable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from core.data.timeframes import interval_to_ms
+
+YEAR_MS = 365 * 24 * 3600 * 1000
+METRIC_COLUMNS = ["total_return", "sharpe", "max_drawdown", "turnover", "trades", "exposure"]
+
+
+@dataclass
+class BacktestConfig:
+    fee_bps: float = 10.0             # comisión por unidad de nocional operado
+    slippage_bps: float = 5.0         # deslizamiento por unidad de nocional operado
+    max_position: float = 1.0         # límite de |posición| (fracción del capital)
+    long_only: bool = False           # posiciones < 0 se recortan a 0
+    interval: str = "5m"              # para anualizar Sharpe y turnover
+    memory_budget_mb: int = 256       # define cuántas columnas se simulan por bloque
+
+    @property
+    def cost(self) -> float:
+        return (self.fee_bps + self.slippage_bps) / 1e4
+
+    @property
+    def periods_per_year(self) -> float:
+        return YEAR_MS / interval_to_ms(self.interval)
+
+
+@dataclass
+class BacktestResult:
+    metrics: pd.DataFrame                  # una fila por set de parámetros (METRIC_COLUMNS)
+    equity: Optional[np.ndarray] = None    # (T, P) si se pidió keep_equity
+
+
+def bar_returns(close: np.ndarray) -> np.ndarray:
+    """Retorno simple de cada barra contra la anterior; 0 en la primera."""
+    close = np.asarray(close, dtype=np.float64)
+    r = np.zeros_like(close)
+    np.divide(close[1:], close[:-1], out=r[1:])
+    r[1:] -= 1.0
+    return r
+
+
+def threshold_positions(score: np.ndarray, upper: np.ndarray, lower: np.ndarray = None) -> np.ndarray:
+    """
+    Matriz (T, P) de posiciones por umbrales: +1 si score > upper[p], -1 si
+    score < lower[p] (si se pasa lower), 0 en otro caso. Un solo broadcast;
+    se arma como (P, T) y se devuelve transpuesta (orden Fortran, ver
+    simulate_block).
+    """
+    score = np.asarray(score, dtype=np.float64)[None, :]
+    pos = (np.asarray(upper, dtype=np.float64)[:, None] < score).astype(np.float64)
+    if lower is not None:
+        pos -= np.asarray(lower, dtype=np.float64)[:, None] > score
+    return pos.T
+
+
+def block_columns(n_rows: int, config: BacktestConfig) -> int:
+    """Columnas por bloque: ~4 matrices float64 de T x bloque dentro del presupuesto."""
+    return max(1, int(config.memory_budget_mb * 2**20 // (4 * 8 * max(n_rows, 1))))
+
+
+def simulate_block(returns: np.ndarray, positions: np.ndarray, config: BacktestConfig,
+                   equity_out: np.ndarray = None) -> dict:
+    """
+    Simula un bloque (T, C) de posiciones sobre `returns` (T,). Devuelve las
+    métricas de cada columna; si se pasa `equity_out` (T, C) deja ahí la
+    curva de equity (capital inicial 1).
+
+    Todo el bloque se trabaja en orden Fortran: cada columna (un set) queda
+    contigua y los cumsum / maximum.accumulate sobre el eje del tiempo
+    recorren memoria contigua (~5x más rápidos que sobre un bloque en orden C).
+    """
+    lo = 0.0 if config.long_only else -config.max_position
+    pos = np.array(positions, dtype=np.float64, order="F")
+    np.clip(pos, lo, config.max_position, out=pos)
+    pos[np.isnan(pos)] = 0.0                    # sin señal = sin posición
+
+    # Operado en cada barra (se arranca flat)
+    trade = np.empty_like(pos)
+    trade[0] = pos[0]
+    np.subtract(pos[1:], pos[:-1], out=trade[1:])
+    np.abs(trade, out=trade)
+    turnover = trade.sum(axis=0)
+    trades = np.count_nonzero(trade, axis=0)
+    net = np.empty_like(pos)
+    exposure = np.abs(pos, out=net).mean(axis=0)
+
+    # Retorno neto: posición de la barra anterior x retorno - costos de operar
+    net[0] = 0.0
+    np.multiply(pos[:-1], returns[1:, None], out=net[1:])
+    trade *= config.cost
+    net -= trade
+    peak = trade                                # se reutiliza el buffer
+    del pos
+
+    n_rows = len(returns)
+    mean = net.sum(axis=0) / n_rows
+    # varianza como E[x²] - E[x]² con einsum: una pasada, sin temporales T x C
+    std = np.sqrt(np.maximum(np.einsum("ij,ij->j", net, net) / n_rows - mean ** 2, 0.0))
+    sharpe = np.divide(mean, std, out=np.zeros_like(mean), where=std > 0) * np.sqrt(config.periods_per_year)
+
+    # Equity en log: cumsum(log1p) es más estable que cumprod en series largas
+    np.log1p(net, out=net)
+    np.cumsum(net, axis=0, out=net)
+    np.maximum.accumulate(net, axis=0, out=peak)
+    np.subtract(net, peak, out=peak)
+    max_drawdown = np.expm1(peak.min(axis=0))
+    total_return = np.expm1(net[-1])
+    if equity_out is not None:
+        np.exp(net, out=equity_out)
+
+    years = n_rows / config.periods_per_year
+    return {
+        "total_return": total_return,
+        "sharpe": sharpe,
+        "max_drawdown": max_drawdown,
+        "turnover": turnover / years if years > 0 else turnover,
+        "trades": trades,
+        "exposure": exposure,
+    }
+
+
+def run_backtest(close: np.ndarray, positions: Union[np.ndarray, Callable[[int, int], np.ndarray]],
+                 config: BacktestConfig = None, n_params: int = None, keep_equity: bool = False,
+                 index=None) -> BacktestResult:
+    """
+    Backtest de P variantes. `positions` es la matriz (T, P) o una función
+    (inicio, fin) -> bloque (T, fin - inicio), para no materializar la
+    matriz completa (p. ej. grillas de umbrales); en ese caso hace falta
+    `n_params`. `index` etiqueta las filas de métricas (uno por set).
+    """
+    config = config or BacktestConfig()
+    returns = bar_returns(close)
+    n_rows = len(returns)
+    if callable(positions):
+        if n_params is None:
+            raise ValueError("n_params es obligatorio si positions es una función")
+        get_block = positions
+    else:
+        positions = np.asarray(positions)
+        if positions.ndim == 1:
+            positions = positions[:, None]
+        if positions.shape[0] != n_rows:
+            raise ValueError(f"positions tiene {positions.shape[0]} filas y close {n_rows}")
+        n_params = positions.shape[1]
+        get_block = lambda start, end: positions[:, start:end]
+
+    metrics = {name: np.empty(n_params) for name in METRIC_COLUMNS}
+    equity = np.empty((n_rows, n_params)) if keep_equity else None
+    step = block_columns(n_rows, config)
+    for start in range(0, n_params, step):
+        end = min(start + step, n_params)
+        out = simulate_block(returns, get_block(start, end), config,
+                             equity_out=None if equity is None else equity[:, start:end])
+        for name, values in out.items():
+            metrics[name][start:end] = values
+
+    table = pd.DataFrame(metrics, index=index)
+    table["trades"] = table["trades"].astype(np.int64)
+    return BacktestResult(table, equity)
+
+
+def run_threshold_grid(close: np.ndarray, score: np.ndarray, upper: np.ndarray, lower: np.ndarray = None,
+                       config: BacktestConfig = None, keep_equity: bool = False) -> BacktestResult:
+    """Grilla de umbrales sobre un score: las posiciones de cada bloque se generan al vuelo."""
+    upper = np.asarray(upper, dtype=np.float64)
+    lower = None if lower is None else np.asarray(lower, dtype=np.float64)
+    index = pd.MultiIndex.from_arrays([upper, lower], names=["upper", "lower"]) if lower is not None \
+        else pd.Index(upper, name="upper")
+    block = lambda start, end: threshold_positions(score, upper[start:end],
+                                                   None if lower is None else lower[start:end])
+    return run_backtest(close, block, config, n_params=len(upper), keep_equity=keep_equity, index=index)
@@ -0,0 +1,134 @@
+"""
+run_backtest.py
+
+Backtest de una grilla de umbrales sobre una columna de la matriz de
+features que generó run_feature_pipeline.py (score > upper → largo,
+score < lower → corto). Todas las combinaciones (upper, lower) se simulan
+en una sola pasada vectorizada (ver engine.py).
+
+Escribe en output_path/<symbol>_<interval>/:
+  - backtest_grid.csv     (métricas de cada combinación)
+  - backtest_summary.json (mejores combinaciones con ICs bootstrap y
+                            deflated Sharpe, costos y tiempos)
+
+    python core/backtest/run_backtest.py config/experiment_test.yaml
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir)))
+
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from core.backtest.bootstrap import strategy_significance
+from core.backtest.engine import BacktestConfig, run_threshold_grid
+from core.features.shared.matrix_store import FeatureMatrixStore
+from utils.config_loader import load_yaml
+from utils.logger import log
+
+
+def threshold_grid(bt_cfg: dict):
+    """Producto cartesiano de los umbrales upper x lower del YAML ({start, stop, num})."""
+    upper = np.linspace(**bt_cfg["upper"])
+    if not bt_cfg.get("lower"):
+        return upper, None
+    lower = np.linspace(**bt_cfg["lower"])
+    uu, ll = np.meshgrid(upper, lower, indexing="ij")
+    return uu.ravel(), ll.ravel()
+
+
+def significance_of_top(df, signal: str, top, two_sided: bool, grid_sharpes: np.ndarray,
+                        engine_cfg: BacktestConfig, sig_cfg: dict):
+    """
+    Re-simula las mejores combinaciones guardando la equity y corre el
+    bootstrap por bloques sobre sus retornos netos. El deflated Sharpe
+    compara contra el máximo esperado entre TODAS las combinaciones de la
+    grilla (cada una es una prueba).
+    """
+    if not sig_cfg.get("enabled", True) or top.empty:
+        return None
+    start = time.perf_counter()
+    result = run_threshold_grid(df["close"].to_numpy(), df[signal].to_numpy(), top["upper"].to_numpy(),
+                                top["lower"].to_numpy() if two_sided else None, engine_cfg, keep_equity=True)
+    equity = result.equity
+    returns = np.empty_like(equity)
+    returns[0] = equity[0] - 1.0
+    returns[1:] = equity[1:] / equity[:-1] - 1.0
+    names = [f"{u:.4g}/{l:.4g}" if two_sided else f"{u:.4g}"
+             for u, l in zip(top["upper"], top["lower"] if two_sided else top["upper"])]
+    ppy = engine_cfg.periods_per_year
+    stats = strategy_significance(
+        returns, names, ppy, trial_sharpes=grid_sharpes / np.sqrt(ppy), n_trials=len(grid_sharpes),
+        n_boot=sig_cfg.get("n_boot", 2000), block_length=sig_cfg.get("block_length"),
+        method=sig_cfg.get("method", "stationary"), alpha=sig_cfg.get("alpha", 0.05),
+        seed=sig_cfg.get("seed", 0), memory_budget_mb=sig_cfg.get("memory_budget_mb", 256),
+        n_workers=sig_cfg.get("n_workers"), drawdown=sig_cfg.get("drawdown", True),
+    )
+    elapsed = time.perf_counter() - start
+    best = stats[names[0]]
+    log.info(f"    📊 Bootstrap ({sig_cfg.get('n_boot', 2000)} réplicas, {elapsed:.1f}s): Sharpe {names[0]} "
+             f"IC [{best['sharpe_annual_ci'][0]:.2f}, {best['sharpe_annual_ci'][1]:.2f}], "
+             f"deflated Sharpe {best['deflated_sharpe']:.3f} ({best['n_trials']} pruebas)")
+    return {"elapsed_sec": elapsed, "sets": stats}
+
+
+def main(config_path: str):
+    config = load_yaml(config_path)
+    md = config["market_data"]
+    bt_cfg = config["backtest"]
+    output_dir = Path(config["output_path"]) / f"{md['symbol']}_{md['interval']}"
+    store = FeatureMatrixStore(output_dir / "features")
+
+    signal = bt_cfg["signal"]
+    df = store.read(columns=["close", signal]).dropna()
+    upper, lower = threshold_grid(bt_cfg)
+    engine_cfg = BacktestConfig(
+        fee_bps=bt_cfg.get("fee_bps", 10.0),
+        slippage_bps=bt_cfg.get("slippage_bps", 5.0),
+        max_position=bt_cfg.get("max_position", 1.0),
+        long_only=bt_cfg.get("long_only", False),
+        interval=md["interval"],
+        memory_budget_mb=bt_cfg.get("memory_budget_mb", 256),
+    )
+    log.info(f"[cyan]📈 Backtest de {signal}: {len(upper)} combinaciones de umbrales x {len(df)} barras[/cyan]")
+
+    start = time.perf_counter()
+    result = run_threshold_grid(df["close"].to_numpy(), df[signal].to_numpy(), upper, lower, engine_cfg)
+    elapsed = time.perf_counter() - start
+    throughput = len(df) * len(upper) / elapsed if elapsed > 0 else float("inf")
+    log.info(f"    ⏱️ {elapsed:.2f}s ({throughput / 1e6:.1f} M barras x set/s)")
+
+    metrics = result.metrics.sort_values("sharpe", ascending=False)
+    metrics.to_csv(output_dir / "backtest_grid.csv")
+    top = metrics.head(bt_cfg.get("top_n", 10)).reset_index()
+    significance = significance_of_top(df, signal, top, lower is not None, metrics["sharpe"].to_numpy(),
+                                       engine_cfg, bt_cfg.get("significance", {}))
+    summary = {
+        "signal": signal,
+        "bars": len(df),
+        "param_sets": len(upper),
+        "costs": {"fee_bps": engine_cfg.fee_bps, "slippage_bps": engine_cfg.slippage_bps,
+                  "max_position": engine_cfg.max_position, "long_only": engine_cfg.long_only},
+        "elapsed_sec": elapsed,
+        "bars_x_sets_per_sec": throughput,
+        "top": top.to_dict(orient="records"),
+        "significance": significance,
+    }
+    with open(output_dir / "backtest_summary.json", "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+    best = top.iloc[0]
+    log.info(f"    Mejor: upper={best['upper']:.4g}" + (f", lower={best['lower']:.4g}" if lower is not None else "")
+             + f" → Sharpe {best['sharpe']:.2f}, maxDD {best['max_drawdown']:.1%}, "
+               f"retorno {best['total_return']:.1%}, {int(best['trades'])} operaciones")
+    log.info("[green]✅ Backtest completado[/green]")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        log.error("⚠️  Debes indicar el path del archivo YAML.")
+        exit(1)
+    main(sys.argv[1])
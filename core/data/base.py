@@ -1,8 +1,41 @@
+import asyncio
+import time
 from abc import ABC, abstractmethod
-from .models import MarketDataRequest, Candle
-from typing import List
+from typing import AsyncIterator
+from .models import MarketDataRequest, CandleBatch
+from .timeframes import interval_to_ms, ms_to_date
 
 class MarketDataProvider(ABC):
     @abstractmethod
-    def get_historical_data(self, request: MarketDataRequest) -> List[Candle]:
+    def get_historical_data(self, request: MarketDataRequest) -> CandleBatch:
         pass
+
+    def get_range(self, symbol: str, interval: str, start_ms: int, end_ms: int) -> CandleBatch:
+        """Velas de [start_ms, end_ms). Por defecto pide los días completos y recorta."""
+        request = MarketDataRequest(
+            symbol=symbol,
+            interval=interval,
+            start_date=ms_to_date(start_ms),
+            end_date=ms_to_date(end_ms - 1),
+            provider=type(self).__name__,
+        )
+        return self.get_historical_data(request).slice_range(start_ms, end_ms)
+
+    async def stream_candles(self, symbol: str, interval: str, poll_sec: float = None) -> AsyncIterator[tuple]:
+        """
+        Velas cerradas (ts, open, high, low, close, volume) a medida que cierran.
+        Por defecto hace polling de get_range en un thread; los providers con
+        websocket o replay local lo sobreescriben.
+        """
+        step_ms = interval_to_ms(interval)
+        poll_sec = poll_sec or min(step_ms / 1000 / 4, 10.0)
+        last_ts = None
+        while True:
+            closed_until = int(time.time() * 1000) // step_ms * step_ms
+            start_ms = last_ts + step_ms if last_ts is not None else closed_until - step_ms
+            if start_ms < closed_until:
+                batch = await asyncio.to_thread(self.get_range, symbol, interval, start_ms, closed_until)
+                for row in batch.data.tolist():
+                    last_ts = row[0]
+                    yield tuple(row)
+            await asyncio.sleep(poll_sec)
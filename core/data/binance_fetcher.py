@@ -1,33 +1,10 @@
-import ccxt
-from datetime import datetime
-from typing import List
-from .base import MarketDataProvider
-from .models import MarketDataRequest, Candle
-from utils.logger import log
+from .ccxt_fetcher import CcxtFetcher
 
-class BinanceFetcher(MarketDataProvider):
-    def __init__(self):
-        self.client = ccxt.binance()
-        log.info("BinanceFetcher inicializado")
 
-    def get_historical_data(self, request: MarketDataRequest) -> List[Candle]:
-        log.info(f"Solicitando datos de {request.symbol} ({request.interval}) desde Binance...")
-        symbol = request.symbol.replace("/", "")  # ccxt format: ETH/USDT -> ETHUSDT
-        timeframe = request.interval
-        since = int(datetime.strptime(request.start_date, "%Y-%m-%d").timestamp() * 1000)
-        candles_raw = self.client.fetch_ohlcv(symbol, timeframe=timeframe, since=since)
-        log.info(f"Recibidas {len(candles_raw)} velas de Binance")
-        
-        result = []
-        for entry in candles_raw:
-            candle = Candle(
-                timestamp=datetime.fromtimestamp(entry[0] / 1000),
-                open=entry[1],
-                high=entry[2],
-                low=entry[3],
-                close=entry[4],
-                volume=entry[5],
-            )
-            result.append(candle)
+class BinanceFetcher(CcxtFetcher):
+    exchange_id = "binance"
+    exchange_name = "Binance"
+    page_limit = 1000  # máximo de velas por request en /klines
 
-        return result
\ No newline at end of file
+    def format_symbol(self, symbol: str) -> str:
+        return symbol.replace("/", "")  # ccxt format: ETH/USDT -> ETHUSDT
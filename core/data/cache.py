@@ -0,0 +1,70 @@
+import time
+
+from .base import MarketDataProvider
+from .coverage import CoverageIndex
+from .fetcher_factory import get_provider
+from .models import MarketDataRequest, CandleBatch
+from .resample import resample_candles
+from .store import CandleStore
+from .timeframes import interval_to_ms, request_range_ms
+from utils.logger import log
+
+
+class CandleCache:
+    """
+    Caché incremental sobre el CandleStore. Para cada pedido calcula qué
+    sub-rangos faltan según el CoverageIndex de la serie, descarga solo esos,
+    los mergea en el store y sirve el rango completo desde disco.
+
+    El provider se crea recién cuando hace falta descargar algo, así que un
+    pedido ya cubierto no toca la red. Con `base_interval` (p.ej. '1m') solo
+    se descarga y guarda esa serie; los timeframes más gruesos se derivan
+    localmente con resample_candles.
+    """
+
+    def __init__(self, provider_name: str, store: CandleStore, provider: MarketDataProvider = None,
+                 base_interval: str = None):
+        self.provider_name = provider_name
+        self.store = store
+        self.base_interval = base_interval
+        self._provider = provider
+
+    @property
+    def provider(self) -> MarketDataProvider:
+        if self._provider is None:
+            self._provider = get_provider(self.provider_name)
+        return self._provider
+
+    def get(self, request: MarketDataRequest) -> CandleBatch:
+        start_ms, end_ms = request_range_ms(request.start_date, request.end_date)
+        return self.get_range(request.symbol, request.interval, start_ms, end_ms)
+
+    def get_range(self, symbol: str, interval: str, start_ms: int, end_ms: int) -> CandleBatch:
+        if self.base_interval and interval != self.base_interval:
+            base = self._get_stored_range(symbol, self.base_interval, start_ms, end_ms)
+            return resample_candles(base, self.base_interval, interval)
+        return self._get_stored_range(symbol, interval, start_ms, end_ms)
+
+    def _get_stored_range(self, symbol: str, interval: str, start_ms: int, end_ms: int) -> CandleBatch:
+        coverage = CoverageIndex(self.store, self.provider_name, symbol, interval)
+
+        # No marcamos como cubierto lo que todavía no cerró: ese tramo se
+        # vuelve a pedir en la próxima corrida.
+        step_ms = interval_to_ms(interval)
+        closed_until = (int(time.time() * 1000) // step_ms) * step_ms
+
+        missing = coverage.missing(start_ms, end_ms)
+        if not missing:
+            log.info(f"[yellow]🟡 {symbol} {interval}: rango completo en caché, se omite descarga.[/yellow]")
+        else:
+            log.info(f"[cyan]🔍 {symbol} {interval}: faltan {len(missing)} rango(s), descargando desde {self.provider_name}...[/cyan]")
+
+        for miss_start, miss_end in missing:
+            candles = self.provider.get_range(symbol, interval, miss_start, miss_end)
+            self.store.write(self.provider_name, symbol, interval, candles)
+            coverage.add(miss_start, min(miss_end, closed_until))
+            log.info(f"[green]⬇️  {len(candles)} velas agregadas al store.[/green]")
+        if missing:
+            coverage.save()
+
+        return self.store.read(self.provider_name, symbol, interval, start_ms, end_ms)
@@ -0,0 +1,42 @@
+import ccxt
+from .base import MarketDataProvider
+from .backfill import BackfillEngine
+from .models import MarketDataRequest, CandleBatch
+from .timeframes import request_range_ms
+from utils.logger import log
+
+
+class CcxtFetcher(MarketDataProvider):
+    """
+    Base común para los fetchers sobre ccxt. Cada subclase define el exchange,
+    el máximo de velas por request y el formato de símbolo que espera.
+    """
+    exchange_id = None
+    exchange_name = None
+    page_limit = 500
+
+    def __init__(self, client=None, max_workers: int = 8):
+        # El BackfillEngine aplica su propio rate limit compartido entre
+        # threads, por eso desactivamos el de ccxt (que serializa todo).
+        self.client = client or getattr(ccxt, self.exchange_id)({"enableRateLimit": False})
+        self.backfill = BackfillEngine(self.client, limit=self.page_limit, max_workers=max_workers)
+        log.info(f"{type(self).__name__} inicializado")
+
+    def warm_up(self):
+        """Carga la metadata de mercados una vez, antes de que los threads compitan por hacerlo."""
+        load_markets = getattr(self.client, "load_markets", None)
+        if load_markets is not None:
+            load_markets()
+
+    def format_symbol(self, symbol: str) -> str:
+        return symbol
+
+    def get_historical_data(self, request: MarketDataRequest) -> CandleBatch:
+        start_ms, end_ms = request_range_ms(request.start_date, request.end_date)
+        return self.get_range(request.symbol, request.interval, start_ms, end_ms)
+
+    def get_range(self, symbol: str, interval: str, start_ms: int, end_ms: int) -> CandleBatch:
+        log.info(f"Solicitando datos de {symbol} ({interval}) desde {self.exchange_name}...")
+        candles = self.backfill.fetch(self.format_symbol(symbol), interval, start_ms, end_ms)
+        log.info(f"Recibidas {len(candles)} velas de {self.exchange_name}")
+        return candles
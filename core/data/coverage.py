@@ -0,0 +1,75 @@
+import json
+import os
+from typing import List, Tuple
+
+from .store import CandleStore
+
+Interval = Tuple[int, int]  # [start_ms, end_ms)
+
+
+def merge_intervals(intervals: List[Interval]) -> List[Interval]:
+    """Une intervalos solapados o contiguos. Devuelve una lista ordenada y disjunta."""
+    merged = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(start: int, end: int, covered: List[Interval]) -> List[Interval]:
+    """Sub-rangos de [start, end) que no están en `covered` (lista ordenada y disjunta)."""
+    missing = []
+    cursor = start
+    for c_start, c_end in covered:
+        if c_end <= cursor:
+            continue
+        if c_start >= end:
+            break
+        if c_start > cursor:
+            missing.append((cursor, c_start))
+        cursor = max(cursor, c_end)
+        if cursor >= end:
+            break
+    if cursor < end:
+        missing.append((cursor, end))
+    return missing
+
+
+class CoverageIndex:
+    """
+    Índice de cobertura de una serie provider/symbol/interval del CandleStore:
+    qué rangos [start, end) ya fueron descargados. Vive como _coverage.json
+    junto a las particiones de la serie.
+    """
+
+    FILE_NAME = "_coverage.json"
+
+    def __init__(self, store: CandleStore, provider: str, symbol: str, interval: str):
+        self.path = store.series_dir(provider, symbol, interval) / self.FILE_NAME
+        self.intervals = self._load()
+
+    def _load(self) -> List[Interval]:
+        if not self.path.exists():
+            return []
+        with open(self.path, "r", encoding="utf-8") as f:
+            return merge_intervals([tuple(i) for i in json.load(f)["intervals"]])
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"intervals": [list(i) for i in self.intervals]}, f)
+        os.replace(tmp_path, self.path)
+
+    def add(self, start: int, end: int):
+        self.intervals = merge_intervals(self.intervals + [(start, end)])
+
+    def missing(self, start: int, end: int) -> List[Interval]:
+        return subtract_intervals(start, end, self.intervals)
+
+    def covers(self, start: int, end: int) -> bool:
+        return not self.missing(start, end)
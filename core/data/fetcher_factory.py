@@ -1,11 +1,84 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, Iterator
+
 from .base import MarketDataProvider
 from .binance_fetcher import BinanceFetcher
 from .coinbase_fetcher import CoinbaseFetcher
+from .models import MarketDataRequest, BatchResult
+from utils.logger import log
+
+# Constructores registrados por nombre de provider
+_FACTORIES: Dict[str, Callable[[], MarketDataProvider]] = {
+    "binance": BinanceFetcher,
+    "coinbase": CoinbaseFetcher,
+}
+
+# Pool de providers ya construidos: un cliente caliente por exchange
+_POOL: Dict[str, MarketDataProvider] = {}
+_POOL_LOCK = threading.Lock()
+# Un lock por provider para construirlo y calentarlo sin bloquear a los demás
+_BUILD_LOCKS: Dict[str, threading.Lock] = {}
+
+
+def register_provider(name: str, factory: Callable[[], MarketDataProvider]):
+    """Registra (o reemplaza) un provider. Útil para exchanges fake en tests."""
+    with _POOL_LOCK:
+        _FACTORIES[name] = factory
+        _POOL.pop(name, None)
+
+
+def clear_pool():
+    with _POOL_LOCK:
+        _POOL.clear()
+
 
 def get_provider(name: str) -> MarketDataProvider:
-    if name == "binance":
-        return BinanceFetcher()
-    elif name == "coinbase":
-        return CoinbaseFetcher()
-    else:
-        raise ValueError(f"Proveedor '{name}' no soportado")
+    """
+    Devuelve el provider compartido para `name`. El cliente ccxt (sesión HTTP,
+    metadata de mercados y rate limiter) se crea una sola vez por proceso.
+    """
+    provider = _POOL.get(name)
+    if provider is not None:
+        return provider
+    with _POOL_LOCK:
+        if name not in _FACTORIES:
+            raise ValueError(f"Proveedor '{name}' no soportado")
+        build_lock = _BUILD_LOCKS.setdefault(name, threading.Lock())
+
+    # warm_up (load_markets de ccxt) es un round trip de red: se hace fuera del
+    # lock global, así un exchange lento no frena a los workers de los otros
+    with build_lock:
+        provider = _POOL.get(name)          # otro worker pudo construirlo mientras esperábamos
+        if provider is not None:
+            return provider
+        provider = _FACTORIES[name]()
+        warm_up = getattr(provider, "warm_up", None)
+        if warm_up is not None:
+            warm_up()
+        with _POOL_LOCK:
+            _POOL[name] = provider
+        return provider
+
+
+def get_historical_data_batch(requests: Iterable[MarketDataRequest], max_workers: int = 4) -> Iterator[BatchResult]:
+    """
+    Reparte los requests en un pool acotado de workers y devuelve los
+    resultados a medida que terminan (no en el orden de entrada). Un request
+    que falla no corta el resto: viene con `error` seteado.
+    """
+    requests = list(requests)
+    log.info(f"[cyan]📦 Batch de {len(requests)} requests con {max_workers} workers[/cyan]")
+
+    def _fetch(request: MarketDataRequest) -> BatchResult:
+        try:
+            candles = get_provider(request.provider).get_historical_data(request)
+            return BatchResult(request=request, candles=candles)
+        except Exception as e:
+            log.error(f"❌ {request.symbol} ({request.provider}) falló: {e}")
+            return BatchResult(request=request, error=e)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_fetch, request) for request in requests]
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,47 @@
+import asyncio
+from typing import Dict, List
+
+import numpy as np
+
+from .base import MarketDataProvider
+from .ring_buffer import CandleRingBuffer
+from .timeframes import interval_to_ms
+from utils.logger import log
+
+
+class LiveCandleFeed:
+    """
+    Mantiene un CandleRingBuffer de las últimas `window` velas por símbolo,
+    alimentado por provider.stream_candles. Los consumidores leen la ventana
+    con `window(symbol)` (vista sin copia) y reciben cada vela nueva como
+    (symbol, row) desde `queue`.
+    """
+
+    def __init__(self, provider: MarketDataProvider, symbols: List[str], interval: str, window: int = 500):
+        self.provider = provider
+        self.symbols = symbols
+        self.interval = interval
+        self.buffers: Dict[str, CandleRingBuffer] = {s: CandleRingBuffer(window) for s in symbols}
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    def bootstrap(self, end_ms: int):
+        """Precarga cada buffer con las velas previas a end_ms (historia para los indicadores)."""
+        step_ms = interval_to_ms(self.interval)
+        for symbol, buffer in self.buffers.items():
+            start_ms = end_ms - buffer.capacity * step_ms
+            buffer.extend(self.provider.get_range(symbol, self.interval, start_ms, end_ms))
+            log.info(f"[cyan]📥 {symbol}: {len(buffer)} velas precargadas[/cyan]")
+
+    def window(self, symbol: str) -> np.ndarray:
+        return self.buffers[symbol].window()
+
+    async def _consume(self, symbol: str):
+        buffer = self.buffers[symbol]
+        async for row in self.provider.stream_candles(symbol, self.interval):
+            buffer.append(*row)
+            await self.queue.put((symbol, row))
+
+    async def run(self):
+        """Corre un stream por símbolo hasta que todos terminen (el replay termina; el live no)."""
+        await asyncio.gather(*(self._consume(symbol) for symbol in self.symbols))
+        await self.queue.put(None)  # fin del feed
@@ -1,5 +1,8 @@
 from datetime import datetime
 from dataclasses import dataclass
+from typing import List, Optional
+import numpy as np
+import pandas as pd
 
 @dataclass
 class MarketDataRequest:
@@ -17,3 +20,118 @@ class Candle:
     low: float
     close: float
     volume: float
+
+
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+# timestamp en epoch ms (UTC) + OHLCV en float64, igual que las filas crudas de ccxt
+CANDLE_DTYPE = np.dtype([("timestamp", "<i8")] + [(col, "<f8") for col in OHLCV_COLUMNS])
+
+
+@dataclass
+class CandleBatch:
+    """
+    Bloque de velas en formato columnar (arreglo estructurado de NumPy).
+
+    Se construye directamente desde las listas crudas de ccxt sin crear un
+    objeto por vela. `to_frame()` da el DataFrame que consume el pipeline y
+    `to_candles()` queda como vista de compatibilidad con List[Candle].
+    """
+    data: np.ndarray
+
+    @classmethod
+    def empty(cls) -> "CandleBatch":
+        return cls(np.empty(0, dtype=CANDLE_DTYPE))
+
+    @classmethod
+    def from_raw(cls, rows: list) -> "CandleBatch":
+        """Filas [ts, open, high, low, close, volume] de ccxt -> CandleBatch."""
+        if len(rows) == 0:
+            return cls.empty()
+        raw = np.asarray(rows, dtype=np.float64)  # None -> NaN; epoch ms < 2**53 es exacto
+        data = np.empty(len(raw), dtype=CANDLE_DTYPE)
+        data["timestamp"] = raw[:, 0].astype(np.int64)
+        for i, col in enumerate(OHLCV_COLUMNS, start=1):
+            data[col] = raw[:, i]
+        return cls(data)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "CandleBatch":
+        """DataFrame con columna timestamp (datetime o epoch ms) + OHLCV -> CandleBatch."""
+        data = np.empty(len(df), dtype=CANDLE_DTYPE)
+        ts = df["timestamp"]
+        if not pd.api.types.is_integer_dtype(ts):
+            ts = pd.to_datetime(ts).values.astype("datetime64[ms]").astype(np.int64)
+        data["timestamp"] = np.asarray(ts, dtype=np.int64)
+        for col in OHLCV_COLUMNS:
+            data[col] = df[col].to_numpy(dtype=np.float64)
+        return cls(data)
+
+    @classmethod
+    def concat(cls, batches: List["CandleBatch"]) -> "CandleBatch":
+        if not batches:
+            return cls.empty()
+        return cls(np.concatenate([b.data for b in batches]))
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self.data["timestamp"]
+
+    def sorted_unique(self) -> "CandleBatch":
+        """Ordena por timestamp y, ante duplicados, se queda con la última fila recibida."""
+        ts = self.data["timestamp"]
+        if len(ts) < 2:
+            return self
+        steps = np.diff(ts)
+        if (steps > 0).all():
+            return self  # caso habitual: ya viene ordenado y sin duplicados
+        # sort estable: entre timestamps iguales conserva el orden de llegada
+        order = np.arange(len(ts)) if (steps >= 0).all() else np.argsort(ts, kind="stable")
+        sorted_ts = ts[order]
+        keep = np.empty(len(ts), dtype=bool)
+        keep[:-1] = sorted_ts[1:] != sorted_ts[:-1]
+        keep[-1] = True
+        return self.take(order[keep])
+
+    def take(self, idx: np.ndarray) -> "CandleBatch":
+        # Gather columna por columna: bastante más rápido que indexar el arreglo estructurado
+        data = np.empty(len(idx), dtype=CANDLE_DTYPE)
+        for name in CANDLE_DTYPE.names:
+            data[name] = self.data[name][idx]
+        return CandleBatch(data)
+
+    def slice_range(self, start_ms: int, end_ms: int) -> "CandleBatch":
+        """Sub-bloque [start, end) asumiendo timestamps ordenados (vista, sin copia)."""
+        ts = self.data["timestamp"]
+        lo, hi = np.searchsorted(ts, [start_ms, end_ms], side="left")
+        return CandleBatch(self.data[lo:hi])
+
+    def to_frame(self) -> pd.DataFrame:
+        df = pd.DataFrame({col: self.data[col] for col in OHLCV_COLUMNS})
+        df.insert(0, "timestamp", pd.to_datetime(self.data["timestamp"], unit="ms"))
+        return df
+
+    def to_candles(self) -> List[Candle]:
+        """Vista de compatibilidad: una Candle por fila (costoso para series largas)."""
+        return [
+            Candle(
+                timestamp=datetime.utcfromtimestamp(ts / 1000),
+                open=o, high=h, low=l, close=c, volume=v,
+            )
+            for ts, o, h, l, c, v in self.data.tolist()
+        ]
+
+
+@dataclass
+class BatchResult:
+    """Resultado de un request dentro de get_historical_data_batch."""
+    request: MarketDataRequest
+    candles: Optional[CandleBatch] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
@@ -0,0 +1,167 @@
+from dataclasses import dataclass, field, asdict
+from typing import List, Tuple
+
+import numpy as np
+
+from .models import CandleBatch, CANDLE_DTYPE
+from .timeframes import interval_to_ms
+
+# Bits de la columna quality_flag
+FLAG_GAP = 1           # faltan velas inmediatamente antes de esta
+FLAG_ZERO_VOLUME = 2
+FLAG_SPIKE = 4         # salto de precio que revierte en la vela siguiente (bad tick)
+FLAG_INVALID = 8       # NaN, precio <= 0, high/low inconsistentes o volumen negativo
+FLAG_FILLED = 16       # vela sintética o reparada por forward-fill
+
+POLICIES = ("flag", "drop", "ffill")
+
+
+@dataclass
+class QualityReport:
+    rows_in: int
+    rows_out: int = 0
+    duplicates: int = 0
+    non_monotonic: int = 0
+    gaps: int = 0
+    missing_bars: int = 0
+    zero_volume: int = 0
+    spikes: int = 0
+    invalid: int = 0
+    filled: int = 0
+    dropped: int = 0
+    largest_gaps: List[Tuple[int, int]] = field(default_factory=list)  # (ts inicio del hueco, velas faltantes)
+
+    @property
+    def is_clean(self) -> bool:
+        return not (self.duplicates or self.non_monotonic or self.gaps
+                    or self.zero_volume or self.spikes or self.invalid)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def inspect_candles(batch: CandleBatch, interval: str, spike_sigma: float = 10.0,
+                    max_gaps_reported: int = 10):
+    """
+    Diagnóstico vectorizado. Devuelve (datos ordenados y sin duplicados,
+    flags por fila, QualityReport). No modifica precios ni volúmenes.
+    """
+    step_ms = interval_to_ms(interval)
+    raw_ts = batch.timestamps
+    report = QualityReport(rows_in=len(batch))
+    if len(batch) == 0:
+        return batch.data, np.zeros(0, dtype=np.uint8), report
+
+    report.non_monotonic = int(np.count_nonzero(np.diff(raw_ts) < 0))
+    data = batch.sorted_unique().data
+    report.duplicates = len(raw_ts) - len(data)
+
+    ts = data["timestamp"]
+    o, h, l, c, v = (data[col] for col in ("open", "high", "low", "close", "volume"))
+    flags = np.zeros(len(data), dtype=np.uint8)
+
+    # Huecos: la vela i+1 llega más de un paso después de la i
+    dt = np.diff(ts)
+    gap_idx = np.flatnonzero(dt > step_ms)
+    missing = dt[gap_idx] // step_ms - 1
+    flags[gap_idx + 1] |= FLAG_GAP
+    report.gaps = len(gap_idx)
+    report.missing_bars = int(missing.sum())
+    top = np.argsort(missing)[::-1][:max_gaps_reported]
+    report.largest_gaps = [(int(ts[gap_idx[i]] + step_ms), int(missing[i])) for i in top]
+
+    with np.errstate(invalid="ignore"):
+        invalid = (
+            ~np.isfinite(o) | ~np.isfinite(h) | ~np.isfinite(l) | ~np.isfinite(c) | ~np.isfinite(v)
+            | (l <= 0) | (v < 0)
+            | (h < np.maximum(o, c)) | (l > np.minimum(o, c))
+        )
+    flags[invalid] |= FLAG_INVALID
+    report.invalid = int(np.count_nonzero(invalid))
+
+    zero_volume = v == 0
+    flags[zero_volume] |= FLAG_ZERO_VOLUME
+    report.zero_volume = int(np.count_nonzero(zero_volume))
+
+    # Spikes: retorno log extremo (en MADs) que se revierte en la vela siguiente
+    if len(data) > 2:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r = np.diff(np.log(np.where(invalid, np.nan, c)))
+        finite = np.isfinite(r)
+        if finite.any():
+            med = np.median(r[finite])
+            scale = 1.4826 * np.median(np.abs(r[finite] - med))
+            if scale > 0:
+                big = finite & (np.abs(r - med) > spike_sigma * scale)
+                spike = np.zeros(len(data), dtype=bool)
+                spike[1:-1] = big[:-1] & big[1:] & (np.sign(r[:-1]) != np.sign(r[1:]))
+                flags[spike] |= FLAG_SPIKE
+                report.spikes = int(np.count_nonzero(spike))
+
+    return data, flags, report
+
+
+def clean_candles(batch: CandleBatch, interval: str, policy: str = "flag", spike_sigma: float = 10.0):
+    """
+    Etapa de calidad entre fetch y features. Siempre ordena y deduplica; luego:
+      - flag : no toca los datos, solo devuelve los flags
+      - drop : elimina velas inválidas, spikes y de volumen cero
+      - ffill: repara inválidas/spikes con el close previo e inserta las velas
+               faltantes (OHLC = close previo, volumen 0), marcadas FLAG_FILLED
+    Devuelve (CandleBatch, flags uint8 alineados, QualityReport).
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Política de calidad '{policy}' no soportada ({', '.join(POLICIES)})")
+
+    data, flags, report = inspect_candles(batch, interval, spike_sigma)
+
+    if policy == "drop" and len(data):
+        keep = (flags & (FLAG_INVALID | FLAG_SPIKE | FLAG_ZERO_VOLUME)) == 0
+        data, flags = data[keep], flags[keep]
+    elif policy == "ffill" and len(data):
+        data, flags = _forward_fill(data, flags, interval_to_ms(interval))
+
+    report.rows_out = len(data)
+    report.dropped = max(report.rows_in - report.duplicates - len(data), 0)
+    report.filled = int(np.count_nonzero(flags & FLAG_FILLED))
+    return CandleBatch(data), flags, report
+
+
+def _forward_fill(data: np.ndarray, flags: np.ndarray, step_ms: int):
+    # 1) Reparar filas malas con el close de la última fila buena
+    bad = (flags & (FLAG_INVALID | FLAG_SPIKE)) != 0
+    if bad.any():
+        if bad.all():
+            return data[:0], flags[:0]
+        first_good = int(np.argmax(~bad))  # filas malas al inicio no tienen de dónde rellenar
+        data, flags, bad = data[first_good:].copy(), flags[first_good:].copy(), bad[first_good:]
+        last_good = np.maximum.accumulate(np.where(bad, 0, np.arange(len(data))))
+        fill_close = data["close"][last_good[bad]]
+        for col in ("open", "high", "low", "close"):
+            data[col][bad] = fill_close
+        data["volume"][bad] = 0.0
+        flags[bad] |= FLAG_FILLED
+
+    # 2) Insertar las velas faltantes sobre la grilla regular
+    ts = data["timestamp"]
+    pos = (ts - ts[0]) // step_ms
+    n_grid = int(pos[-1]) + 1
+    if n_grid == len(data):
+        return data, flags
+
+    present = np.zeros(n_grid, dtype=bool)
+    present[pos] = True
+    missing = ~present
+    prev_close = data["close"][np.cumsum(present) - 1]  # close de la última vela real
+
+    out = np.empty(n_grid, dtype=CANDLE_DTYPE)
+    out["timestamp"] = ts[0] + np.arange(n_grid, dtype=np.int64) * step_ms
+    for col in ("open", "high", "low", "close", "volume"):
+        out[col][pos] = data[col]
+    for col in ("open", "high", "low", "close"):
+        out[col][missing] = prev_close[missing]
+    out["volume"][missing] = 0.0
+
+    out_flags = np.full(n_grid, FLAG_FILLED, dtype=np.uint8)
+    out_flags[pos] = flags
+    return out, out_flags
@@ -0,0 +1,58 @@
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator
+
+import pandas as pd
+
+from .base import MarketDataProvider
+from .models import MarketDataRequest, CandleBatch
+from .store import CandleStore, DEFAULT_STORE_ROOT
+from .timeframes import interval_to_ms, request_range_ms
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Provider offline que reproduce velas guardadas localmente (CandleStore o
+    un CSV legado) como si llegaran en vivo.
+
+    speed es el factor de aceleración respecto del tiempo real: con 5m y
+    speed=300 sale una vela por segundo; speed=0 reproduce sin pausas.
+    """
+
+    def __init__(self, source_provider: str, start_date: str, end_date: str,
+                 store: CandleStore = None, speed: float = 0.0):
+        self.source_provider = source_provider
+        self.store = store or CandleStore(DEFAULT_STORE_ROOT)
+        self.start_ms, self.end_ms = request_range_ms(start_date, end_date)
+        self.speed = speed
+        self._frames = {}  # (symbol, interval) -> CandleBatch precargado desde CSV
+
+    @classmethod
+    def from_csv(cls, csv_path: str, symbol: str, interval: str, speed: float = 0.0) -> "ReplayProvider":
+        """Replay de un CSV {start}_to_{end}_{provider}.csv de shared/data."""
+        path = Path(csv_path)
+        start_date, rest = path.stem.split("_to_")
+        end_date, provider = rest.rsplit("_", 1)
+        replay = cls(provider, start_date, end_date, speed=speed)
+        replay._frames[(symbol, interval)] = CandleBatch.from_frame(pd.read_csv(path)).sorted_unique()
+        return replay
+
+    def _load(self, symbol: str, interval: str, start_ms: int, end_ms: int) -> CandleBatch:
+        if (symbol, interval) in self._frames:
+            return self._frames[(symbol, interval)].slice_range(start_ms, end_ms)
+        return self.store.read(self.source_provider, symbol, interval, start_ms, end_ms)
+
+    def get_historical_data(self, request: MarketDataRequest) -> CandleBatch:
+        start_ms, end_ms = request_range_ms(request.start_date, request.end_date)
+        return self._load(request.symbol, request.interval, start_ms, end_ms)
+
+    def get_range(self, symbol: str, interval: str, start_ms: int, end_ms: int) -> CandleBatch:
+        return self._load(symbol, interval, start_ms, end_ms)
+
+    async def stream_candles(self, symbol: str, interval: str, poll_sec: float = None) -> AsyncIterator[tuple]:
+        candles = self._load(symbol, interval, self.start_ms, self.end_ms)
+        delay = interval_to_ms(interval) / 1000 / self.speed if self.speed > 0 else 0.0
+        for row in candles.data.tolist():
+            yield tuple(row)
+            # sleep(0) igual cede el loop para que los consumidores avancen
+            await asyncio.sleep(delay)
@@ -0,0 +1,98 @@
+from typing import List, Optional
+
+import numpy as np
+
+from .models import CandleBatch, CANDLE_DTYPE
+from .timeframes import interval_to_ms
+
+
+def bucket_starts(timestamps: np.ndarray, step_ms: int, offset_ms: int = 0) -> np.ndarray:
+    """Inicio del bucket (en epoch ms) al que pertenece cada timestamp. offset=0 alinea a UTC."""
+    return (timestamps - offset_ms) // step_ms * step_ms + offset_ms
+
+
+def resample_candles(batch: CandleBatch, src_interval: str, interval: str,
+                     offset_ms: int = 0, drop_partial: bool = True) -> CandleBatch:
+    """
+    Agrega velas de `src_interval` a `interval` (open=first, high=max,
+    low=min, close=last, volume=sum) en una sola pasada vectorizada.
+
+    offset_ms desplaza la grilla respecto de UTC (p.ej. sesiones que cierran
+    a las 17:00). Un bucket es parcial si los datos empiezan después de su
+    apertura o terminan antes de su cierre (la vela que todavía se está
+    formando); con drop_partial=True se descartan. Huecos internos no lo
+    hacen parcial.
+    """
+    src_ms = interval_to_ms(src_interval)
+    step_ms = interval_to_ms(interval)
+    if step_ms % src_ms != 0:
+        raise ValueError(f"No se puede derivar {interval} desde {src_interval}")
+    if len(batch) == 0 or step_ms == src_ms:
+        return batch
+
+    data = batch.sorted_unique().data
+    ts = data["timestamp"]
+    buckets = bucket_starts(ts, step_ms, offset_ms)
+
+    # data ordenada -> cada bucket es un tramo contiguo [starts[i], ends[i])
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+    ends = np.concatenate((starts[1:], [len(data)]))
+
+    out = np.empty(len(starts), dtype=CANDLE_DTYPE)
+    out["timestamp"] = buckets[starts]
+    out["open"] = data["open"][starts]
+    out["close"] = data["close"][ends - 1]
+    out["high"] = np.maximum.reduceat(data["high"], starts)
+    out["low"] = np.minimum.reduceat(data["low"], starts)
+    out["volume"] = np.add.reduceat(data["volume"], starts)
+
+    if drop_partial:
+        keep = np.ones(len(out), dtype=bool)
+        keep[0] &= ts[0] == out["timestamp"][0]
+        keep[-1] &= ts[-1] + src_ms == out["timestamp"][-1] + step_ms
+        out = out[keep]
+    return CandleBatch(out)
+
+
+class StreamingResampler:
+    """
+    Agregador incremental para velas en vivo. `update()` recibe cada vela de
+    `src_interval` y devuelve las velas de `interval` que quedaron cerradas:
+    se emite apenas llega la última vela del bucket, o cuando aparece una
+    vela de un bucket nuevo (si hubo huecos).
+    """
+
+    def __init__(self, src_interval: str, interval: str, offset_ms: int = 0):
+        self.src_ms = interval_to_ms(src_interval)
+        self.step_ms = interval_to_ms(interval)
+        if self.step_ms % self.src_ms != 0:
+            raise ValueError(f"No se puede derivar {interval} desde {src_interval}")
+        self.offset_ms = offset_ms
+        self._bar: Optional[list] = None  # [ts, open, high, low, close, volume]
+
+    @property
+    def current(self) -> Optional[tuple]:
+        """Vela en formación (parcial), o None."""
+        return tuple(self._bar) if self._bar is not None else None
+
+    def update(self, ts: int, open_: float, high: float, low: float, close: float, volume: float) -> List[tuple]:
+        completed = []
+        bucket = (ts - self.offset_ms) // self.step_ms * self.step_ms + self.offset_ms
+
+        if self._bar is not None and self._bar[0] != bucket:
+            completed.append(tuple(self._bar))
+            self._bar = None
+
+        if self._bar is None:
+            self._bar = [bucket, open_, high, low, close, volume]
+        else:
+            bar = self._bar
+            bar[2] = max(bar[2], high)
+            bar[3] = min(bar[3], low)
+            bar[4] = close
+            bar[5] += volume
+
+        if ts + self.src_ms >= bucket + self.step_ms:
+            completed.append(tuple(self._bar))
+            self._bar = None
+        return completed
@@ -0,0 +1,54 @@
+import numpy as np
+
+from .models import CandleBatch, CANDLE_DTYPE
+
+
+class CandleRingBuffer:
+    """
+    Ventana fija con las últimas `capacity` velas, preasignada en NumPy.
+
+    Cada vela se escribe dos veces (en i y en i + capacity), así la ventana
+    vigente siempre es un tramo contiguo del arreglo y `window()` devuelve
+    una vista sin copia, en orden cronológico.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=CANDLE_DTYPE)
+        self._next = 0   # próxima posición a escribir en [0, capacity)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def last_timestamp(self):
+        if self._count == 0:
+            return None
+        return int(self._data["timestamp"][self._next - 1 + self.capacity])
+
+    def append(self, ts: int, open_: float, high: float, low: float, close: float, volume: float):
+        row = (ts, open_, high, low, close, volume)
+        # Misma vela re-emitida (corrección del exchange): se pisa la última
+        if self._count and ts == self.last_timestamp:
+            pos = (self._next - 1) % self.capacity
+        else:
+            if self._count and ts < self.last_timestamp:
+                return
+            pos = self._next
+            self._next = (self._next + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+        self._data[pos] = row
+        self._data[pos + self.capacity] = row
+
+    def extend(self, batch: CandleBatch):
+        for row in batch.data[-self.capacity:].tolist():
+            self.append(*row)
+
+    def window(self) -> np.ndarray:
+        """Vista (sin copia) de las velas en buffer, de la más vieja a la más nueva."""
+        end = self._next + self.capacity
+        return self._data[end - self._count:end]
+
+    def column(self, name: str) -> np.ndarray:
+        return self.window()[name]
@@ -0,0 +1,110 @@
+import os
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .models import CandleBatch, CANDLE_DTYPE, OHLCV_COLUMNS
+from .timeframes import ms_to_date, date_to_ms
+
+DEFAULT_STORE_ROOT = "shared/store"
+DAY_MS = 86_400_000
+
+SCHEMA = pa.schema([("timestamp", pa.int64())] + [(col, pa.float64()) for col in OHLCV_COLUMNS])
+
+
+class CandleStore:
+    """
+    Almacén de velas en Parquet (zstd) particionado estilo Hive:
+
+        <root>/provider=binance/symbol=ETHUSDT/interval=5m/day=2024-01-01/part.parquet
+
+    Las lecturas por rango solo abren las particiones de los días pedidos y
+    empujan el filtro de timestamp al lector de Parquet (row groups fuera de
+    rango no se decodifican). Los archivos se leen con memory-map.
+    """
+
+    def __init__(self, root: str = DEFAULT_STORE_ROOT, compression: str = "zstd"):
+        self.root = Path(root)
+        self.compression = compression
+
+    # ------------------------------------------------------------------
+    # Paths
+    # ------------------------------------------------------------------
+    def series_dir(self, provider: str, symbol: str, interval: str) -> Path:
+        symbol_clean = symbol.replace("/", "")
+        return self.root / f"provider={provider}" / f"symbol={symbol_clean}" / f"interval={interval}"
+
+    def day_path(self, provider: str, symbol: str, interval: str, day: str) -> Path:
+        return self.series_dir(provider, symbol, interval) / f"day={day}" / "part.parquet"
+
+    def days(self, provider: str, symbol: str, interval: str) -> List[str]:
+        folder = self.series_dir(provider, symbol, interval)
+        if not folder.exists():
+            return []
+        return sorted(p.name[len("day="):] for p in folder.glob("day=*") if (p / "part.parquet").exists())
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+    def write(self, provider: str, symbol: str, interval: str, batch: CandleBatch) -> int:
+        """Mergea el batch en las particiones diarias (upsert por timestamp). Devuelve filas escritas."""
+        if len(batch) == 0:
+            return 0
+        batch = batch.sorted_unique()
+        day_ids = batch.timestamps // DAY_MS
+        # batch ordenado -> cada día es un tramo contiguo
+        bounds = np.flatnonzero(np.diff(day_ids)) + 1
+        for chunk in np.split(batch.data, bounds):
+            day = ms_to_date(int(chunk["timestamp"][0]))
+            path = self.day_path(provider, symbol, interval, day)
+            new = CandleBatch(chunk)
+            if path.exists():
+                new = CandleBatch.concat([self._read_file(path), new]).sorted_unique()
+            self._write_file(path, new)
+        return len(batch)
+
+    def _write_file(self, path: Path, batch: CandleBatch):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        table = pa.table({name: batch.data[name] for name in CANDLE_DTYPE.names}, schema=SCHEMA)
+        tmp_path = path.with_suffix(".tmp")
+        pq.write_table(table, tmp_path, compression=self.compression)
+        os.replace(tmp_path, path)
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+    def _read_file(self, path: Path) -> CandleBatch:
+        return _table_to_batch(pq.read_table(path, memory_map=True))
+
+    def read_table(self, provider: str, symbol: str, interval: str,
+                   start_ms: int, end_ms: int, columns: List[str] = None) -> pa.Table:
+        """Tabla Arrow con las velas de [start, end). Poda por día + pushdown de timestamp."""
+        first_day, last_day = start_ms // DAY_MS, (end_ms - 1) // DAY_MS
+        files = [
+            str(self.day_path(provider, symbol, interval, day))
+            for day in self.days(provider, symbol, interval)
+            if first_day <= date_to_ms(day) // DAY_MS <= last_day
+        ]
+        if not files:
+            return SCHEMA.empty_table() if columns is None else SCHEMA.empty_table().select(columns)
+        dataset = pq.ParquetDataset(
+            files,
+            filters=[("timestamp", ">=", start_ms), ("timestamp", "<", end_ms)],
+            memory_map=True,
+            partitioning=None,  # provider/symbol/... ya están implícitos en la consulta
+        )
+        return dataset.read(columns=columns or SCHEMA.names)
+
+    def read(self, provider: str, symbol: str, interval: str, start_ms: int, end_ms: int) -> CandleBatch:
+        table = self.read_table(provider, symbol, interval, start_ms, end_ms)
+        return _table_to_batch(table).sorted_unique()
+
+
+def _table_to_batch(table: pa.Table) -> CandleBatch:
+    data = np.empty(table.num_rows, dtype=CANDLE_DTYPE)
+    for name in CANDLE_DTYPE.names:
+        data[name] = table.column(name).to_numpy()
+    return CandleBatch(data)
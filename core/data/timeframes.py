@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta, timezone
+
+# Duración de cada unidad de timeframe de ccxt en milisegundos
+_UNIT_MS = {
+    "m": 60_000,
+    "h": 3_600_000,
+    "d": 86_400_000,
+    "w": 604_800_000,
+}
+
+
+def interval_to_ms(interval: str) -> int:
+    """Convierte un timeframe de ccxt ('1m', '5m', '4h', '1d') a milisegundos."""
+    unit = interval[-1]
+    if unit not in _UNIT_MS or not interval[:-1].isdigit():
+        raise ValueError(f"Intervalo '{interval}' no soportado")
+    return int(interval[:-1]) * _UNIT_MS[unit]
+
+
+def date_to_ms(date_str: str) -> int:
+    """'YYYY-MM-DD' -> epoch ms a las 00:00 UTC de ese día."""
+    dt = datetime.strptime(date_str, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+def ms_to_date(ts_ms: int) -> str:
+    """Epoch ms -> 'YYYY-MM-DD' (UTC)."""
+    return datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def request_range_ms(start_date: str, end_date: str):
+    """
+    Rango [start, end) en epoch ms para un par de fechas del YAML.
+    end_date es inclusivo: '2024-01-01' a '2024-01-01' cubre el día completo.
+    """
+    start_ms = date_to_ms(start_date)
+    end_ms = date_to_ms(end_date) + int(timedelta(days=1).total_seconds() * 1000)
+    return start_ms, end_ms
@@ -0,0 +1,97 @@
+"""
+latency.py
+
+Contabilidad de latencia por etapa del paper trading.
+
+Cada barra lleva un vector de marcas time.perf_counter_ns(), una por etapa,
+en el orden de STAMPS. `received` es el momento en que el provider entrega
+la barra cerrada (el cierre de la barra visto desde este proceso); la
+marca `order` solo existe en las barras que generan una orden, y `fill`
+solo si el broker la ejecutó (no si la descartó).
+
+Las duraciones de cada etapa son restas entre marcas consecutivas, e
+incluyen la espera en la cola del loop (`queue`). El resumen da p50, p99 y
+máximo por etapa y de punta a punta, más un histograma con bins
+logarítmicos en microsegundos.
+"""
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+STAMPS = ("received", "dequeued", "features", "signal", "decision", "order", "fill")
+
+# etapa -> (marca inicial, marca final)
+STAGES = {
+    "queue": ("received", "dequeued"),
+    "features": ("dequeued", "features"),
+    "signal": ("features", "signal"),
+    "strategy": ("signal", "decision"),
+    "broker": ("order", "fill"),
+    "bar_to_decision": ("received", "decision"),
+    "bar_to_order": ("received", "order"),
+    "bar_to_fill": ("received", "fill"),
+}
+
+HIST_EDGES_US = np.logspace(0, 6, 25)     # 1 µs .. 1 s, 4 bins por década
+
+
+class LatencyRecorder:
+    """Acumula las marcas de cada barra; sin trabajo extra en el camino caliente más allá de un append."""
+
+    def __init__(self):
+        self._symbols: List[str] = []
+        self._bars: List[int] = []
+        self._stamps: List[list] = []
+
+    def new_bar(self, symbol: str, bar_timestamp: int, received_ns: int) -> list:
+        """Vector de marcas de una barra (-1 = etapa no alcanzada); el caller lo completa in place."""
+        stamps = [received_ns] + [-1] * (len(STAMPS) - 1)
+        self._symbols.append(symbol)
+        self._bars.append(bar_timestamp)
+        self._stamps.append(stamps)
+        return stamps
+
+    def __len__(self) -> int:
+        return len(self._stamps)
+
+    def frame(self) -> pd.DataFrame:
+        """Una fila por barra: marcas en ns relativas a la primera recepción (NaN = no alcanzada)."""
+        stamps = np.array(self._stamps, dtype=np.float64).reshape(-1, len(STAMPS))
+        stamps[stamps < 0] = np.nan
+        if len(stamps):
+            stamps -= stamps[0, 0]
+        df = pd.DataFrame(stamps, columns=[f"{s}_ns" for s in STAMPS])
+        df.insert(0, "symbol", self._symbols)
+        df.insert(0, "timestamp", pd.to_datetime(np.asarray(self._bars, dtype=np.int64), unit="ms"))
+        return df
+
+    def durations_us(self) -> Dict[str, np.ndarray]:
+        """Duración de cada etapa en µs, solo en las barras que la completaron."""
+        stamps = np.array(self._stamps, dtype=np.float64).reshape(-1, len(STAMPS))
+        stamps[stamps < 0] = np.nan
+        col = {name: i for i, name in enumerate(STAMPS)}
+        out = {}
+        for stage, (start, end) in STAGES.items():
+            d = (stamps[:, col[end]] - stamps[:, col[start]]) / 1e3
+            out[stage] = d[~np.isnan(d)]
+        return out
+
+    def summary(self) -> Dict[str, dict]:
+        """p50 / p99 / max (µs) e histograma logarítmico de cada etapa."""
+        out = {}
+        for stage, d in self.durations_us().items():
+            if len(d) == 0:
+                out[stage] = {"count": 0}
+                continue
+            counts, _ = np.histogram(np.clip(d, HIST_EDGES_US[0], HIST_EDGES_US[-1]), bins=HIST_EDGES_US)
+            p50, p99 = np.percentile(d, [50, 99])
+            out[stage] = {
+                "count": int(len(d)),
+                "p50_us": float(p50),
+                "p99_us": float(p99),
+                "max_us": float(d.max()),
+                "mean_us": float(d.mean()),
+                "histogram": {"edges_us": HIST_EDGES_US.tolist(), "counts": counts.tolist()},
+            }
+        return out
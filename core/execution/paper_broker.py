@@ -0,0 +1,95 @@
+"""
+paper_broker.py
+
+Broker simulado para paper trading. Llena cada orden de mercado al precio
+de referencia (el cierre de la barra que la generó) más el deslizamiento,
+cobra la comisión sobre el nocional y lleva caja, posiciones y equity
+marcada a mercado. Mismos costos que el backtester (fee_bps y
+slippage_bps por unidad de nocional operado), así el paper trading y el
+backtest de la misma regla son comparables.
+
+`submit` es una corrutina para que un broker real (con round trip al
+exchange) tenga la misma interfaz; `fill_delay_ms` simula esa demora.
+"""
+import asyncio
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+
+@dataclass
+class Order:
+    symbol: str
+    quantity: float            # > 0 compra, < 0 venta (unidades del activo)
+    reference_price: float     # cierre de la barra que generó la orden
+    bar_timestamp: int         # ms de la barra
+    target_position: float     # fracción del capital buscada con la orden
+
+
+@dataclass
+class Fill:
+    symbol: str
+    quantity: float
+    price: float               # precio de referencia ± deslizamiento
+    fee: float
+    bar_timestamp: int
+    target_position: float
+    cash_after: float
+    position_after: float
+
+
+@dataclass
+class PaperBroker:
+    initial_cash: float = 10_000.0
+    fee_bps: float = 10.0
+    slippage_bps: float = 5.0
+    fill_delay_ms: float = 0.0          # demora simulada entre submit y fill
+    min_notional: float = 0.0           # órdenes menores se descartan
+    cash: float = field(init=False)
+    positions: Dict[str, float] = field(init=False, default_factory=dict)
+    last_prices: Dict[str, float] = field(init=False, default_factory=dict)
+    fills: List[Fill] = field(init=False, default_factory=list)
+
+    def __post_init__(self):
+        self.cash = self.initial_cash
+
+    def mark(self, symbol: str, price: float):
+        """Actualiza el último precio de `symbol` (marca a mercado)."""
+        self.last_prices[symbol] = price
+
+    @property
+    def equity(self) -> float:
+        return self.cash + sum(qty * self.last_prices.get(s, 0.0) for s, qty in self.positions.items())
+
+    def position(self, symbol: str) -> float:
+        return self.positions.get(symbol, 0.0)
+
+    def order_for_target(self, symbol: str, target: float, price: float, bar_timestamp: int) -> Order:
+        """Orden que lleva la posición de `symbol` a `target` (fracción de la equity actual)."""
+        self.mark(symbol, price)
+        quantity = target * self.equity / price - self.position(symbol)
+        return Order(symbol, quantity, price, bar_timestamp, target)
+
+    async def submit(self, order: Order) -> Optional[Fill]:
+        """Ejecuta la orden; None si se descarta por debajo de min_notional (la posición no cambia)."""
+        if self.fill_delay_ms > 0:
+            await asyncio.sleep(self.fill_delay_ms / 1000)
+        if abs(order.quantity * order.reference_price) < max(self.min_notional, 1e-12):
+            return None
+        side = 1.0 if order.quantity > 0 else -1.0
+        price = order.reference_price * (1.0 + side * self.slippage_bps / 1e4)
+        notional = order.quantity * price
+        fee = abs(notional) * self.fee_bps / 1e4
+        self.cash -= notional + fee
+        self.positions[order.symbol] = self.position(order.symbol) + order.quantity
+        fill = Fill(order.symbol, order.quantity, price, fee, order.bar_timestamp, order.target_position,
+                    self.cash, self.positions[order.symbol])
+        self.fills.append(fill)
+        return fill
+
+    def fills_frame(self) -> pd.DataFrame:
+        columns = list(Fill.__dataclass_fields__)
+        df = pd.DataFrame([vars(f) for f in self.fills], columns=columns)
+        df.insert(0, "timestamp", pd.to_datetime(df.pop("bar_timestamp"), unit="ms"))
+        return df
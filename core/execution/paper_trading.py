@@ -0,0 +1,133 @@
+"""
+paper_trading.py
+
+Runtime asyncio del paper trading (flujo realtime del README):
+
+    provider.stream_candles → LiveCandleFeed → features incrementales
+        → señal → estrategia → PaperBroker
+
+El feed corre como una tarea y deja cada vela cerrada en su cola; el loop
+de trading la consume y hace el resto de las etapas en línea, sin saltos
+entre tareas (cada salto por una cola le suma al menos una vuelta del
+event loop a la latencia). Cada etapa deja su marca en el LatencyRecorder.
+
+Con un ReplayProvider el mismo runtime corre offline sobre velas grabadas,
+acelerado por `speed`.
+"""
+import asyncio
+import time
+from typing import Dict, List
+
+import pandas as pd
+
+from core.data.live_feed import LiveCandleFeed
+from core.data.models import CandleBatch
+from core.execution.latency import LatencyRecorder, STAMPS
+from core.execution.paper_broker import PaperBroker
+from core.execution.signals import ThresholdStrategy
+from core.features.ohlcv.incremental import IncrementalOHLCVEngine
+from utils.logger import log
+
+OHLCV = ("open", "high", "low", "close", "volume")
+_DEQUEUED, _FEATURES, _SIGNAL, _DECISION, _ORDER, _FILL = range(1, len(STAMPS))
+
+
+class TimedCandleFeed(LiveCandleFeed):
+    """LiveCandleFeed que además marca (perf_counter_ns) el momento en que el provider entrega cada vela."""
+
+    async def _consume(self, symbol: str):
+        buffer = self.buffers[symbol]
+        async for row in self.provider.stream_candles(symbol, self.interval):
+            received = time.perf_counter_ns()
+            buffer.append(*row)
+            await self.queue.put((symbol, row, received))
+
+
+class PaperTradingRuntime:
+    """
+    Une feed, motor incremental de features (uno por símbolo), señal,
+    estrategia y broker. `run()` termina cuando termina el feed (el replay
+    termina; el live no).
+    """
+
+    def __init__(self, feed: TimedCandleFeed, indicators, signal, strategy: ThresholdStrategy,
+                 broker: PaperBroker, recorder: LatencyRecorder = None):
+        self.feed = feed
+        self.engines = {s: IncrementalOHLCVEngine(indicators) for s in feed.symbols}
+        available = set(OHLCV) | set(next(iter(self.engines.values())).columns)
+        missing = [col for col in signal.columns if col not in available]
+        if missing:
+            raise ValueError(f"La señal usa columnas que no se calculan en vivo: {missing}")
+        self.signal = signal
+        self.strategy = strategy
+        self.broker = broker
+        self.recorder = recorder if recorder is not None else LatencyRecorder()
+        self.targets: Dict[str, float] = {s: 0.0 for s in feed.symbols}
+        self.last_bar: Dict[str, int] = {}
+        self.equity: List[tuple] = []          # (timestamp, symbol, equity, posición objetivo)
+        self.skipped = 0                       # velas repetidas o fuera de orden
+        self.dropped = 0                       # órdenes descartadas por el broker (min_notional)
+
+    def warmup(self):
+        """Calienta los indicadores con las velas que ya están en los buffers del feed (feed.bootstrap)."""
+        for symbol, engine in self.engines.items():
+            window = self.feed.window(symbol)
+            if len(window):
+                engine.bootstrap(CandleBatch(window.copy()).to_frame())
+                self.last_bar[symbol] = int(window["timestamp"][-1])
+
+    async def _trade(self):
+        clock = time.perf_counter_ns
+        queue = self.feed.queue
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            symbol, row, received = item
+            ts, o, h, l, c, v = row
+            # El motor incremental no puede deshacer una vela: las re-emitidas se ignoran
+            if ts <= self.last_bar.get(symbol, -1):
+                self.skipped += 1
+                continue
+            self.last_bar[symbol] = ts
+            stamps = self.recorder.new_bar(symbol, ts, received)
+            stamps[_DEQUEUED] = clock()
+
+            features = self.engines[symbol].update(o, h, l, c, v)
+            features.update(open=o, high=h, low=l, close=c, volume=v)
+            stamps[_FEATURES] = clock()
+
+            score = self.signal.score(features)
+            stamps[_SIGNAL] = clock()
+
+            target = self.strategy.target(score)
+            order = None
+            if target != self.targets[symbol]:
+                order = self.broker.order_for_target(symbol, target, c, ts)
+            else:
+                self.broker.mark(symbol, c)
+            stamps[_DECISION] = clock()
+
+            if order is not None:
+                stamps[_ORDER] = clock()
+                fill = await self.broker.submit(order)
+                if fill is not None:
+                    stamps[_FILL] = clock()
+                    self.targets[symbol] = target
+                else:
+                    # Sin fill la posición sigue donde estaba: la próxima barra reintenta
+                    self.dropped += 1
+            self.equity.append((ts, symbol, self.broker.equity, self.targets[symbol]))
+
+    async def run(self):
+        self.warmup()
+        await asyncio.gather(self.feed.run(), self._trade())
+        if self.skipped:
+            log.warning(f"⚠️ [paper] {self.skipped} velas repetidas o fuera de orden ignoradas")
+        if self.dropped:
+            log.warning(f"⚠️ [paper] {self.dropped} órdenes descartadas por el broker (debajo de min_notional)")
+
+    def equity_frame(self) -> pd.DataFrame:
+        df = pd.DataFrame(self.equity, columns=["timestamp", "symbol", "equity", "target_position"])
+        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
+        return df
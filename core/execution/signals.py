@@ -0,0 +1,86 @@
+"""
+signals.py
+
+Señal y lógica de estrategia del paper trading.
+
+Un modelo de señal recibe las features de la barra recién cerrada (dict
+columna -> valor, las del motor incremental más open/high/low/close/volume)
+y devuelve un score. ThresholdStrategy lo convierte en posición objetivo
+con la misma regla que el backtester (score > upper → largo, score < lower
+→ corto, NaN → sin posición), así una combinación de la grilla de
+run_backtest.py se puede correr tal cual en paper.
+"""
+import math
+import os
+import warnings
+from typing import Dict, List
+
+import numpy as np
+
+
+class FeatureSignal:
+    """Score = una columna de features (p. ej. rsi_14, la `signal` del backtest)."""
+
+    def __init__(self, column: str):
+        self.column = column
+        self.name = column
+        self.columns = [column]
+
+    def score(self, features: Dict[str, float]) -> float:
+        return features[self.column]
+
+
+class ModelSignal:
+    """
+    Score = probabilidad de la clase 1 de un estimador sklearn guardado con
+    joblib (p. ej. un Pipeline escalador + modelo). Las columnas salen de
+    `feature_names_in_` si el modelo se ajustó con un DataFrame; si no, hay
+    que pasarlas. Solo puede usar columnas que existan en vivo.
+    """
+
+    def __init__(self, model_path: str, columns: List[str] = None):
+        import joblib
+
+        self.model = joblib.load(model_path)
+        self.name = os.path.basename(model_path)
+        names = getattr(self.model, "feature_names_in_", None)
+        self.columns = list(columns) if columns else (list(names) if names is not None else None)
+        if not self.columns:
+            raise ValueError(f"{model_path}: el modelo no guarda feature_names_in_; indicar `columns`")
+        self._row = np.empty((1, len(self.columns)))
+
+    def score(self, features: Dict[str, float]) -> float:
+        self._row[0] = [features[col] for col in self.columns]
+        if np.isnan(self._row).any():
+            return math.nan
+        # Arreglo en vez de DataFrame de una fila (~10x menos overhead por barra);
+        # sklearn avisa que faltan los nombres de columnas, el orden ya es el del ajuste.
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            return float(self.model.predict_proba(self._row)[0, 1])
+
+
+class ThresholdStrategy:
+    """Posición objetivo por umbrales, en fracción del capital (recortada a max_position)."""
+
+    def __init__(self, upper: float, lower: float = None, max_position: float = 1.0, long_only: bool = False):
+        self.upper = upper
+        self.lower = lower
+        self.max_position = max_position
+        self.long_only = long_only
+
+    def target(self, score: float) -> float:
+        if math.isnan(score):
+            return 0.0                      # sin señal = sin posición
+        if score > self.upper:
+            return self.max_position
+        if self.lower is not None and score < self.lower and not self.long_only:
+            return -self.max_position
+        return 0.0
+
+
+def build_signal(cfg: dict):
+    """`model_path` (+ `columns` opcional) → ModelSignal; si no, `signal` → FeatureSignal."""
+    if cfg.get("model_path"):
+        return ModelSignal(cfg["model_path"], cfg.get("columns"))
+    return FeatureSignal(cfg["signal"])
@@ -0,0 +1,135 @@
+"""
+start_paper_trading.py
+
+Paper trading con la sección `paper_trading` del YAML. Con `replay_csv`
+reproduce offline un CSV grabado de shared/data; si no, reproduce el
+CandleStore de market_data (provider, fechas). `speed` acelera el replay
+respecto del tiempo real (0 = sin pausas). Las primeras `warmup_bars`
+velas solo calientan los indicadores.
+
+Escribe en output_path/<symbol>_<interval>/paper_trading/:
+  - fills.csv     (órdenes ejecutadas por el broker simulado)
+  - equity.csv    (equity marcada a mercado en cada barra)
+  - latency.csv   (marcas por etapa de cada barra, ns)
+  - summary.json  (p50/p99 e histograma por etapa, PnL, configuración)
+
+    python core/execution/start_paper_trading.py config/experiment_test.yaml
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir)))
+
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from core.data.replay_provider import ReplayProvider
+from core.data.store import CandleStore, DEFAULT_STORE_ROOT
+from core.data.timeframes import interval_to_ms
+from core.execution.latency import LatencyRecorder
+from core.execution.paper_broker import PaperBroker
+from core.execution.paper_trading import PaperTradingRuntime, TimedCandleFeed
+from core.execution.signals import ThresholdStrategy, build_signal
+from utils.config_loader import load_yaml
+from utils.logger import log
+
+
+def build_replay(md: dict, pt_cfg: dict) -> ReplayProvider:
+    speed = pt_cfg.get("speed", 0.0)
+    if pt_cfg.get("replay_csv"):
+        return ReplayProvider.from_csv(pt_cfg["replay_csv"], md["symbol"], md["interval"], speed=speed)
+    return ReplayProvider(md["provider"], md["start_date"], md["end_date"],
+                          store=CandleStore(md.get("store_path", DEFAULT_STORE_ROOT)), speed=speed)
+
+
+def main(config_path: str):
+    config = load_yaml(config_path)
+    md = config["market_data"]
+    pt_cfg = config["paper_trading"]
+    symbol, interval = md["symbol"], md["interval"]
+    output_dir = Path(config["output_path"]) / f"{symbol}_{interval}" / "paper_trading"
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    replay = build_replay(md, pt_cfg)
+    # Las primeras warmup_bars velas del rango quedan como historia: el replay arranca después
+    warmup_bars = pt_cfg.get("warmup_bars", 100)
+    candles = replay.get_range(symbol, interval, replay.start_ms, replay.end_ms)
+    if len(candles) <= warmup_bars:
+        log.error(f"⚠️  Solo hay {len(candles)} velas en el rango y warmup_bars={warmup_bars}.")
+        exit(1)
+    replay.start_ms = int(candles.timestamps[warmup_bars])
+
+    feed = TimedCandleFeed(replay, [symbol], interval, window=max(warmup_bars, 1))
+    feed.bootstrap(replay.start_ms)
+    signal = build_signal(pt_cfg)
+    strategy = ThresholdStrategy(pt_cfg["upper"], pt_cfg.get("lower"), pt_cfg.get("max_position", 1.0),
+                                 pt_cfg.get("long_only", False))
+    broker = PaperBroker(
+        initial_cash=pt_cfg.get("initial_cash", 10_000.0),
+        fee_bps=pt_cfg.get("fee_bps", 10.0),
+        slippage_bps=pt_cfg.get("slippage_bps", 5.0),
+        fill_delay_ms=pt_cfg.get("fill_delay_ms", 0.0),
+        min_notional=pt_cfg.get("min_notional", 0.0),
+    )
+    recorder = LatencyRecorder()
+    runtime = PaperTradingRuntime(feed, pt_cfg.get("indicators", "all"), signal, strategy, broker, recorder)
+
+    speed = replay.speed
+    bar_budget_us = interval_to_ms(interval) * 1e3 / speed if speed > 0 else None
+    log.info(f"[cyan]🧾 Paper trading {symbol} {interval}: {len(candles) - warmup_bars} velas de replay "
+             f"(speed={speed:g}, {warmup_bars} de calentamiento), señal {signal.name}[/cyan]")
+
+    start = time.perf_counter()
+    asyncio.run(runtime.run())
+    elapsed = time.perf_counter() - start
+
+    latency = recorder.summary()
+    late = None
+    if bar_budget_us is not None:
+        late = int((recorder.durations_us()["bar_to_decision"] > bar_budget_us).sum())
+    fills = broker.fills_frame()
+    equity = runtime.equity_frame()
+    fills.to_csv(output_dir / "fills.csv", index=False)
+    equity.to_csv(output_dir / "equity.csv", index=False)
+    recorder.frame().to_csv(output_dir / "latency.csv", index=False)
+
+    final_equity = broker.equity
+    summary = {
+        "symbol": symbol,
+        "interval": interval,
+        "bars": len(recorder),
+        "speed": speed,
+        "elapsed_sec": elapsed,
+        "bar_budget_us": bar_budget_us,
+        "late_bars": late,
+        "signal": {"name": signal.name, "columns": signal.columns},
+        "strategy": {"upper": strategy.upper, "lower": strategy.lower, "max_position": strategy.max_position,
+                     "long_only": strategy.long_only},
+        "costs": {"fee_bps": broker.fee_bps, "slippage_bps": broker.slippage_bps,
+                  "fill_delay_ms": broker.fill_delay_ms},
+        "pnl": {"initial_cash": broker.initial_cash, "final_equity": final_equity,
+                "total_return": final_equity / broker.initial_cash - 1.0,
+                "fills": len(fills), "dropped_orders": runtime.dropped, "fees": float(fills["fee"].sum()) if len(fills) else 0.0},
+        "latency": latency,
+    }
+    with open(output_dir / "summary.json", "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+    log.info(f"    ⏱️ {len(recorder)} barras en {elapsed:.2f}s; latencia cierre → decisión / orden (µs):")
+    for stage in ("queue", "features", "signal", "strategy", "broker", "bar_to_decision", "bar_to_order"):
+        s = latency[stage]
+        if s["count"]:
+            log.info(f"       {stage:<16} p50 {s['p50_us']:>9.1f}  p99 {s['p99_us']:>9.1f}  "
+                     f"max {s['max_us']:>9.1f}  (n={s['count']})")
+    if late:
+        log.warning(f"⚠️ [paper] {late} barras tardaron más que el intervalo entre velas ({bar_budget_us:.0f} µs)")
+    log.info(f"    💰 {len(fills)} fills, equity {final_equity:,.2f} ({summary['pnl']['total_return']:+.2%})")
+    log.info("[green]✅ Paper trading completado[/green]")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        log.error("⚠️  Debes indicar el path del archivo YAML.")
+        exit(1)
+    main(sys.argv[1])
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+
+from core.features.shared.ipc import read_frame, write_frame
+from utils.logger import log
+
+FEATURES_ROOT = Path(__file__).resolve().parent
+DEFAULT_CACHE_ROOT = "shared/feature_cache"
+DEFAULT_MAX_SIZE_MB = 2048
+
+# Claves de la sección del grupo que no cambian el resultado (solo cómo se ejecuta)
+EXECUTION_KEYS = {"enabled", "isolated"}
+
+# Código común por el que pasa cualquier grupo (registro, CLI del subproceso, IPC, chunks)
+SHARED_CODE = ("chunked.py", "registry.py", "scheduler.py", "shared/*.py")
+
+
+def hash_frame(df: pd.DataFrame) -> str:
+    """Hash del contenido de las velas (columnas, dtypes y valores)."""
+    h = hashlib.sha256()
+    for col in df.columns:
+        values = df[col].to_numpy()
+        h.update(f"{col}:{values.dtype}".encode())
+        if values.dtype == object:
+            h.update(pd.util.hash_pandas_object(df[col], index=False).to_numpy().tobytes())
+        else:
+            h.update(values.tobytes())
+    return h.hexdigest()
+
+
+def generator_version(group: str) -> str:
+    """
+    Versión del código del grupo: hash de los .py de core/features/<group>/
+    más el código común (SHARED_CODE). Rutas relativas a este archivo, no al
+    directorio de trabajo.
+    """
+    group_dir = FEATURES_ROOT / group
+    if not group_dir.is_dir():
+        raise ValueError(f"No existe el código del grupo '{group}' ({group_dir})")
+    paths = set(group_dir.glob("*.py"))
+    for pattern in SHARED_CODE:
+        paths.update(FEATURES_ROOT.glob(pattern))
+    h = hashlib.sha256()
+    for path in sorted(paths):
+        h.update(path.relative_to(FEATURES_ROOT).as_posix().encode())
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def fitted_state(group: str, config: dict) -> Optional[str]:
+    """
+    Hash del estado ajustado del que dependen las features del grupo, guardado
+    aparte del código y de la config (hoy: el transformador de nonlinear).
+    None si el grupo no tiene estado; "missing" si todavía no fue ajustado.
+    """
+    if group != "nonlinear":
+        return None
+    from core.features.nonlinear.generate_features import model_path
+
+    path = model_path(config)
+    if not path.exists():
+        return "missing"
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    saved_sec: float = 0.0               # tiempo de cómputo original de los grupos servidos desde caché
+    evicted: int = 0
+    groups: Dict[str, str] = field(default_factory=dict)  # grupo -> hit | miss
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class FeatureCache:
+    """
+    Caché en disco de las features de cada grupo, direccionada por contenido.
+
+    La clave es el hash de (velas de entrada, sección de config del grupo,
+    versión del código del generador, estado ajustado): si cualquiera cambia, el grupo se
+    recalcula; si no, se lee el Arrow guardado. Cada entrada es
+    <key>.arrow + <key>.json (grupo y tiempo de cómputo). Cuando el total
+    supera `max_size_mb` se borran las entradas usadas hace más tiempo
+    (LRU por mtime, que se actualiza en cada hit).
+    """
+
+    def __init__(self, root: str = DEFAULT_CACHE_ROOT, max_size_mb: float = DEFAULT_MAX_SIZE_MB):
+        self.root = Path(root)
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.stats = CacheStats()
+
+    def key(self, group: str, candles_hash: str, group_cfg: dict, state: str = None) -> str:
+        cfg = {k: v for k, v in group_cfg.items() if k not in EXECUTION_KEYS}
+        payload = json.dumps(
+            {"group": group, "candles": candles_hash, "config": cfg, "code": generator_version(group),
+             "state": state},
+            sort_keys=True, default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _paths(self, key: str):
+        return self.root / f"{key}.arrow", self.root / f"{key}.json"
+
+    def get(self, group: str, key: str) -> Optional[pd.DataFrame]:
+        data_path, meta_path = self._paths(key)
+        if not data_path.exists():
+            self.stats.misses += 1
+            self.stats.groups[group] = "miss"
+            return None
+
+        df = read_frame(data_path)
+        now = time.time()
+        os.utime(data_path, (now, now))
+        compute_sec = 0.0
+        if meta_path.exists():
+            with open(meta_path, "r", encoding="utf-8") as f:
+                compute_sec = json.load(f).get("compute_sec", 0.0)
+        self.stats.hits += 1
+        self.stats.saved_sec += compute_sec
+        self.stats.groups[group] = "hit"
+        log.info(f"[green]♻️ {group}: features desde caché ({key[:12]})[/green]")
+        return df
+
+    def put(self, group: str, key: str, df: pd.DataFrame, compute_sec: float):
+        data_path, meta_path = self._paths(key)
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = data_path.with_suffix(".tmp.arrow")
+        write_frame(df, tmp_path)
+        os.replace(tmp_path, data_path)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({"group": group, "compute_sec": compute_sec, "rows": len(df)}, f)
+        self.evict()
+
+    def size_bytes(self) -> int:
+        return sum(p.stat().st_size for p in self.root.glob("*.arrow"))
+
+    def evict(self):
+        """Borra entradas por antigüedad de último uso hasta quedar bajo max_size_mb."""
+        entries = sorted(((p.stat().st_mtime, p.stat().st_size, p) for p in self.root.glob("*.arrow")),
+                         key=lambda e: e[0])
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink()
+            path.with_suffix(".json").unlink(missing_ok=True)
+            total -= size
+            self.stats.evicted += 1
@@ -0,0 +1,144 @@
+"""
+Generación de features por chunks (out-of-core).
+
+Las velas (48 bytes por fila) se cargan enteras; lo que crece con la
+historia es la matriz de features, así que se genera por chunks de filas
+consecutivas que se escriben directo al FeatureMatrixStore.
+
+Cada grupo declara cómo correr por chunks con un ChunkRunner
+(registry.register_chunk_runner):
+
+- WindowChunkRunner: grupo sin estado cuyas features de una fila dependen
+  solo de las `warmup` filas anteriores (ventanas rolling). Cada chunk se
+  calcula con esas filas de historia antepuestas y después se descartan.
+- IncrementalChunkRunner: grupo con estado (EMAs, sumas de Wilder, OBV...)
+  que no tiene un warm-up finito exacto; un motor incremental recorre los
+  chunks en orden y arrastra el estado entre ellos.
+
+Con cualquiera de los dos el resultado unido es el mismo que corriendo
+sobre toda la historia.
+"""
+import math
+from typing import Callable, Dict, List
+
+import pandas as pd
+
+from core.features.registry import get_chunk_runner
+from core.features.shared.matrix_store import FeatureMatrixStore, build_feature_matrix
+from utils.logger import log
+
+MIN_CHUNK_ROWS = 1024
+PROBE_ROWS = 256
+# Memoria de trabajo por byte de salida: frames intermedios de los generadores + matriz unida + batch Arrow
+MEMORY_OVERHEAD = 4
+
+
+class WindowChunkRunner:
+    """
+    `align`: los chunks empiezan en múltiplos de estas filas (el kernel de
+    stats ancla su grilla interna en la posición absoluta de la fila, que
+    le llega como índice del frame).
+    """
+
+    def __init__(self, fn: Callable[[pd.DataFrame, dict], pd.DataFrame], config: dict, warmup: int,
+                 align: int = 1):
+        self.fn = fn
+        self.config = config
+        self.warmup = warmup
+        self.align = align
+
+    def __call__(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self.fn(df, self.config)
+
+
+class IncrementalChunkRunner:
+    warmup = 0
+    align = 1
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def __call__(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self.engine.run(df)
+
+
+def estimate_chunk_rows(memory_budget_mb: float, fixed_bytes: int, bytes_per_row: int, warmup: int) -> int:
+    """Filas por chunk para que (chunk + warm-up) x bytes por fila entre en el presupuesto."""
+    available = memory_budget_mb * 1024 * 1024 - fixed_bytes
+    rows = int(available // max(bytes_per_row, 1)) - warmup
+    if rows < MIN_CHUNK_ROWS:
+        log.warning(f"⚠️ Presupuesto de {memory_budget_mb} MB muy chico para {bytes_per_row} bytes/fila; "
+                    f"uso chunks de {MIN_CHUNK_ROWS} filas")
+    return max(rows, MIN_CHUNK_ROWS)
+
+
+def generate_chunked_matrix(df: pd.DataFrame, config: dict, groups: List[str], store: FeatureMatrixStore,
+                            dtype: str = "float64", memory_budget_mb: float = 1024,
+                            chunk_rows: int = None, extra_runners: Dict[str, Callable] = None) -> Dict:
+    """
+    Genera la matriz de features de `groups` por chunks y la escribe en
+    `store`, con el mismo target que el modo normal. `extra_runners`
+    agrega runners ya armados (sin estado) por nombre de grupo, p. ej. los
+    as-of joins de intervalos mayores. Devuelve un resumen para
+    run_metadata.json.
+    """
+    # Índice posicional: las filas de cada chunk conservan su posición absoluta
+    df = df.reset_index(drop=True)
+    runners = {g: get_chunk_runner(g, config) for g in groups}
+    extra_runners = extra_runners or {}
+    max_warmup = max((r.warmup for r in list(runners.values()) + list(extra_runners.values())), default=0)
+
+    # Probe sobre el principio de la serie (con runners descartables) para medir el ancho de la salida
+    probe = df.iloc[:max_warmup + PROBE_ROWS]
+    probe_cols = sum(get_chunk_runner(g, config)(probe).shape[1] for g in groups)
+    probe_cols += sum(runner(probe).shape[1] for runner in extra_runners.values())
+    runners.update(extra_runners)
+    bytes_per_row = 8 * (df.shape[1] + probe_cols) * MEMORY_OVERHEAD
+    if chunk_rows is None:
+        chunk_rows = estimate_chunk_rows(memory_budget_mb, int(df.memory_usage(deep=True).sum()),
+                                         bytes_per_row, max_warmup)
+    align = math.lcm(*(r.align for r in runners.values())) if runners else 1
+    chunk_rows = max(chunk_rows // align, 1) * align
+
+    n_rows = len(df)
+    target = None
+    if "target" not in df.columns:
+        # Igual que en el modo normal: la última fila no tiene retorno siguiente
+        target = (df["close"].pct_change().shift(-1) > 0).astype(int)
+        n_rows -= 1
+
+    n_chunks = -(-n_rows // chunk_rows) if n_rows > 0 else 0
+    log.info(f"[cyan]🧩 Features por chunks: {n_rows:,} filas en {n_chunks} chunks de {chunk_rows:,} "
+             f"(warm-up {max_warmup}, ~{chunk_rows * bytes_per_row / 1024 ** 2:.0f} MB por chunk)[/cyan]")
+
+    writer = store.open_writer(dtype)
+    try:
+        for i, start in enumerate(range(0, n_rows, chunk_rows)):
+            end = min(start + chunk_rows, n_rows)
+            frames = {}
+            for group, runner in runners.items():
+                lo = max(0, start - runner.warmup)
+                out = runner(df.iloc[lo:end])
+                if len(out) != end - lo:
+                    raise ValueError(f"Grupo '{group}': devolvió {len(out)} filas para un chunk de {end - lo}")
+                frames[group] = out.iloc[start - lo:]
+
+            matrix, column_groups = build_feature_matrix(df.iloc[start:end], frames)
+            if target is not None:
+                matrix["target"] = target.iloc[start:end].to_numpy()
+                column_groups["target"] = "target"
+            writer.write(matrix, column_groups)
+            log.info(f"    🧩 chunk {i + 1}/{n_chunks}: filas {start:,}-{end:,}")
+    except Exception:
+        writer.abort()
+        raise
+    writer.close()
+
+    return {
+        "chunks": n_chunks,
+        "chunk_rows": chunk_rows,
+        "warmup_rows": max_warmup,
+        "rows": writer.rows,
+        "columns": len(writer.schema_columns or []),
+        "estimated_chunk_mb": chunk_rows * bytes_per_row / 1024 ** 2,
+    }
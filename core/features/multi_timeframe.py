@@ -0,0 +1,89 @@
+"""
+Features de intervalos mayores (1h, 4h...) sobre la serie base (5m).
+
+Cada grupo se calcula sobre las velas re-muestreadas al intervalo mayor
+(sin recalcular indicadores de 1h a resolución de 5m) y el resultado se
+une a los timestamps base con un as-of join sin look-ahead: una fila base
+solo ve features de velas del intervalo mayor que ya cerraron cuando cerró
+la vela base. La vela mayor que todavía se está formando al final de la
+serie (y la parcial del principio) se descarta al re-muestrear.
+"""
+import copy
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from core.data.models import CandleBatch
+from core.data.resample import resample_candles
+from core.data.timeframes import interval_to_ms
+from core.features.shared.matrix_store import INDEX_COLUMN, build_feature_matrix
+
+DEFAULT_GROUPS = ["ohlcv", "stats"]
+
+
+def resample_frame(df: pd.DataFrame, base_interval: str, interval: str) -> pd.DataFrame:
+    """Velas OHLCV de `df` agregadas a `interval`, solo velas cerradas y completas."""
+    batch = resample_candles(CandleBatch.from_frame(df), base_interval, interval, drop_partial=True)
+    return batch.to_frame()
+
+
+def timeframe_config(config: dict, interval: str, groups: List[str]) -> dict:
+    """Config para correr `groups` sobre el intervalo mayor: el resto de los grupos queda deshabilitado."""
+    htf = copy.deepcopy(config)
+    htf["market_data"]["interval"] = interval
+    for name, section in htf["features"].items():
+        if isinstance(section, dict) and "enabled" in section:
+            section["enabled"] = section["enabled"] and name in groups
+    return htf
+
+
+def asof_join(features: pd.DataFrame, interval: str, base_timestamps: pd.Series,
+              base_interval: str) -> pd.DataFrame:
+    """
+    Alinea `features` (indexado por la apertura de cada vela de `interval`)
+    a `base_timestamps` (aperturas de las velas base). La fila base que abre
+    en t cierra en t + base; ve la última vela mayor con cierre <= ese
+    momento. El resultado queda con el índice de `base_timestamps`. Ambos índices están ordenados, así que el lookup es un merge
+    lineal (get_indexer con method="pad"), no una búsqueda por fila.
+    """
+    closes = pd.DatetimeIndex(features.index) + pd.Timedelta(milliseconds=interval_to_ms(interval))
+    known_at = pd.DatetimeIndex(base_timestamps) + pd.Timedelta(milliseconds=interval_to_ms(base_interval))
+    indexer = closes.get_indexer(known_at, method="pad")
+
+    missing = indexer < 0
+    columns = {}
+    for col in features.columns:
+        values = features[col].to_numpy(dtype=np.float64).take(np.maximum(indexer, 0))
+        values[missing] = np.nan
+        columns[col] = values
+    return pd.DataFrame(columns, index=base_timestamps.index)
+
+
+def timeframe_frames(htf_candles: pd.DataFrame, frames: Dict[str, pd.DataFrame],
+                     interval: str) -> Dict[str, pd.DataFrame]:
+    """
+    Features de cada grupo del intervalo mayor indexadas por la apertura de
+    su vela, sin las columnas de velas y con sufijo _<interval>; las claves
+    son "<grupo>_<interval>" (el grupo de esas columnas en la matriz).
+    """
+    out = {}
+    for group, frame in frames.items():
+        matrix, groups = build_feature_matrix(htf_candles, {group: frame})
+        matrix = matrix[[col for col, g in groups.items() if g == group]]
+        out[f"{group}_{interval}"] = matrix.rename(columns=lambda col: f"{col}_{interval}")
+    return out
+
+
+class AsofChunkRunner:
+    """ChunkRunner (ver core/features/chunked.py) que une features ya calculadas de un intervalo mayor."""
+    warmup = 0
+    align = 1
+
+    def __init__(self, features: pd.DataFrame, interval: str, base_interval: str):
+        self.features = features
+        self.interval = interval
+        self.base_interval = base_interval
+
+    def __call__(self, df: pd.DataFrame) -> pd.DataFrame:
+        return asof_join(self.features, self.interval, df[INDEX_COLUMN], self.base_interval)
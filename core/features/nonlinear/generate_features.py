@@ -1,55 +1,79 @@
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
-import argparse
+from pathlib import Path
+
 import pandas as pd
-from utils.config_loader import load_yaml
-from core.features.shared.utils import build_data_path
+from core.features.chunked import WindowChunkRunner
+from core.features.nonlinear.transformers import DEFAULT_MODEL_DIR, NonlinearTransformer
+from core.features.registry import register_chunk_runner, register_generator
+from core.features.shared.cli import run_generator_cli
 from utils.logger import log
 
-from autofeat import AutoFeatRegressor  # asumimos que este env tiene autofeat instalado
 
+def model_path(config: dict) -> Path:
+    """Dónde se guarda el transformador ajustado (features.nonlinear.model_path o uno por símbolo/intervalo/método)."""
+    cfg = config["features"]["nonlinear"]
+    if cfg.get("model_path"):
+        return Path(cfg["model_path"])
+    market = config.get("market_data", {})
+    symbol = str(market.get("symbol", "data")).replace("/", "")
+    method = cfg.get("method", "autofeat")
+    return Path(DEFAULT_MODEL_DIR) / f"{symbol}_{market.get('interval', 'na')}_{method}.joblib"
 
-def generate_nonlinear_features(df: pd.DataFrame, method: str) -> pd.DataFrame:
-    # Eliminamos columnas no numéricas si existieran
-    df_num = df.select_dtypes(include='number').dropna()
 
-    if method == "autofeat":
-        model = AutoFeatRegressor(verbose=1, feateng_steps=2)
-        X_new = model.fit_transform(df_num.drop(columns=['close'], errors='ignore'), df_num['close'] if 'close' in df_num else None)
-        return pd.DataFrame(X_new, index=df_num.index)
-    
-    raise NotImplementedError(f"Método {method} no implementado en nonlinear features.")
+def load_or_fit(df: pd.DataFrame, config: dict, allow_fit: bool = True) -> NonlinearTransformer:
+    """
+    Reusa el transformador guardado si fue ajustado con la misma spec
+    (método, columnas, params); si no, o con `refit: true`, lo ajusta sobre
+    la ventana de entrenamiento de `df` y lo guarda.
+    """
+    cfg = config["features"]["nonlinear"]
+    transformer = NonlinearTransformer(cfg.get("method", "autofeat"), columns=cfg.get("columns"),
+                                       params=cfg.get("params"), target=cfg.get("target", "close"))
+    path = model_path(config)
 
+    if path.exists() and not cfg.get("refit", False):
+        saved = NonlinearTransformer.load(path)
+        if saved.spec() == transformer.spec():
+            log.info(f"[green]♻️ nonlinear: transformador {saved.method} ajustado cargado de {path}[/green]")
+            return saved
+        log.warning(f"⚠️ {path} fue ajustado con otra configuración; se vuelve a ajustar")
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--config", required=True)
-    args = parser.parse_args()
+    if not allow_fit:
+        raise ValueError(f"No hay transformador nonlinear ajustado en {path}; corré primero el pipeline completo")
+
+    transformer.fit(df, fit_fraction=cfg.get("fit_fraction", 1.0), max_rows=cfg.get("max_fit_rows"),
+                    seed=cfg.get("seed", 0))
+    transformer.save(path)
+    info = transformer.fit_info
+    log.info(f"[cyan]💾 nonlinear: {transformer.method} ajustado con {info['rows']:,} filas "
+             f"({info['start']} → {info['end']}), guardado en {path}[/cyan]")
+    return transformer
+
+
+def generate_nonlinear_features(df: pd.DataFrame, config: dict) -> pd.DataFrame:
+    return load_or_fit(df, config).transform(df)
 
-    config = load_yaml(args.config)
-    md = config["market_data"]
+
+@register_generator("nonlinear")
+def run(df: pd.DataFrame, config: dict) -> pd.DataFrame:
     nonlinear_cfg = config["features"]["nonlinear"]
     method = nonlinear_cfg.get("method", "autofeat")
 
-    data_path = build_data_path(
-        symbol=md["symbol"],
-        interval=md["interval"],
-        start_date=md["start_date"],
-        end_date=md["end_date"],
-        provider=md["provider"]
-    )
-
-    df = pd.read_csv(data_path)
     log.info(f"[cyan]⚡ Calculando nonlinear features ({method})...[/cyan]")
+    return generate_nonlinear_features(df, config)
 
-    df_feat = generate_nonlinear_features(df, method)
 
-    output_file = "core/features/shared/temp/nonlinear_features.csv"
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    df_feat.to_csv(output_file, index=False)
+@register_chunk_runner("nonlinear")
+def chunk_runner(config: dict) -> WindowChunkRunner:
+    # transform es fila a fila; el ajuste tiene que existir de antes (no se ajusta sobre un chunk)
+    transformer = load_or_fit(None, config, allow_fit=False)
+    return WindowChunkRunner(lambda df, _: transformer.transform(df), config, warmup=0)
 
-    log.info(f"[green]✅ Features nonlinear guardadas en {output_file} ({df_feat.shape[1]} columnas)[/green]")
+
+def main():
+    run_generator_cli("nonlinear")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,145 @@
+"""
+Transformadores no lineales con API fit/transform y estado persistido.
+
+El ajuste (caro: autofeat, PCA, cuantiles...) se hace una sola vez sobre una
+ventana de entrenamiento, opcionalmente submuestreada, y el transformador
+ajustado se guarda con joblib. Después `transform` es una operación
+vectorizada sobre filas nuevas (otra corrida, chunks o velas en vivo) que
+nunca vuelve a ajustar.
+"""
+import json
+from pathlib import Path
+from typing import List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import PCA
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import KBinsDiscretizer, PolynomialFeatures, PowerTransformer, StandardScaler
+
+METHODS = ("autofeat", "pca", "poly", "quantile_bins", "yeo-johnson")
+DEFAULT_COLUMNS = ["open", "high", "low", "close", "volume"]
+DEFAULT_MODEL_DIR = "shared/models/nonlinear"
+
+
+def _build_estimator(method: str, params: dict):
+    if method == "autofeat":
+        from autofeat import AutoFeatRegressor  # solo existe en envs/nonlinear
+        return AutoFeatRegressor(verbose=params.get("verbose", 1), feateng_steps=params.get("feateng_steps", 2))
+    if method == "pca":
+        return make_pipeline(StandardScaler(), PCA(n_components=params.get("n_components", 3)))
+    if method == "poly":
+        return PolynomialFeatures(degree=params.get("degree", 2),
+                                  interaction_only=params.get("interaction_only", False), include_bias=False)
+    if method == "quantile_bins":
+        return KBinsDiscretizer(n_bins=params.get("n_bins", 10), encode="ordinal", strategy="quantile")
+    if method == "yeo-johnson":
+        return PowerTransformer(method="yeo-johnson", standardize=True)
+    raise NotImplementedError(f"Método {method} no implementado en nonlinear features. Opciones: {METHODS}")
+
+
+def _output_names(method: str, estimator, columns: List[str], n_out: int) -> List[str]:
+    if method == "autofeat":
+        return [str(c) for c in estimator.new_feat_cols_]
+    if method == "pca":
+        return [f"pca_{i}" for i in range(n_out)]
+    if method == "poly":
+        return [f"poly_{name.replace(' ', '*')}" for name in estimator.get_feature_names_out(columns)]
+    if method == "quantile_bins":
+        return [f"{col}_qbin" for col in columns]
+    return [f"{col}_yj" for col in columns]
+
+
+class NonlinearTransformer:
+    """
+    `fit(df)` ajusta sobre las filas de entrenamiento de `df`; `transform(df)`
+    devuelve un frame con el mismo índice (NaN donde falta algún input).
+    """
+
+    def __init__(self, method: str, columns: List[str] = None, params: dict = None, target: str = "close"):
+        if method not in METHODS:
+            raise NotImplementedError(f"Método {method} no implementado en nonlinear features. Opciones: {METHODS}")
+        self.method = method
+        self.requested_columns = list(columns or DEFAULT_COLUMNS)
+        self.columns = list(self.requested_columns)
+        self.params = dict(params or {})
+        self.target = target
+        self.estimator = None
+        self.output_columns: Optional[List[str]] = None
+        self.fit_info: dict = {}
+
+    def _inputs(self, df: pd.DataFrame) -> pd.DataFrame:
+        cols = [c for c in self.columns if c in df.columns]
+        # autofeat regresiona sobre `target`, así que no puede ser también un input
+        if self.method == "autofeat":
+            cols = [c for c in cols if c != self.target]
+        return df[cols]
+
+    def fit(self, df: pd.DataFrame, fit_fraction: float = 1.0, max_rows: int = None, seed: int = 0):
+        """
+        Ajusta sobre la primera `fit_fraction` de las filas (ventana de
+        entrenamiento, sin mirar el futuro) y, si pasan de `max_rows`, sobre
+        una submuestra aleatoria de esa ventana.
+        """
+        train = df.iloc[:max(int(len(df) * fit_fraction), 1)]
+        X = self._inputs(train)
+        mask = X.notna().all(axis=1)
+        if self.method == "autofeat":
+            mask &= train[self.target].notna()
+        rows = np.flatnonzero(mask.to_numpy())
+        if max_rows and len(rows) > max_rows:
+            rows = np.sort(np.random.default_rng(seed).choice(rows, size=max_rows, replace=False))
+        if len(rows) == 0:
+            raise ValueError("No hay filas completas para ajustar el transformador no lineal")
+
+        self.columns = list(X.columns) + ([self.target] if self.method == "autofeat" else [])
+        self.estimator = _build_estimator(self.method, self.params)
+        X_fit = X.iloc[rows]
+        if self.method == "autofeat":
+            self.estimator.fit(X_fit, train[self.target].iloc[rows])
+        else:
+            self.estimator.fit(X_fit.to_numpy(dtype=np.float64))
+        n_out = self._transform_values(X_fit.iloc[:1]).shape[1]
+        self.output_columns = _output_names(self.method, self.estimator, list(X.columns), n_out)
+        stamps = train["timestamp"] if "timestamp" in train.columns else train.index.to_series()
+        self.fit_info = {
+            "rows": int(len(rows)),
+            "train_rows": int(len(train)),
+            "start": str(stamps.iloc[0]),
+            "end": str(stamps.iloc[-1]),
+        }
+        return self
+
+    def _transform_values(self, X: pd.DataFrame) -> np.ndarray:
+        if self.method == "autofeat":
+            out = self.estimator.transform(X)
+            # autofeat devuelve inputs + features nuevas: nos quedamos con las nuevas
+            return out[list(self.estimator.new_feat_cols_)].to_numpy(dtype=np.float64)
+        return self.estimator.transform(X.to_numpy(dtype=np.float64))
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        if self.estimator is None:
+            raise ValueError("El transformador no lineal no está ajustado (fit o load primero)")
+        X = self._inputs(df)
+        out = np.full((len(df), len(self.output_columns)), np.nan)
+        mask = X.notna().all(axis=1).to_numpy()
+        if mask.any():
+            out[mask] = self._transform_values(X[mask])
+        return pd.DataFrame(out, index=df.index, columns=self.output_columns)
+
+    def spec(self) -> dict:
+        """Lo que tiene que coincidir para reusar un ajuste guardado."""
+        return {"method": self.method, "columns": self.requested_columns, "params": self.params,
+                "target": self.target}
+
+    def save(self, path: str):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump(self, path)
+        with open(path.with_suffix(".json"), "w", encoding="utf-8") as f:
+            json.dump({**self.spec(), "input_columns": self.columns, "output_columns": self.output_columns, "fit": self.fit_info}, f, indent=2)
+
+    @staticmethod
+    def load(path: str) -> "NonlinearTransformer":
+        return joblib.load(path)
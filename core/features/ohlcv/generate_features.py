@@ -1,11 +1,12 @@
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
-import argparse
 import pandas as pd
 from ta import trend, momentum, volatility, volume
-from utils.config_loader import load_yaml
-from core.features.shared.utils import build_data_path
+from core.features.chunked import IncrementalChunkRunner
+from core.features.ohlcv.incremental import ALL_INDICATORS, IncrementalOHLCVEngine
+from core.features.registry import register_chunk_runner, register_generator
+from core.features.shared.cli import run_generator_cli
 from utils.logger import log
 
 
@@ -46,40 +47,26 @@ def generate_ohlcv_features(df: pd.DataFrame, indicators: list) -> pd.DataFrame:
     return df
 
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--config", required=True)
-    args = parser.parse_args()
-
-    config = load_yaml(args.config)
-    md = config["market_data"]
+@register_generator("ohlcv")
+def run(df: pd.DataFrame, config: dict) -> pd.DataFrame:
     ohlcv_cfg = config["features"]["ohlcv"]
     indicators = ohlcv_cfg.get("indicators", [])
 
     if indicators == "all":
-        indicators = [
-            "rsi", "ema", "sma", "macd", "bollinger", "williams_r", "stoch",
-            "atr", "adx", "obv", "cci", "roc"
-        ]
-
-    data_path = build_data_path(
-        symbol=md["symbol"],
-        interval=md["interval"],
-        start_date=md["start_date"],
-        end_date=md["end_date"],
-        provider=md["provider"]
-    )
+        indicators = ALL_INDICATORS
 
-    df = pd.read_csv(data_path)
     log.info(f"[cyan]📈 Calculando features OHLCV...[/cyan]")
+    return generate_ohlcv_features(df, indicators)
 
-    df_feat = generate_ohlcv_features(df, indicators)
 
-    output_file = "core/features/shared/temp/ohlcv_features.csv"
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    df_feat.to_csv(output_file, index=False)
+@register_chunk_runner("ohlcv")
+def chunk_runner(config: dict) -> IncrementalChunkRunner:
+    # EMAs, Wilder y OBV dependen de toda la historia: el motor incremental arrastra el estado entre chunks
+    return IncrementalChunkRunner(IncrementalOHLCVEngine(config["features"]["ohlcv"].get("indicators", [])))
 
-    log.info(f"[green]✅ Features OHLCV guardadas en {output_file} ({df_feat.shape[1]} columnas)[/green]")
+
+def main():
+    run_generator_cli("ohlcv")
 
 
 if __name__ == "__main__":
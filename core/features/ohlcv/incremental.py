@@ -0,0 +1,390 @@
+"""
+Motor incremental de indicadores OHLCV.
+
+Cada indicador guarda un estado compacto (EMAs, sumas de Wilder, ventanas
+acotadas) y se actualiza en O(1) por vela nueva (CCI es O(window) por la
+desviación media absoluta). Reproduce las fórmulas de `ta` 0.11 con los
+mismos parámetros que generate_ohlcv_features, así que las columnas
+coinciden con la versión batch dentro de la tolerancia numérica.
+
+Uso en vivo:
+    engine = IncrementalOHLCVEngine(indicators)
+    engine.bootstrap(df_historia)            # calienta el estado
+    feats = engine.update(o, h, l, c, v)      # dict columna -> valor
+"""
+import math
+from collections import deque
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+NAN = float("nan")
+
+ALL_INDICATORS = [
+    "rsi", "ema", "sma", "macd", "bollinger", "williams_r", "stoch",
+    "atr", "adx", "obv", "cci", "roc"
+]
+
+
+# ----------------------------------------------------------------------
+# Bloques básicos
+# ----------------------------------------------------------------------
+class _Ewm:
+    """ewm(adjust=False, min_periods) de pandas. Los NaN iniciales se ignoran."""
+
+    def __init__(self, alpha: float, min_periods: int):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = NAN
+        self.count = 0
+
+    def update(self, x: float) -> float:
+        if math.isnan(x):
+            if self.count == 0:
+                return NAN
+        elif self.count == 0:
+            self.value = x
+            self.count = 1
+        else:
+            self.value += self.alpha * (x - self.value)
+            self.count += 1
+        return self.value if self.count >= self.min_periods else NAN
+
+
+class _RollingStats:
+    """Media y desvío (ddof=0) de las últimas n observaciones con Welford deslizante."""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.window = deque(maxlen=n)
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, x: float):
+        if len(self.window) < self.n:
+            self.window.append(x)
+            delta = x - self.mean
+            self.mean += delta / len(self.window)
+            self.m2 += delta * (x - self.mean)
+        else:
+            old = self.window[0]
+            self.window.append(x)
+            old_mean = self.mean
+            self.mean += (x - old) / self.n
+            self.m2 += (x - old) * (x - self.mean + old - old_mean)
+
+    @property
+    def ready(self) -> bool:
+        return len(self.window) == self.n
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(max(self.m2, 0.0) / self.n)
+
+
+class _RollingExtreme:
+    """Máximo (o mínimo) deslizante de n observaciones con deque monótona: O(1) amortizado."""
+
+    def __init__(self, n: int, is_max: bool):
+        self.n = n
+        self.is_max = is_max
+        self.items = deque()  # (índice, valor) con valores monótonos
+        self.i = 0
+
+    def update(self, x: float) -> float:
+        items = self.items
+        if self.is_max:
+            while items and items[-1][1] <= x:
+                items.pop()
+        else:
+            while items and items[-1][1] >= x:
+                items.pop()
+        items.append((self.i, x))
+        if items[0][0] <= self.i - self.n:
+            items.popleft()
+        self.i += 1
+        return items[0][1] if self.i >= self.n else NAN
+
+
+# ----------------------------------------------------------------------
+# Indicadores (mismos parámetros por defecto que ta)
+# ----------------------------------------------------------------------
+class RSI:
+    columns = ("rsi_14",)
+
+    def __init__(self, window: int = 14):
+        self.up = _Ewm(1 / window, window)
+        self.down = _Ewm(1 / window, window)
+        self.prev_close = None
+
+    def update(self, o, h, l, c, v):
+        diff = c - self.prev_close if self.prev_close is not None else NAN
+        self.prev_close = c
+        # ta: diff.where(diff > 0, 0.0) -> la primera vela cuenta como 0
+        up = self.up.update(diff if diff > 0 else 0.0)
+        down = self.down.update(-diff if diff < 0 else 0.0)
+        if down == 0:
+            return (100.0,)
+        return (100 - 100 / (1 + up / down),)
+
+
+class EMA:
+    columns = ("ema_10",)
+
+    def __init__(self, window: int = 10):
+        self.ema = _Ewm(2 / (window + 1), window)
+
+    def update(self, o, h, l, c, v):
+        return (self.ema.update(c),)
+
+
+class SMA:
+    columns = ("sma_10",)
+
+    def __init__(self, window: int = 10):
+        self.stats = _RollingStats(window)
+
+    def update(self, o, h, l, c, v):
+        self.stats.update(c)
+        return (self.stats.mean if self.stats.ready else NAN,)
+
+
+class MACD:
+    columns = ("macd_line", "macd_signal")
+
+    def __init__(self, fast: int = 12, slow: int = 26, sign: int = 9):
+        self.fast = _Ewm(2 / (fast + 1), fast)
+        self.slow = _Ewm(2 / (slow + 1), slow)
+        self.signal = _Ewm(2 / (sign + 1), sign)
+
+    def update(self, o, h, l, c, v):
+        macd = self.fast.update(c) - self.slow.update(c)
+        return (macd, self.signal.update(macd))
+
+
+class Bollinger:
+    columns = ("bb_high", "bb_low")
+
+    def __init__(self, window: int = 20, window_dev: float = 2):
+        self.stats = _RollingStats(window)
+        self.window_dev = window_dev
+
+    def update(self, o, h, l, c, v):
+        self.stats.update(c)
+        if not self.stats.ready:
+            return (NAN, NAN)
+        band = self.window_dev * self.stats.std
+        return (self.stats.mean + band, self.stats.mean - band)
+
+
+class WilliamsR:
+    columns = ("williams_r",)
+
+    def __init__(self, lbp: int = 14):
+        self.highest = _RollingExtreme(lbp, is_max=True)
+        self.lowest = _RollingExtreme(lbp, is_max=False)
+
+    def update(self, o, h, l, c, v):
+        hh, ll = self.highest.update(h), self.lowest.update(l)
+        if math.isnan(hh) or hh == ll:
+            return (NAN,)
+        return (-100 * (hh - c) / (hh - ll),)
+
+
+class Stochastic:
+    columns = ("stoch_k", "stoch_d")
+
+    def __init__(self, window: int = 14, smooth_window: int = 3):
+        self.highest = _RollingExtreme(window, is_max=True)
+        self.lowest = _RollingExtreme(window, is_max=False)
+        self.k_window = deque(maxlen=smooth_window)
+
+    def update(self, o, h, l, c, v):
+        smax, smin = self.highest.update(h), self.lowest.update(l)
+        if math.isnan(smax) or smax == smin:
+            k = NAN
+        else:
+            k = 100 * (c - smin) / (smax - smin)
+        self.k_window.append(k)
+        # rolling(3).mean() de pandas: NaN si falta alguna observación válida
+        d = sum(self.k_window) / len(self.k_window) if len(self.k_window) == self.k_window.maxlen else NAN
+        return (k, d)
+
+
+class ATR:
+    """ta: primeras window-1 velas en 0, luego media simple y suavizado de Wilder."""
+    columns = ("atr_14",)
+
+    def __init__(self, window: int = 14):
+        self.window = window
+        self.prev_close = None
+        self.count = 0
+        self.tr_sum = 0.0
+        self.atr = 0.0
+
+    def update(self, o, h, l, c, v):
+        if self.prev_close is None:
+            tr = h - l
+        else:
+            tr = max(h - l, abs(h - self.prev_close), abs(l - self.prev_close))
+        self.prev_close = c
+        self.count += 1
+        if self.count < self.window:
+            self.tr_sum += tr
+            return (0.0,)
+        if self.count == self.window:
+            self.atr = (self.tr_sum + tr) / self.window
+        else:
+            self.atr = (self.atr * (self.window - 1) + tr) / self.window
+        return (self.atr,)
+
+
+class ADX:
+    """
+    Réplica del ADX de ta 0.11: sumas de Wilder de TR/+DM/-DM desde la
+    vela 1, DX desde la vela `window` y ADX (0 antes de la vela 2*window-1).
+    """
+    columns = ("adx",)
+
+    def __init__(self, window: int = 14):
+        self.window = window
+        self.count = 0
+        self.prev = None  # (high, low, close)
+        self.trs = self.dip = self.din = 0.0
+        self.dx_sum = 0.0
+        self.adx = 0.0
+
+    def update(self, o, h, l, c, v):
+        w = self.window
+        k = self.count
+        self.count += 1
+        if self.prev is None:
+            self.prev = (h, l, c)
+            return (0.0,)
+        ph, pl, pc = self.prev
+        self.prev = (h, l, c)
+
+        tr = max(h, pc) - min(l, pc)
+        up, down = h - ph, pl - l
+        pos = up if (up > down and up > 0) else 0.0
+        neg = down if (down > up and down > 0) else 0.0
+
+        if k <= w:
+            # velas 1..w: suma simple inicial
+            self.trs += tr
+            self.dip += pos
+            self.din += neg
+        else:
+            self.trs += tr - self.trs / w
+            self.dip += pos - self.dip / w
+            self.din += neg - self.din / w
+        if k < w:
+            return (0.0,)
+
+        dip = 100 * self.dip / self.trs if self.trs != 0 else 0.0
+        din = 100 * self.din / self.trs if self.trs != 0 else 0.0
+        dx = 100 * abs((dip - din) / (dip + din)) if dip + din != 0 else 0.0
+
+        if k < 2 * w - 1:
+            self.dx_sum += dx
+            return (0.0,)
+        if k == 2 * w - 1:
+            self.adx = (self.dx_sum + dx) / w
+        else:
+            self.adx = (self.adx * (w - 1) + dx) / w
+        return (self.adx,)
+
+
+class OBV:
+    columns = ("obv",)
+
+    def __init__(self):
+        self.prev_close = None
+        self.obv = 0.0
+
+    def update(self, o, h, l, c, v):
+        self.obv += -v if (self.prev_close is not None and c < self.prev_close) else v
+        self.prev_close = c
+        return (self.obv,)
+
+
+class CCI:
+    columns = ("cci",)
+
+    def __init__(self, window: int = 20, constant: float = 0.015):
+        self.window = window
+        self.constant = constant
+        self.tp = deque(maxlen=window)
+        self.tp_sum = 0.0
+
+    def update(self, o, h, l, c, v):
+        tp = (h + l + c) / 3.0
+        if len(self.tp) == self.window:
+            self.tp_sum -= self.tp[0]
+        self.tp.append(tp)
+        self.tp_sum += tp
+        if len(self.tp) < self.window:
+            return (NAN,)
+        mean = self.tp_sum / self.window
+        mad = sum(abs(x - mean) for x in self.tp) / self.window
+        return ((tp - mean) / (self.constant * mad) if mad != 0 else NAN,)
+
+
+class ROC:
+    columns = ("roc",)
+
+    def __init__(self, window: int = 12):
+        self.closes = deque(maxlen=window + 1)
+
+    def update(self, o, h, l, c, v):
+        self.closes.append(c)
+        if len(self.closes) <= self.window:
+            return (NAN,)
+        prev = self.closes[0]
+        return ((c - prev) / prev * 100,)
+
+    @property
+    def window(self) -> int:
+        return self.closes.maxlen - 1
+
+
+INDICATORS = {
+    "rsi": RSI, "ema": EMA, "sma": SMA, "macd": MACD, "bollinger": Bollinger,
+    "williams_r": WilliamsR, "stoch": Stochastic, "atr": ATR, "adx": ADX,
+    "obv": OBV, "cci": CCI, "roc": ROC,
+}
+
+
+class IncrementalOHLCVEngine:
+    """Conjunto de indicadores incrementales con las mismas columnas que generate_ohlcv_features."""
+
+    def __init__(self, indicators: List[str]):
+        if indicators == "all":
+            indicators = ALL_INDICATORS
+        self.indicators = [INDICATORS[name]() for name in ALL_INDICATORS if name in indicators]
+        self.columns = [col for ind in self.indicators for col in ind.columns]
+
+    def update(self, open_: float, high: float, low: float, close: float, volume: float) -> Dict[str, float]:
+        values = []
+        for ind in self.indicators:
+            values.extend(ind.update(open_, high, low, close, volume))
+        return dict(zip(self.columns, values))
+
+    def bootstrap(self, df: pd.DataFrame):
+        """Calienta el estado recorriendo la historia (sin guardar las salidas)."""
+        self.run(df, keep=False)
+
+    def run(self, df: pd.DataFrame, keep: bool = True) -> pd.DataFrame:
+        """Procesa df vela por vela; con keep=True devuelve las columnas (para validar contra ta)."""
+        rows = zip(*(df[col].to_numpy(dtype=np.float64).tolist() for col in ("open", "high", "low", "close", "volume")))
+        out = np.full((len(df), len(self.columns)), np.nan) if keep else None
+        for i, (o, h, l, c, v) in enumerate(rows):
+            values = []
+            for ind in self.indicators:
+                values.extend(ind.update(o, h, l, c, v))
+            if keep:
+                out[i] = values
+        if not keep:
+            return None
+        return pd.DataFrame(out, columns=self.columns, index=df.index)
@@ -0,0 +1,44 @@
+import importlib
+from typing import Callable, Dict
+
+import pandas as pd
+
+# name -> fn(df, config) -> DataFrame con las features del grupo
+FEATURE_GENERATORS: Dict[str, Callable[[pd.DataFrame, dict], pd.DataFrame]] = {}
+
+
+def register_generator(name: str):
+    """Decorador: registra el generador de un grupo de features como plugin."""
+    def decorator(fn):
+        FEATURE_GENERATORS[name] = fn
+        return fn
+    return decorator
+
+
+def get_generator(name: str) -> Callable[[pd.DataFrame, dict], pd.DataFrame]:
+    """Importa core/features/<name>/generate_features.py (que se auto-registra) y devuelve el generador."""
+    if name not in FEATURE_GENERATORS:
+        importlib.import_module(f"core.features.{name}.generate_features")
+    if name not in FEATURE_GENERATORS:
+        raise ValueError(f"Grupo de features '{name}' no registrado")
+    return FEATURE_GENERATORS[name]
+
+
+# name -> fn(config) -> ChunkRunner (ver core/features/chunked.py)
+CHUNK_RUNNERS: Dict[str, Callable[[dict], Callable]] = {}
+
+
+def register_chunk_runner(name: str):
+    """Decorador: registra cómo correr el grupo por chunks (modo out-of-core)."""
+    def decorator(factory):
+        CHUNK_RUNNERS[name] = factory
+        return factory
+    return decorator
+
+
+def get_chunk_runner(name: str, config: dict):
+    """Crea un ChunkRunner nuevo para el grupo; ValueError si el grupo no soporta chunks."""
+    get_generator(name)
+    if name not in CHUNK_RUNNERS:
+        raise ValueError(f"Grupo de features '{name}' no soporta ejecución por chunks")
+    return CHUNK_RUNNERS[name](config)
@@ -1,10 +1,13 @@
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
-import argparse
+import numpy as np
 import pandas as pd
-from utils.config_loader import load_yaml
-from core.features.shared.utils import build_data_path
+from core.features.chunked import WindowChunkRunner
+from core.features.registry import register_chunk_runner, register_generator
+from core.features.relational.panel import PAIR_STATS, build_panel, pair_chunk_rows, rolling_pairwise
+from core.features.shared.cli import run_generator_cli
+from core.features.shared.utils import load_market_data
 from utils.logger import log
 
 
@@ -29,32 +32,66 @@ def generate_relational_features(df: pd.DataFrame) -> pd.DataFrame:
     return df_feat
 
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--config", required=True)
-    args = parser.parse_args()
-
-    config = load_yaml(args.config)
-    md = config["market_data"]
-
-    data_path = build_data_path(
-        symbol=md["symbol"],
-        interval=md["interval"],
-        start_date=md["start_date"],
-        end_date=md["end_date"],
-        provider=md["provider"]
-    )
-
-    df = pd.read_csv(data_path)
+def load_peer_panel(config: dict) -> pd.DataFrame:
+    """Closes de los símbolos de features.relational.symbols (mismo provider/intervalo/rango), por timestamp."""
+    market = config["market_data"]
+    symbols = config["features"]["relational"].get("symbols") or []
+    frames = {symbol: load_market_data({**market, "symbol": symbol}, config.get("quality"))
+              for symbol in symbols if symbol != market["symbol"]}
+    return build_panel(frames)
+
+
+def generate_pair_features(df: pd.DataFrame, peers: pd.DataFrame, windows: list) -> pd.DataFrame:
+    """
+    Correlación, beta, spread y z-spread del símbolo principal contra cada
+    par de `peers` (alineados por timestamp exacto; sin vela del par -> NaN).
+    """
+    origin = int(df.index[0]) if isinstance(df.index, pd.RangeIndex) and len(df) and df.index.step == 1 else 0
+    aligned = peers.reindex(pd.DatetimeIndex(df["timestamp"]))
+    prices = np.column_stack([df["close"].to_numpy(dtype=np.float64), aligned.to_numpy(dtype=np.float64)])
+    stats = rolling_pairwise(prices, windows, rows=[0], origin=origin)
+
+    columns = {}
+    for j, symbol in enumerate(peers.columns, start=1):
+        name = str(symbol).replace("/", "")
+        columns[f"spread_{name}"] = stats["spread"][:, 0, j]
+        for window in windows:
+            for stat in PAIR_STATS:
+                columns[f"{stat}_{name}_{window}"] = stats[f"{stat}_{window}"][:, 0, j]
+    return pd.DataFrame(columns, index=df.index)
+
+
+def _relational(df: pd.DataFrame, config: dict, peers: pd.DataFrame = None) -> pd.DataFrame:
+    relational_cfg = config["features"]["relational"]
+    df_feat = generate_relational_features(df)
+    if relational_cfg.get("symbols"):
+        peers = load_peer_panel(config) if peers is None else peers
+        pairs = generate_pair_features(df, peers, relational_cfg.get("windows", [288]))
+        df_feat = pd.concat([df_feat, pairs], axis=1)
+    return df_feat
+
+
+@register_generator("relational")
+def run(df: pd.DataFrame, config: dict) -> pd.DataFrame:
     log.info(f"[cyan]📊 Calculando relational features...[/cyan]")
+    return _relational(df, config)
 
-    df_feat = generate_relational_features(df)
 
-    output_file = "core/features/shared/temp/relational_features.csv"
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    df_feat.to_csv(output_file, index=False)
+@register_chunk_runner("relational")
+def chunk_runner(config: dict) -> WindowChunkRunner:
+    relational_cfg = config["features"]["relational"]
+    if not relational_cfg.get("symbols"):
+        # Features fila a fila: no necesitan historia
+        return WindowChunkRunner(run, config, warmup=0)
+    # Los pares se cargan una vez; w retornos necesitan w + 1 velas
+    peers = load_peer_panel(config)
+    windows = relational_cfg.get("windows", [288])
+    return WindowChunkRunner(lambda df, cfg: _relational(df, cfg, peers), config,
+                             warmup=max(windows), align=pair_chunk_rows(max(windows)))
 
-    log.info(f"[green]✅ Features relational guardadas en {output_file} ({df_feat.shape[1]} columnas)[/green]")
+
+def main():
+    run_generator_cli("relational")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,173 @@
+"""
+Features relacionales entre activos sobre un panel tiempo x símbolos.
+
+Para todos los pares (i, j) de N símbolos y cada ventana:
+
+- corr_w  : correlación rolling de los retornos log
+- beta_w  : beta rolling de los retornos de i contra los de j (cov / var_j)
+- spread  : log(p_i) - log(p_j)
+- zspread_w: spread estandarizado con su media y desvío rolling
+
+No hay un loop por par: las sumas prefijas de los retornos, los log
+precios y sus productos cruzados (N x N por fila) se calculan una vez y
+todas las ventanas y pares salen de restas de prefijos. Igual que en el
+kernel de stats, el panel se procesa por bloques (pair_chunk_rows, más
+el warm-up de la ventana más larga), con la grilla de bloques
+anclada en la posición absoluta `origin`: una corrida por tramos alineados
+da exactamente los mismos números. Las ventanas con algún NaN quedan en
+NaN, como `.rolling(window)` de pandas.
+"""
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+PAIR_STATS = ("corr", "beta", "zspread")
+DEFAULT_CHUNK_SIZE = 256
+
+
+def build_panel(frames: Dict[str, pd.DataFrame], column: str = "close") -> pd.DataFrame:
+    """Panel timestamp x símbolo (outer join) con la columna `column` de cada frame de velas."""
+    series = {symbol: frame.set_index("timestamp")[column] for symbol, frame in frames.items()}
+    return pd.DataFrame(series).sort_index()
+
+
+def pair_chunk_rows(max_window: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Filas por bloque (el warm-up de max_window filas no pasa del 25% del bloque)."""
+    return max(chunk_size, 4 * max_window)
+
+
+def _prefix(values: np.ndarray) -> np.ndarray:
+    out = np.empty((values.shape[0] + 1,) + values.shape[1:])
+    out[0] = 0.0
+    np.cumsum(values, axis=0, out=out[1:])
+    return out
+
+
+def _window_sum(prefix: np.ndarray, rows: slice, window: int) -> np.ndarray:
+    return prefix[rows.start + 1:rows.stop + 1] - prefix[rows.start + 1 - window:rows.stop + 1 - window]
+
+
+def iter_pairwise_blocks(prices: np.ndarray, windows: List[int], rows: List[int] = None,
+                         chunk_size: int = DEFAULT_CHUNK_SIZE,
+                         origin: int = 0) -> Iterator[Tuple[int, int, Dict[str, np.ndarray]]]:
+    """
+    Recorre `prices` (T x N) por bloques y devuelve (inicio, fin, stats) con
+    stats["spread"] y stats[f"{stat}_{w}"] de forma (fin - inicio, R, N): el
+    par (rows[a], j) en [:, a, j]. `rows` limita los símbolos de la izquierda
+    (por defecto todos: N x N pares).
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    n, n_symbols = prices.shape
+    rows = list(range(n_symbols)) if rows is None else list(rows)
+    windows = sorted(set(windows))
+    warmup = max(windows)
+    chunk_size = pair_chunk_rows(warmup, chunk_size)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_p = np.log(prices)
+        start = 0
+        while start < n:
+            # Bloques alineados a múltiplos de chunk_size en posición absoluta
+            end = min(((origin + start) // chunk_size + 1) * chunk_size - origin, n)
+            lo = max(start - warmup, 0)
+            yield start, end, _block_stats(log_p[lo:end], start - lo, windows, rows)
+            start = end
+
+
+def _block_stats(log_p: np.ndarray, head: int, windows: List[int], rows: List[int]) -> Dict[str, np.ndarray]:
+    """Stats de las filas log_p[head:] usando las filas anteriores como warm-up."""
+    returns = np.full_like(log_p, np.nan)
+    returns[1:] = log_p[1:] - log_p[:-1]
+    has_nan = bool(np.isnan(log_p).any())
+
+    # Log precios centrados en la media del bloque: los prefijos cuadráticos no pierden precisión
+    valid = ~np.isnan(log_p)
+    center = np.where(valid, log_p, 0.0).sum(axis=0) / np.maximum(valid.sum(axis=0), 1)
+    x = np.nan_to_num(log_p - center, nan=0.0)
+    y = np.nan_to_num(returns, nan=0.0)
+    x_prefix, y_prefix = _prefix(x), _prefix(y)
+    x2_prefix, y2_prefix = _prefix(x * x), _prefix(y * y)
+    xx_prefix = _prefix(x[:, rows, None] * x[:, None, :])      # (L+1, R, N)
+    yy_prefix = _prefix(y[:, rows, None] * y[:, None, :])
+    x_invalid = _prefix(np.isnan(log_p).astype(np.float64))
+    y_invalid = _prefix(np.isnan(returns).astype(np.float64))
+
+    n_out = len(log_p) - head
+    cur = log_p[head:]
+    stats = {"spread": cur[:, rows, None] - cur[:, None, :]}
+    x_cur = x[head:]
+    spread_c = x_cur[:, rows, None] - x_cur[:, None, :]
+
+    def pair_invalid(invalid_prefix, valid_rows, window):
+        bad = _window_sum(invalid_prefix, valid_rows, window) > 0
+        return bad[:, rows, None] | bad[:, None, :]
+
+    for window in windows:
+        w = float(window)
+        shape = (n_out, len(rows), log_p.shape[1])
+        corr, beta, zspread = np.full(shape, np.nan), np.full(shape, np.nan), np.full(shape, np.nan)
+
+        # Filas con la ventana completa dentro del bloque (las primeras de la serie no la tienen):
+        # w retornos necesitan w + 1 precios, el spread solo w
+        first = max(window - head, 0)
+        valid_rows = slice(head + first, len(log_p))
+        if valid_rows.start < valid_rows.stop:
+            sy = _window_sum(y_prefix, valid_rows, window)
+            cov = _window_sum(yy_prefix, valid_rows, window)
+            cov -= sy[:, rows, None] * (sy[:, None, :] / w)
+            var = _window_sum(y2_prefix, valid_rows, window)
+            var -= sy * sy / w
+            var[var <= 0] = np.nan                 # serie plana: corr y beta indefinidas
+            inv_std = 1.0 / np.sqrt(var)           # el (w - 1) de cov y var se cancela
+            out = corr[first:]
+            np.multiply(cov, inv_std[:, rows, None], out=out)
+            out *= inv_std[:, None, :]
+            out = beta[first:]
+            np.divide(cov, var[:, None, :], out=out)
+            if has_nan:
+                bad = pair_invalid(y_invalid, valid_rows, window)
+                corr[first:][bad] = np.nan
+                beta[first:][bad] = np.nan
+
+        first = max(window - 1 - head, 0)
+        valid_rows = slice(head + first, len(log_p))
+        if valid_rows.start < valid_rows.stop:
+            # Media y varianza rolling del spread desde los prefijos de log precios y sus productos
+            sx = _window_sum(x_prefix, valid_rows, window)
+            sxx_diag = _window_sum(x2_prefix, valid_rows, window)
+            mean = sx[:, rows, None] - sx[:, None, :]
+            mean /= w
+            var_s = _window_sum(xx_prefix, valid_rows, window)
+            var_s *= -2.0
+            var_s += sxx_diag[:, rows, None]
+            var_s += sxx_diag[:, None, :]
+            var_s /= w
+            var_s -= mean * mean
+            var_s *= w / (w - 1)
+            var_s[var_s <= 1e-14] = np.nan
+            out = zspread[first:]
+            np.subtract(spread_c[first:], mean, out=out)
+            out /= np.sqrt(var_s, out=var_s)
+            if has_nan:
+                out[pair_invalid(x_invalid, valid_rows, window)] = np.nan
+
+        stats[f"corr_{window}"] = corr
+        stats[f"beta_{window}"] = beta
+        stats[f"zspread_{window}"] = zspread
+    return stats
+
+
+def rolling_pairwise(prices: np.ndarray, windows: List[int], rows: List[int] = None,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE, origin: int = 0) -> Dict[str, np.ndarray]:
+    """Versión en memoria de iter_pairwise_blocks: arrays (T, R, N) por estadística."""
+    prices = np.asarray(prices, dtype=np.float64)
+    n, n_symbols = prices.shape
+    n_rows = n_symbols if rows is None else len(rows)
+    out = {}
+    for start, end, block in iter_pairwise_blocks(prices, windows, rows, chunk_size, origin):
+        for name, values in block.items():
+            if name not in out:
+                out[name] = np.empty((n, n_rows, n_symbols))
+            out[name][start:end] = values
+    return out
@@ -2,72 +2,297 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath("."))
 import subprocess
+import json
+import time
 import pandas as pd
+import yaml
 from pathlib import Path
 
 from utils.config_loader import load_yaml
-from core.features.shared.utils import build_data_path, merge_feature_files
+from core.features.cache import DEFAULT_CACHE_ROOT, DEFAULT_MAX_SIZE_MB, FeatureCache, fitted_state, hash_frame
+from core.features.chunked import generate_chunked_matrix
+from core.features.multi_timeframe import (DEFAULT_GROUPS as DEFAULT_TIMEFRAME_GROUPS, AsofChunkRunner, asof_join,
+                                           resample_frame, timeframe_config, timeframe_frames)
+from core.features.registry import get_generator
+from core.features.scheduler import DagNode, DagScheduler, NodeResult
+from core.features.shared.ipc import read_frame, write_frame
+from core.features.shared.matrix_store import FeatureMatrixStore, build_feature_matrix
+from core.features.shared.utils import load_market_data
 from utils.logger import log
 
+# Cada grupo declara qué consume y qué produce; el scheduler arma el DAG con esto
+FEATURE_GROUPS = {
+    "ohlcv":      {"inputs": ["candles"], "outputs": ["ohlcv_features"]},
+    "stats":      {"inputs": ["candles"], "outputs": ["stats_features"]},
+    "relational": {"inputs": ["candles"], "outputs": ["relational_features"]},
+    "nonlinear":  {"inputs": ["candles"], "outputs": ["nonlinear_features"]},
+}
 
-def run_env_generator(env_name: str, script_name: str, config_path: str):
-    venv_path = (
+
+def venv_python(env_name: str) -> str:
+    return (
         f"envs/{env_name}/.venv/Scripts/python.exe"
         if os.name == "nt"
         else f"envs/{env_name}/.venv/bin/python"
     )
+
+
+def run_env_generator(env_name: str, script_name: str, config_path: str, extra_args: list = None,
+                      python_exe: str = None):
     script_path = f"core/features/{env_name}/{script_name}"
-    subprocess.run([venv_path, script_path, "--config", config_path], check=True)
+    cmd = [python_exe or venv_python(env_name), script_path, "--config", config_path] + (extra_args or [])
+    subprocess.run(cmd, check=True)
 
 
-def main(config_path: str):
-    config = load_yaml(config_path)
-    md = config["market_data"]
+def run_inprocess_group(inputs: dict, env: str, config: dict) -> dict:
+    return {f"{env}_features": get_generator(env)(inputs["candles"], config)}
 
-    # Carga de datos OHLCV
-    data_path = build_data_path(
-        symbol=md["symbol"],
-        interval=md["interval"],
-        start_date=md["start_date"],
-        end_date=md["end_date"],
-        provider=md["provider"]
+
+def run_isolated_group(inputs: dict, env: str, config_path: str, temp_path: str, python_exe: str = None) -> dict:
+    output_path = Path(temp_path) / f"{env}_features.arrow"
+    run_env_generator(
+        env_name=env,
+        script_name="generate_features.py",
+        config_path=config_path,
+        extra_args=["--input", inputs["candles_arrow"], "--output", str(output_path)],
+        python_exe=python_exe,
     )
-    df = pd.read_csv(data_path)
-    log.info(f"[cyan]📥 Datos cargados desde {data_path} ({df.shape[0]} filas)[/cyan]")
+    return {f"{env}_features": read_frame(output_path)}
+
+
+def generate_feature_groups(df: pd.DataFrame, config: dict, config_path: str, temp_path: Path,
+                            python_exe: str = None, cache: FeatureCache = None):
+    """
+    Corre los grupos habilitados con el DagScheduler y devuelve
+    ({grupo: DataFrame de features}, {grupo: NodeResult}).
+
+    Con `cache`, los grupos cuyas velas, sección de config y código no
+    cambiaron se leen de la FeatureCache (status "cached") y solo el resto
+    entra al DAG; lo recalculado se guarda para la próxima corrida.
+
+    Los grupos independientes corren en paralelo (features.max_workers
+    procesos; 1 = secuencial en este proceso).
+
+    features.execution = "inprocess": el generador registrado recibe el frame
+    ya cargado, sin subprocesos ni archivos intermedios. Los grupos con
+    `isolated: true` (o execution = "subprocess") corren en su venv y el
+    frame viaja por Arrow IPC (input.arrow / <grupo>_features.arrow).
+    """
+    execution = config["features"].get("execution", "subprocess")
+    initial = {"candles": df}
+    nodes = []
+    cached, results = {}, {}
+    candles_hash = hash_frame(df) if cache else None
+
+    for env, spec in FEATURE_GROUPS.items():
+        group_cfg = config["features"].get(env, {})
+        if not group_cfg.get("enabled", False):
+            continue
+        # refit: true vuelve a ajustar el estado del grupo: no se puede servir desde caché
+        if cache and not group_cfg.get("refit", False):
+            frame = cache.get(env, cache.key(env, candles_hash, group_cfg, fitted_state(env, config)))
+            if frame is not None:
+                cached[env] = frame
+                results[env] = NodeResult(env, "cached")
+                continue
+
+        if execution == "inprocess" and not group_cfg.get("isolated", False):
+            nodes.append(DagNode(env, run_inprocess_group, spec["inputs"], spec["outputs"],
+                                 kwargs={"env": env, "config": config}))
+        else:
+            # Los grupos aislados leen las velas del archivo Arrow en vez de recibir el frame
+            if "candles_arrow" not in initial:
+                input_path = temp_path / "input.arrow"
+                write_frame(df, input_path)
+                initial["candles_arrow"] = str(input_path)
+            inputs = ["candles_arrow" if i == "candles" else i for i in spec["inputs"]]
+            nodes.append(DagNode(env, run_isolated_group, inputs, spec["outputs"],
+                                 kwargs={"env": env, "config_path": config_path,
+                                         "temp_path": str(temp_path), "python_exe": python_exe}))
+
+    values = {}
+    if nodes:
+        log.info(f"[blue]⚙️ Ejecutando features: {', '.join(n.name for n in nodes)}[/blue]")
+        scheduler = DagScheduler(max_workers=config["features"].get("max_workers"))
+        values, node_results = scheduler.run(nodes, initial)
+        results.update(node_results)
+
+    if "candles_arrow" in initial:
+        Path(initial["candles_arrow"]).unlink()
+
+    # Mismo orden de grupos que FEATURE_GROUPS, vengan de caché o del DAG
+    frames = {}
+    for env in FEATURE_GROUPS:
+        if env in cached:
+            frames[env] = cached[env]
+        elif env in results and results[env].status == "ok":
+            frames[env] = values[f"{env}_features"]
+            if cache:
+                # La clave se recalcula: el grupo pudo haber (re)ajustado su estado al correr
+                group_cfg = config["features"].get(env, {})
+                key = cache.key(env, candles_hash, group_cfg, fitted_state(env, config))
+                cache.put(env, key, frames[env], results[env].elapsed_sec)
+    return frames, results
+
+
+def generate_timeframe_groups(df: pd.DataFrame, config: dict, temp_path: Path,
+                              cache: FeatureCache = None):
+    """
+    Corre los grupos de features.multi_timeframe.groups sobre las velas
+    re-muestreadas a cada intervalo de features.multi_timeframe.intervals.
+    Devuelve ({intervalo: {"<grupo>_<intervalo>": features indexadas por la
+    apertura de la vela mayor}}, {nombre: NodeResult}).
+    """
+    mtf_cfg = config["features"].get("multi_timeframe", {})
+    by_interval, results = {}, {}
+    intervals = mtf_cfg.get("intervals") or []
+    if not intervals:
+        return by_interval, results
+    groups = mtf_cfg.get("groups", DEFAULT_TIMEFRAME_GROUPS)
+    base_interval = config["market_data"]["interval"]
+    for interval in intervals:
+        htf_df = resample_frame(df, base_interval, interval)
+        log.info(f"[cyan]🕐 Features {', '.join(groups)} en {interval} ({len(htf_df)} velas cerradas)[/cyan]")
+        htf_config = timeframe_config(config, interval, groups)
+        # Los grupos en subproceso leen su config del YAML: tiene que ser la del intervalo
+        # mayor (market_data.interval, grupos habilitados), no la base
+        htf_config_path = Path(temp_path) / f"config_{interval}.yaml"
+        with open(htf_config_path, "w", encoding="utf-8") as f:
+            yaml.dump(htf_config, f, allow_unicode=True)
+        try:
+            frames, node_results = generate_feature_groups(htf_df, htf_config, str(htf_config_path), temp_path,
+                                                           cache=cache)
+        finally:
+            htf_config_path.unlink()
+        results.update({f"{name}_{interval}": NodeResult(f"{name}_{interval}", r.status, r.elapsed_sec, r.error)
+                        for name, r in node_results.items()})
+        by_interval[interval] = timeframe_frames(htf_df, frames, interval)
+    return by_interval, results
+
 
+def build_matrix_in_memory(df: pd.DataFrame, config: dict, config_path: str, matrix_store: FeatureMatrixStore,
+                           matrix_cfg: dict, x_full_path: Path) -> dict:
+    """Modo normal: todos los grupos sobre la historia completa (DAG + caché). Devuelve run_metadata."""
     # Limpieza de temporales
     temp_path = Path("core/features/shared/temp")
     temp_path.mkdir(parents=True, exist_ok=True)
-    for f in temp_path.glob("*_features.csv"):
+    for f in list(temp_path.glob("*_features.csv")) + list(temp_path.glob("*_features.arrow")):
         f.unlink()
 
+    cache_cfg = config["features"].get("cache", {})
+    cache = None
+    if cache_cfg.get("enabled", True):
+        cache = FeatureCache(cache_cfg.get("path", DEFAULT_CACHE_ROOT),
+                             max_size_mb=cache_cfg.get("max_size_mb", DEFAULT_MAX_SIZE_MB))
+
     # Generación de features por ambiente
-    for env in ["ohlcv", "stats", "relational", "nonlinear"]:
-        if config["features"].get(env, {}).get("enabled", False):
-            log.info(f"[blue]⚙️ Ejecutando features: {env}[/blue]")
-            run_env_generator(env_name=env, script_name="generate_features.py", config_path=config_path)
-
-    # Unificación de features
-    log.info("[bold]🔗 Unificando features en X_full...[/bold]")
-    df_full = merge_feature_files(temp_path)
-    
+    start_time = time.time()
+    frames, node_results = generate_feature_groups(df, config, config_path, temp_path, cache=cache)
+    # Intervalos mayores: as-of join sobre los timestamps base, solo velas cerradas
+    timeframes, timeframe_results = generate_timeframe_groups(df, config, temp_path, cache=cache)
+    node_results.update(timeframe_results)
+    for interval, htf_frames in timeframes.items():
+        for name, features in htf_frames.items():
+            frames[name] = asof_join(features, interval, df["timestamp"], config["market_data"]["interval"])
+    features_elapsed = time.time() - start_time
+    failed = [r.name for r in node_results.values() if r.status in ("failed", "skipped")]
+    if failed:
+        log.error(f"❌ Fallaron grupos de features: {failed}")
+        sys.exit(1)
+
+    # Unificación de features: matriz indexada por timestamp, sin columnas OHLCV repetidas
+    log.info("[bold]🔗 Unificando features en la matriz de features...[/bold]")
+    df_full, groups = build_feature_matrix(df, frames)
+
     # Generar target si no existe
     if "target" not in df_full.columns:
         if "close" not in df_full.columns:
             log.error("❌ No se puede generar target: falta la columna 'close'")
             sys.exit(1)
-        df_full["next_ret"] = df_full["close"].pct_change().shift(-1)
-        df_full["target"] = (df_full["next_ret"] > 0).astype(int)
-        df_full.drop(columns=["next_ret"], inplace=True)
-        # Quitamos la última fila que queda con NaN
-        df_full = df_full.iloc[:-1].reset_index(drop=True)
+        next_ret = df_full["close"].pct_change().shift(-1)
+        df_full["target"] = (next_ret > 0).astype(int)
+        groups["target"] = "target"
+        # Quitamos la última fila que queda sin retorno siguiente
+        df_full = df_full.iloc[:-1]
         log.info(f"✅ Target generado automáticamente. Shape nuevo: {df_full.shape}")
 
+    matrix_store.write(df_full, groups, dtype=matrix_cfg.get("dtype", "float64"))
+    log.info(f"[green]💾 Matriz de features {df_full.shape} en {matrix_store.data_path}[/green]")
+    if matrix_cfg.get("write_csv", False):
+        df_full.reset_index().to_csv(x_full_path, index=False)
+
+    run_metadata = {
+        "features_elapsed_sec": features_elapsed,
+        "feature_nodes": {name: result.to_dict() for name, result in node_results.items()},
+    }
+    if cache:
+        run_metadata["feature_cache"] = cache.stats.to_dict()
+        log.info(f"[cyan]♻️ Caché de features: {cache.stats.hits} hits, {cache.stats.misses} misses "
+                 f"(~{cache.stats.saved_sec:.1f}s ahorrados)[/cyan]")
+    return run_metadata
+
+
+def build_matrix_chunked(df: pd.DataFrame, config: dict, config_path: str, matrix_store: FeatureMatrixStore,
+                         matrix_cfg: dict) -> dict:
+    """
+    Modo out-of-core (features.chunked.enabled): los grupos corren en este
+    proceso por chunks con su warm-up y cada chunk se escribe al store.
+    Sin caché ni X_full.csv. Devuelve run_metadata.
+    """
+    chunk_cfg = config["features"]["chunked"]
+    groups = [env for env in FEATURE_GROUPS if config["features"].get(env, {}).get("enabled", False)]
+    if matrix_cfg.get("write_csv", False):
+        log.warning("⚠️ write_csv se ignora en modo chunked (la matriz no se materializa entera)")
+
+    start_time = time.time()
+    # Las features de intervalos mayores son chicas: se calculan enteras y el as-of join se hace por chunk
+    temp_path = Path("core/features/shared/temp")
+    temp_path.mkdir(parents=True, exist_ok=True)
+    timeframes, timeframe_results = generate_timeframe_groups(df, config, temp_path)
+    failed = [r.name for r in timeframe_results.values() if r.status in ("failed", "skipped")]
+    if failed:
+        log.error(f"❌ Fallaron grupos de features: {failed}")
+        sys.exit(1)
+    extra_runners = {name: AsofChunkRunner(features, interval, config["market_data"]["interval"])
+                     for interval, htf_frames in timeframes.items() for name, features in htf_frames.items()}
+
+    summary = generate_chunked_matrix(
+        df, config, groups, matrix_store,
+        dtype=matrix_cfg.get("dtype", "float64"),
+        memory_budget_mb=chunk_cfg.get("memory_budget_mb", 1024),
+        chunk_rows=chunk_cfg.get("chunk_rows"),
+        extra_runners=extra_runners,
+    )
+    features_elapsed = time.time() - start_time
+    log.info(f"[green]💾 Matriz de features ({summary['rows']}, {summary['columns']}) "
+             f"en {matrix_store.data_path}[/green]")
+    return {"features_elapsed_sec": features_elapsed, "chunked": summary}
+
+
+def main(config_path: str):
+    config = load_yaml(config_path)
+    md = config["market_data"]
+
+    # Carga de datos OHLCV
+    df = load_market_data(md, config.get("quality"))
+    log.info(f"[cyan]📥 Datos cargados para {md['symbol']} {md['interval']} ({df.shape[0]} filas)[/cyan]")
 
     output_dir = Path(config["output_path"]) / f"{md['symbol']}_{md['interval']}"
     output_dir.mkdir(parents=True, exist_ok=True)
+    matrix_cfg = config["features"].get("matrix", {})
+    matrix_store = FeatureMatrixStore(output_dir / "features")
     x_full_path = output_dir / "X_full.csv"
-    df_full.to_csv(x_full_path, index=False)
+
+    if config["features"].get("chunked", {}).get("enabled", False):
+        run_metadata = build_matrix_chunked(df, config, config_path, matrix_store, matrix_cfg)
+    else:
+        run_metadata = build_matrix_in_memory(df, config, config_path, matrix_store, matrix_cfg, x_full_path)
+
+    if "quality_report" in df.attrs:
+        with open(output_dir / "quality_report.json", "w", encoding="utf-8") as f:
+            json.dump(df.attrs["quality_report"], f, indent=2)
+    with open(output_dir / "run_metadata.json", "w", encoding="utf-8") as f:
+        json.dump(run_metadata, f, indent=2)
 
     # Selección automática como un feature más
     if config.get("selection", {}).get("enabled", True):
@@ -76,11 +301,12 @@ def main(config_path: str):
         # Armamos dinámicamente los paths
         sel_cfg = config["selection"]
         sel_cfg["x_full_path"] = str(x_full_path)
+        sel_cfg["feature_store"] = str(matrix_store.root)
         sel_cfg["output_dir"] = str(output_dir)
+        sel_cfg["interval"] = md["interval"]
 
         # Guardamos config selection temporal
         temp_sel_cfg_path = Path("temp_selection.yaml")
-        import yaml
         with open(temp_sel_cfg_path, "w") as f:
             yaml.dump({"selection": sel_cfg}, f)
 
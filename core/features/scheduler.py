@@ -0,0 +1,124 @@
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Dict, List, Optional
+
+from utils.logger import log
+
+
+@dataclass
+class DagNode:
+    """
+    Nodo del DAG. `fn(inputs: dict, **kwargs) -> dict` recibe los valores de
+    sus `inputs` y devuelve un dict con sus `outputs`. Tiene que ser una
+    función de módulo (se ejecuta en otro proceso).
+    """
+    name: str
+    fn: Callable
+    inputs: List[str]
+    outputs: List[str]
+    kwargs: dict = field(default_factory=dict)
+
+
+@dataclass
+class NodeResult:
+    name: str
+    status: str               # ok | failed | skipped | cached
+    elapsed_sec: float = 0.0  # tiempo de ejecución dentro del worker
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _timed_call(fn: Callable, inputs: dict, kwargs: dict):
+    start_time = time.perf_counter()
+    outputs = fn(inputs, **kwargs)
+    return outputs, time.perf_counter() - start_time
+
+
+class _InlineExecutor:
+    """Ejecuta en el proceso actual (max_workers=1): sin pickling ni procesos hijos."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+class DagScheduler:
+    """
+    Ejecuta nodos en cuanto sus inputs están disponibles, con hasta
+    `max_workers` nodos en paralelo en un pool de procesos. Un nodo que falla
+    no corta el resto: sus dependientes quedan como `skipped`.
+    """
+
+    def __init__(self, max_workers: int = None):
+        self.max_workers = max_workers
+
+    @staticmethod
+    def validate(nodes: List[DagNode], initial: dict):
+        producers = {}
+        for node in nodes:
+            for output in node.outputs:
+                if output in producers or output in initial:
+                    raise ValueError(f"Output '{output}' producido por más de un nodo")
+                producers[output] = node.name
+        for node in nodes:
+            missing = [i for i in node.inputs if i not in producers and i not in initial]
+            if missing:
+                raise ValueError(f"Nodo '{node.name}': inputs sin productor {missing}")
+
+    def run(self, nodes: List[DagNode], initial: dict):
+        """Devuelve (valores producidos + iniciales, {nombre: NodeResult})."""
+        self.validate(nodes, initial)
+        values = dict(initial)
+        failed_outputs = set()
+        results: Dict[str, NodeResult] = {}
+        pending = {node.name: node for node in nodes}
+        running = {}
+
+        executor = (
+            _InlineExecutor() if self.max_workers == 1
+            else ProcessPoolExecutor(max_workers=self.max_workers)
+        )
+        with executor as pool:
+            while pending or running:
+                for name, node in list(pending.items()):
+                    if any(i in failed_outputs for i in node.inputs):
+                        results[name] = NodeResult(name, "skipped", error="falló una dependencia")
+                        failed_outputs.update(node.outputs)
+                        del pending[name]
+                    elif all(i in values for i in node.inputs):
+                        node_inputs = {i: values[i] for i in node.inputs}
+                        running[pool.submit(_timed_call, node.fn, node_inputs, node.kwargs)] = node
+                        del pending[name]
+
+                if not running:
+                    if pending:
+                        raise ValueError(f"Ciclo en el DAG entre {sorted(pending)}")
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node = running.pop(future)
+                    try:
+                        outputs, elapsed = future.result()
+                        values.update(outputs)
+                        results[node.name] = NodeResult(node.name, "ok", elapsed_sec=elapsed)
+                        log.info(f"    ⏱️ {node.name}: {elapsed:.2f}s")
+                    except Exception as e:
+                        failed_outputs.update(node.outputs)
+                        results[node.name] = NodeResult(node.name, "failed", error=repr(e))
+                        log.error(f"❌ Nodo {node.name} falló: {e!r}")
+
+        return values, results
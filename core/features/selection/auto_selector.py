@@ -1,10 +1,18 @@
 """
 auto_selector.py
 
-Realiza la selección automática de features sobre un DataFrame X_full.csv,
+Realiza la selección automática de features sobre la matriz de features
+(FeatureMatrixStore, o un X_full.csv legado),
 usando distintos modelos y métricas, y genera:
   - X_selected.csv  (dataset con el subset de features elegido)
-  - metadata.json   (ranking, parámetros y tiempos)
+  - cv_results.csv  (métricas de cada modelo en cada fold)
+  - feature_clusters.csv / correlation.csv (prefiltro de redundancia)
+  - heatmap.csv / heatmap.png (correlación de las top features)
+  - metadata.json   (ranking, parámetros, tiempos e ICs bootstrap)
+
+Con `search.enabled` la grilla de hiperparámetros se recorre con
+successive halving (ver search.py) en vez de evaluar cada candidato con
+la CV completa.
 
 Para usarlo como un feature más, se invoca desde run_feature_pipeline.py
 bajo el env "selection", exactamente igual que los demás envs de features.
@@ -31,56 +39,45 @@ import time
 import pandas as pd
 from pathlib import Path
 
+from core.features.shared.matrix_store import FeatureMatrixStore
 from utils.config_loader import load_yaml
 from utils.logger import log
 
+from core.features.selection.cv import PurgedWalkForward, run_fold_tasks
+from core.features.selection.evaluation import score_predictions, summarize_cv
+from core.features.selection.prefilter import blocked_correlation, redundancy_prefilter, write_heatmap
+from core.features.selection.search import SearchBudget, build_candidates, successive_halving
+from core.features.selection.significance import selection_significance, strategy_sharpes
+from core.backtest.engine import YEAR_MS
+from core.data.timeframes import interval_to_ms
+
 from sklearn.pipeline import make_pipeline
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestClassifier
 from xgboost import XGBClassifier
 from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import cross_val_score
-from sklearn.metrics import (
-    make_scorer,
-    roc_auc_score,
-    f1_score,
-    accuracy_score
-)
+from functools import partial
 import numpy as np
-import itertools
 import json
 import warnings
 from sklearn.exceptions import ConvergenceWarning
 warnings.filterwarnings("ignore", category=ConvergenceWarning)
 
 # -------------------------------------------------------------------
-# 3) Funciones auxiliares
+# 3) Modelos
 # -------------------------------------------------------------------
-def sharpe_ratio(y_true, y_pred):
-    """
-    Sharpe ratio aproximado: E[retorno] / std[retorno]
-    Aquí asumimos y_pred como series de 'retornos esperados'
-    y y_true como retornos reales.
-    """
-    dr = np.array(y_true) * np.array(y_pred)  # señal * retorno
-    if dr.std() == 0:
-        return 0.0
-    return dr.mean() / dr.std()
-
-# scikit-learn scorers
-SCORERS = {
-    "roc_auc": make_scorer(roc_auc_score),
-    "f1":      make_scorer(f1_score),
-    "accuracy":make_scorer(accuracy_score),
-    "sharpe":  make_scorer(sharpe_ratio)
-}
-
 MODELS = {
     "xgboost":          XGBClassifier,
     "random_forest":    RandomForestClassifier,
     "logistic_regression": LogisticRegression
 }
 
+def make_model_pipeline(ModelCls, params: dict):
+    return make_pipeline(StandardScaler(), ModelCls(**params))
+
+def make_named_model(model_name: str, params: dict):
+    return make_model_pipeline(MODELS[model_name], params)
+
 # -------------------------------------------------------------------
 # 4) Lógica principal
 # -------------------------------------------------------------------
@@ -102,6 +99,8 @@ def run_auto_feature_selection(df_full: pd.DataFrame, cfg: dict):
         sys.exit(1)
     y = df_full["target"]
     X = df_full.drop(columns=["target"])
+    # Retorno de la vela siguiente (lo que predice el target), para el Sharpe de la estrategia
+    forward_returns = df_full["close"].pct_change().shift(-1) if "close" in df_full.columns else None
 
     # Eliminamos columnas no numéricas
     valid_types = ["int64", "float64", "bool", "category"]
@@ -112,61 +111,129 @@ def run_auto_feature_selection(df_full: pd.DataFrame, cfg: dict):
         X = X.drop(columns=non_numeric_cols)
 
     # Eliminamos filas con NaN
-    nan_rows = X.isnull().any(axis=1).sum()
+    nan_mask = X.isnull().any(axis=1)
+    nan_rows = nan_mask.sum()
     if nan_rows > 0:
         log.warning(f"⚠️ [selection] Eliminando {nan_rows} filas con NaN antes de entrenamiento")
-        X = X.dropna().reset_index(drop=True)
-        y = y.loc[X.index].reset_index(drop=True)
+        # Misma máscara para X e y: las filas siguen alineadas y en orden temporal
+        X = X[~nan_mask].reset_index(drop=True)
+        y = y[~nan_mask].reset_index(drop=True)
+        if forward_returns is not None:
+            forward_returns = forward_returns[~nan_mask].reset_index(drop=True)
 
 
     log.info(f"🔢 [selection] {X.shape[1]} features detectadas, {len(y)} muestras")
 
-    best_score = -np.inf
-    best_combo = None
-    best_subset = None
-    ranking = []
-
-    # iteramos combinaciones modelo + métrica
-    for model_name, metric_name in itertools.product(models, metrics):
-        log.info(f"🔄 [selection] Probando {model_name} + {metric_name} ...")
-        ModelCls = MODELS[model_name]
-        params = cfg.get(f"{model_name}_params", {})
-        model = make_pipeline(
-            StandardScaler(),
-            ModelCls(**params)
+    # Walk-forward con purga/embargo; cada (modelo, fold) se entrena una vez y todas
+    # las métricas salen de sus predicciones out-of-fold
+    cv_cfg = cfg.get("cv", {})
+    splitter = PurgedWalkForward(n_splits=cv_splits, purge=cv_cfg.get("purge", 1),
+                                 embargo=cv_cfg.get("embargo", 0), max_train_size=cv_cfg.get("max_train_size"))
+    splits = list(splitter.split(X))
+
+    # Prefiltro de redundancia: un representante por cluster de features muy correlacionadas
+    artifacts = {}
+    pre_cfg = cfg.get("prefilter", {})
+    prefilter = None
+    n_features = X.shape[1]
+    if pre_cfg.get("enabled", True):
+        prefilter_start = time.time()
+        # MI / |corr| con el target solo sobre el train del primer fold (antes de cualquier test,
+        # purga y embargo incluidos): ninguna fila de test de la CV ni de los rungs
+        # (que usan colas de la serie) decide qué features pasan
+        label_end = splits[0][1][0] - splitter.purge - splitter.embargo
+        prefilter = redundancy_prefilter(
+            X, y,
+            corr_threshold=pre_cfg.get("corr_threshold", 0.95),
+            variance_floor=pre_cfg.get("variance_floor", 0.0),
+            mi_floor=pre_cfg.get("mi_floor"),
+            mi_max_rows=pre_cfg.get("mi_max_rows", 20000),
+            block_size=pre_cfg.get("block_size", 512),
+            label_rows=np.arange(label_end),
         )
-
-
-        scorer = SCORERS[metric_name]
-        # cross-validation
-        scores = cross_val_score(
-            model, X, y,
-            cv=cv_splits,
-            scoring=scorer,
-            n_jobs=-1
+        prefilter_elapsed = time.time() - prefilter_start
+        X = X[prefilter.kept]
+        artifacts["feature_clusters"] = prefilter.clusters_frame()
+        artifacts["correlation"] = prefilter.corr.loc[prefilter.kept, prefilter.kept]
+
+    run_kwargs = dict(n_workers=cfg.get("n_workers"), threads_per_task=cfg.get("threads_per_task", 1),
+                      warm_start=cfg.get("warm_start", True))
+    candidates = build_candidates(models, cfg)
+    by_name = {c.name: c for c in candidates}
+    search_cfg = cfg.get("search", {})
+    search = None
+    cv_start = time.time()
+    if search_cfg.get("enabled", False):
+        # Successive halving: rungs baratos primero, solo la mejor fracción llega a la CV completa
+        budget = SearchBudget(max_fits=search_cfg.get("max_fits"), max_seconds=search_cfg.get("max_seconds"))
+        search = successive_halving(candidates, X, y, metrics, make_named_model, cv_splits=cv_splits,
+                                    cv_cfg=cv_cfg, rank_metric=search_cfg.get("metric", metrics[0]),
+                                    eta=search_cfg.get("eta", 3), min_rows=search_cfg.get("min_rows", 2000),
+                                    min_folds=search_cfg.get("min_folds", 2), budget=budget, **run_kwargs)
+        cv_results = search.cv_results
+        ranking = summarize_cv(search.final_results, metrics)
+        winner, metric_name, best_score = search.best, search_cfg.get("metric", metrics[0]), search.best_score
+        cpu_usage = None
+        model_fits = search.fits
+    else:
+        makers = {c.name: partial(make_named_model, c.model, c.params) for c in candidates}
+        folds, cpu_usage = run_fold_tasks(makers, X, y, splits, **run_kwargs)
+        cv_results = score_predictions(folds, y, metrics)
+        ranking = summarize_cv(cv_results, metrics)
+        best = max(ranking, key=lambda r: -np.inf if np.isnan(r["score"]) else r["score"])
+        winner, metric_name, best_score = by_name[best["model"]], best["metric"], best["score"]
+        model_fits = len(candidates) * len(splits)
+    cv_elapsed = time.time() - cv_start
+    for name, table in cv_results.groupby("model", sort=False):
+        table = table[table["rung"] == table["rung"].max()] if "rung" in table else table
+        log.info(f"    • CV {name}: " + ", ".join(f"{metric}: {table[metric].mean():.4f}" for metric in metrics))
+
+    model_name = winner.model
+    log.info(f"✅ [selection] Mejor: {winner.name} + {metric_name} = {best_score:.4f}")
+
+    # Bootstrap por bloques de las predicciones out-of-fold: ¿la diferencia es ruido?
+    sig_cfg = cfg.get("significance", {})
+    significance = None
+    if sig_cfg.get("enabled", True):
+        sig_start = time.time()
+        # Con successive halving las predicciones son las del último rung (sus últimas final_rows filas)
+        sig_folds, offset = (folds, 0) if search is None else (search.final_predictions, len(X) - search.final_rows)
+        periods_per_year = YEAR_MS / interval_to_ms(cfg["interval"]) if cfg.get("interval") else 1.0
+        trial_sharpes = None
+        if search is not None and forward_returns is not None:
+            # Dispersión del deflated Sharpe: todos los candidatos (rung 0), no solo los sobrevivientes
+            first_offset = len(X) - search.first_rows
+            trial_sharpes = list(strategy_sharpes(
+                search.first_predictions, forward_returns.iloc[first_offset:].reset_index(drop=True)).values())
+        significance = selection_significance(
+            sig_folds, y.iloc[offset:].reset_index(drop=True), metrics, winner.name, metric_name,
+            forward_returns=None if forward_returns is None else forward_returns.iloc[offset:].reset_index(drop=True),
+            periods_per_year=periods_per_year, n_trials=len(candidates),
+            n_boot=sig_cfg.get("n_boot", 2000), block_length=sig_cfg.get("block_length"),
+            method=sig_cfg.get("method", "stationary"), alpha=sig_cfg.get("alpha", 0.05),
+            seed=sig_cfg.get("seed", 0), memory_budget_mb=sig_cfg.get("memory_budget_mb", 256),
+            n_workers=sig_cfg.get("n_workers"), trial_sharpes=trial_sharpes,
         )
-        mean_score = scores.mean()
-        log.info(f"    • CV {metric_name}: {mean_score:.4f}")
-
-        ranking.append({
-            "model": model_name,
-            "metric": metric_name,
-            "score": mean_score
-        })
-
-        if mean_score > best_score:
-            best_score = mean_score
-            best_combo = (model_name, metric_name)
-
-    # elegimos mejor combo
-    model_name, metric_name = best_combo
-    log.info(f"✅ [selection] Mejor: {model_name} + {metric_name} = {best_score:.4f}")
+        significance["elapsed_sec"] = time.time() - sig_start
+        winner_ci = significance["candidates"][winner.name].get(metric_name)
+        if winner_ci is not None:
+            log.info(f"    • IC {1 - significance['alpha']:.0%} de {metric_name} ({winner.name}): "
+                     f"[{winner_ci['ci'][0]:.4f}, {winner_ci['ci'][1]:.4f}]")
+        for rival, test in significance.get("winner_vs", {}).get("rivals", {}).items():
+            log.info(f"    • {winner.name} vs {rival}: p = {test['p_value']:.3f}")
+        if "strategy" in significance:
+            strat = significance["strategy"][winner.name]
+            log.info(f"    • Estrategia {winner.name}: Sharpe {strat['sharpe_annual']:.2f}, "
+                     f"deflated Sharpe {strat['deflated_sharpe']:.3f} ({strat['n_trials']} pruebas)")
+        log.info(f"⏱️ [selection] Bootstrap: {significance['replicates']} réplicas en "
+                 f"{significance['elapsed_sec']:.1f}s")
 
 
     # re-entrenamos con todo el dataset y extraemos importancias
-    ModelCls = MODELS[model_name]
-    clf = ModelCls()
+    # con la configuración ganadora (antes ModelCls() descartaba los params del YAML)
+    clf = make_named_model(model_name, winner.params)
     clf.fit(X, y)
+    clf = clf.steps[-1][1]
 
     importances = None
     if hasattr(clf, "feature_importances_"):
@@ -188,15 +255,51 @@ def run_auto_feature_selection(df_full: pd.DataFrame, cfg: dict):
 
     df_selected = df_full[top_features + ["target"]].copy()
 
+    # Datos del heatmap: correlación entre las top features (ya calculada si corrió el prefiltro)
+    if prefilter is not None:
+        artifacts["heatmap"] = prefilter.corr.loc[top_features, top_features]
+    else:
+        artifacts["heatmap"] = pd.DataFrame(blocked_correlation(X[top_features].to_numpy()),
+                                            index=top_features, columns=top_features)
+    artifacts["cv_results"] = cv_results
+
     metadata = {
         "best_model": model_name,
         "best_metric": metric_name,
         "best_score": best_score,
+        "best_params": winner.params,
         "top_features": top_features,
         "ranking": ranking,
+        "candidates": {c.name: {"model": c.model, "params": c.params} for c in candidates},
+        "search": None if search is None else {
+            "metric": metric_name,
+            "eta": search_cfg.get("eta", 3),
+            "rungs": search.rungs,
+            "fits": search.fits,
+            "elapsed_sec": search.elapsed_sec,
+            "budget": {"max_fits": search_cfg.get("max_fits"), "max_seconds": search_cfg.get("max_seconds")},
+            "budget_exhausted": search.budget_exhausted,
+        },
+        "prefilter": None if prefilter is None else {
+            "features_in": n_features,
+            "features_kept": len(prefilter.kept),
+            "low_variance": prefilter.low_variance,
+            "low_mi": prefilter.low_mi,
+            "clusters": len(prefilter.clusters),
+            "label_rows": int(label_end),
+            "elapsed_sec": prefilter_elapsed,
+        },
+        "significance": significance,
+        "cv_elapsed_sec": cv_elapsed,
+        "cv_cpu": cpu_usage,
+        "cv_folds": [{"train": [int(tr[0]), int(tr[-1]) + 1], "test": [int(te[0]), int(te[-1]) + 1]}
+                     for tr, te in splits],
+        # Un ajuste por (candidato, fold); antes se re-entrenaba además una vez por métrica
+        "model_fits": model_fits,
+        "model_fits_per_metric_loop": len(candidates) * len(metrics) * len(splits),
         "elapsed_time_sec": time.time() - start_time
     }
-    return df_selected, metadata
+    return df_selected, metadata, artifacts
 
 # -------------------------------------------------------------------
 # 5) CLI
@@ -214,17 +317,27 @@ def main():
 
     # cargo config
     cfg = load_yaml(args.config)["selection"]
-    # cargo X_full generado por merge
-    df_full = pd.read_csv(cfg["x_full_path"])
+    # cargo la matriz de features (memory-mapeada); con feature_groups solo esas columnas
+    if cfg.get("feature_store"):
+        store = FeatureMatrixStore(cfg["feature_store"])
+        groups = cfg.get("feature_groups")
+        columns = None if groups is None else store.columns(groups) + ["target"]
+        df_full = store.read(columns=columns).reset_index(drop=True)
+    else:
+        df_full = pd.read_csv(cfg["x_full_path"])
     log.info("🧠 [selection] Iniciando selección automática de features...")
 
-    df_sel, meta = run_auto_feature_selection(df_full, cfg)
+    df_sel, meta, artifacts = run_auto_feature_selection(df_full, cfg)
 
     # guardo resultados
     out_dir = Path(cfg["output_dir"])
     out_dir.mkdir(parents=True, exist_ok=True)
 
     df_sel.to_csv(out_dir / "X_selected.csv", index=False)
+    # Tablas auxiliares: cv_results, feature_clusters, correlation, heatmap
+    for name, table in artifacts.items():
+        table.to_csv(out_dir / f"{name}.csv", index=name in ("correlation", "heatmap"))
+    write_heatmap(artifacts["heatmap"], out_dir / "heatmap.png")
     # metadata.json
     with open(out_dir / "metadata.json", "w", encoding="utf-8") as f:
         json.dump(meta, f, indent=2)
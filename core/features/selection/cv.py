@@ -0,0 +1,180 @@
+"""
+cv.py
+
+Validación cruzada walk-forward con purga y embargo, y el scheduler que
+reparte los ajustes (modelo, fold) en un pool de procesos.
+
+- PurgedWalkForward: la serie se parte en n_splits + 1 bloques
+  consecutivos; el fold k testea el bloque k + 1 y entrena solo con filas
+  anteriores. Se sacan del train las `purge` filas previas al test (su
+  label mira velas que caen dentro del test) y `embargo` filas más (las
+  features rolling siguen correlacionadas con el test).
+- run_fold_tasks: cada (modelo, fold) es una tarea; los workers reciben
+  X/y una sola vez y cada tarea corre con a lo sumo `threads_per_task`
+  hilos (n_jobs del estimador + BLAS/OpenMP), así workers x hilos no
+  sobre-suscribe los cores. Los modelos con warm start (solo inicializa el
+  solver: mismo óptimo) corren sus folds en orden en una misma tarea,
+  arrancando cada ventana expandida desde la solución anterior.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+from threadpoolctl import threadpool_limits
+
+from core.features.selection.evaluation import FoldPredictions
+from utils.logger import log
+
+
+class PurgedWalkForward:
+    """
+    Splitter walk-forward (ventana expandida, o móvil con max_train_size)
+    con purga y embargo. Compatible con la interfaz split/get_n_splits de
+    sklearn.
+    """
+
+    def __init__(self, n_splits: int = 5, purge: int = 1, embargo: int = 0, max_train_size: int = None):
+        if n_splits < 1:
+            raise ValueError("n_splits tiene que ser >= 1")
+        self.n_splits = n_splits
+        self.purge = purge
+        self.embargo = embargo
+        self.max_train_size = max_train_size
+
+    def get_n_splits(self, X=None, y=None, groups=None) -> int:
+        return self.n_splits
+
+    def split(self, X, y=None, groups=None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        n = len(X)
+        bounds = np.linspace(0, n, self.n_splits + 2).astype(int)
+        for k in range(self.n_splits):
+            test_start, test_end = bounds[k + 1], bounds[k + 2]
+            train_end = test_start - self.purge - self.embargo
+            train_start = 0 if self.max_train_size is None else max(train_end - self.max_train_size, 0)
+            if train_end <= train_start:
+                raise ValueError(f"Fold {k}: sin filas de train tras purga ({self.purge}) y embargo ({self.embargo})")
+            yield np.arange(train_start, train_end), np.arange(test_start, test_end)
+
+
+# --- Worker -----------------------------------------------------------------
+_WORKER: dict = {}
+
+
+def _init_worker(X: pd.DataFrame, y: pd.Series, threads: int):
+    _WORKER.update(X=X, y=y, threads=threads)
+    # Límite de hilos de BLAS/OpenMP para todo el proceso worker
+    threadpool_limits(limits=threads)
+
+
+def _cap_threads(model, threads: int):
+    """
+    n_jobs del estimador (o del último paso del pipeline) = threads. Solo
+    en ensambles (RandomForest, XGBoost): en los lineales binarios n_jobs
+    no paraleliza nada y el BLAS ya quedó limitado en el worker.
+    """
+    estimator = model.steps[-1][1] if hasattr(model, "steps") else model
+    if "n_estimators" not in estimator.get_params():
+        return model
+    estimator.set_params(**{k: threads for k in estimator.get_params() if k in ("n_jobs", "nthread")})
+    return model
+
+
+def _run_task(model_name: str, make_model: Callable, folds: List[Tuple[int, np.ndarray, np.ndarray]],
+              warm_start: bool) -> List[FoldPredictions]:
+    X, y, threads = _WORKER["X"], _WORKER["y"], _WORKER["threads"]
+    out = []
+    model = None
+    for fold, train_index, test_index in folds:
+        if model is None or not warm_start:
+            model = _cap_threads(make_model(), threads)
+        wall, cpu = time.perf_counter(), time.process_time()
+        model.fit(X.iloc[train_index], y.iloc[train_index])
+        fit_sec = time.perf_counter() - wall
+        X_test = X.iloc[test_index]
+        pred = model.predict(X_test)
+        proba = model.predict_proba(X_test)[:, 1] if hasattr(model, "predict_proba") else None
+        out.append(FoldPredictions(model_name, fold, test_index, pred, proba, fit_sec, len(train_index),
+                                   cpu_sec=time.process_time() - cpu, pid=os.getpid()))
+    return out
+
+
+def supports_warm_start(model) -> bool:
+    """warm_start que solo inicializa el solver (lineales); en RandomForest agrega árboles, así que no cuenta."""
+    estimator = model.steps[-1][1] if hasattr(model, "steps") else model
+    return "warm_start" in estimator.get_params() and "n_estimators" not in estimator.get_params()
+
+
+def _warm_start_model(make_model: Callable):
+    model = make_model()
+    key = f"{model.steps[-1][0]}__warm_start" if hasattr(model, "steps") else "warm_start"
+    return model.set_params(**{key: True})
+
+
+# --- Scheduler --------------------------------------------------------------
+def run_fold_tasks(models: Dict[str, Callable], X: pd.DataFrame, y: pd.Series, splits: List[tuple],
+                   n_workers: int = None, threads_per_task: int = 1,
+                   warm_start: bool = True) -> Tuple[List[FoldPredictions], dict]:
+    """
+    Ajusta cada modelo (`nombre -> make_model()`) en cada split y devuelve
+    (predicciones out-of-fold, resumen de uso de CPU). Las tareas más
+    largas (más filas de train, cadenas con warm start) se encolan primero.
+    """
+    cpus = os.cpu_count() or 1
+    threads_per_task = max(1, threads_per_task)
+    n_workers = n_workers or max(1, cpus // threads_per_task)
+
+    tasks = []
+    for name, make_model in models.items():
+        folds = [(k, train, test) for k, (train, test) in enumerate(splits)]
+        if warm_start and supports_warm_start(make_model()):
+            tasks.append((sum(len(f[1]) for f in folds), name, partial(_warm_start_model, make_model), folds, True))
+        else:
+            tasks.extend((len(f[1]), name, make_model, [f], False) for f in folds)
+    tasks.sort(key=lambda t: -t[0])
+
+    log.info(f"[cyan]⚙️ [selection] {len(tasks)} tareas de CV en {n_workers} procesos x "
+             f"{threads_per_task} hilos ({cpus} CPUs)[/cyan]")
+    wall = time.perf_counter()
+    results: List[FoldPredictions] = []
+
+    def collect(preds: List[FoldPredictions]):
+        for p in preds:
+            log.info(f"    ⏱️ {p.model} fold {p.fold}: fit {p.fit_sec:.2f}s, CPU {p.cpu_sec:.2f}s "
+                     f"({p.n_train} filas train)")
+        results.extend(preds)
+
+    if n_workers == 1:
+        # En este proceso: el límite de hilos se levanta al terminar la CV
+        _WORKER.update(X=X, y=y, threads=threads_per_task)
+        with threadpool_limits(limits=threads_per_task):
+            for _, name, make_model, folds, warm in tasks:
+                collect(_run_task(name, make_model, folds, warm))
+        _WORKER.clear()
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                 initargs=(X, y, threads_per_task)) as pool:
+            futures = [pool.submit(_run_task, name, make_model, folds, warm)
+                       for _, name, make_model, folds, warm in tasks]
+            for future in as_completed(futures):
+                collect(future.result())
+
+    wall = time.perf_counter() - wall
+    cpu_sec = sum(p.cpu_sec for p in results)
+    usage = {
+        "tasks": len(tasks),
+        "workers": n_workers,
+        "threads_per_task": threads_per_task,
+        "cpus": cpus,
+        "wall_sec": wall,
+        "cpu_sec": cpu_sec,
+        # CPU usada por los ajustes / CPU disponible durante la CV
+        "cpu_utilization": cpu_sec / (wall * cpus) if wall > 0 else 0.0,
+    }
+    log.info(f"[cyan]📈 [selection] CV: {wall:.1f}s, {cpu_sec:.1f}s de CPU "
+             f"({usage['cpu_utilization']:.0%} de {cpus} CPUs)[/cyan]")
+    results.sort(key=lambda p: (list(models).index(p.model), p.fold))
+    return results, usage
@@ -0,0 +1,88 @@
+"""
+evaluation.py
+
+Evaluación de modelos por validación cruzada con un solo ajuste por fold.
+
+Cada (modelo, fold) se entrena una vez (ver cv.run_fold_tasks) y se
+guardan sus predicciones y probabilidades out-of-fold; todas las métricas
+(incluido el sharpe propio) se calculan después sobre esas predicciones,
+en vez de re-entrenar el modelo una vez por métrica.
+"""
+from dataclasses import dataclass
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, f1_score, roc_auc_score
+
+
+def sharpe_ratio(y_true, y_pred):
+    """
+    Sharpe ratio aproximado: E[retorno] / std[retorno]
+    Aquí asumimos y_pred como series de 'retornos esperados'
+    y y_true como retornos reales.
+    """
+    dr = np.array(y_true) * np.array(y_pred)  # señal * retorno
+    if dr.std() == 0:
+        return 0.0
+    return dr.mean() / dr.std()
+
+
+# nombre -> (función(y_true, valores), "pred" | "proba"): con qué salida del modelo se calcula
+METRICS: Dict[str, tuple] = {
+    "roc_auc":  (roc_auc_score, "proba"),
+    "f1":       (f1_score, "pred"),
+    "accuracy": (accuracy_score, "pred"),
+    "sharpe":   (sharpe_ratio, "pred"),
+}
+
+
+@dataclass
+class FoldPredictions:
+    """Predicciones out-of-fold de un modelo en un fold."""
+    model: str
+    fold: int
+    test_index: np.ndarray
+    pred: np.ndarray
+    proba: np.ndarray          # P(clase 1); None si el modelo no tiene predict_proba
+    fit_sec: float
+    n_train: int
+    cpu_sec: float = 0.0       # CPU del proceso que ajustó (todos sus hilos)
+    pid: int = 0
+
+
+def score_predictions(folds: List[FoldPredictions], y: pd.Series, metrics: List[str]) -> pd.DataFrame:
+    """
+    Tabla cv_results: una fila por (modelo, fold) con cada métrica calculada
+    sobre las predicciones guardadas, más tiempos y tamaños del fold.
+    """
+    y_values = np.asarray(y)
+    rows = []
+    for f in folds:
+        y_true = y_values[f.test_index]
+        row = {"model": f.model, "fold": f.fold, "n_train": f.n_train, "n_test": len(f.test_index),
+               "fit_sec": f.fit_sec, "cpu_sec": f.cpu_sec, "pid": f.pid}
+        for metric in metrics:
+            fn, output = METRICS[metric]
+            values = f.proba if output == "proba" and f.proba is not None else f.pred
+            try:
+                row[metric] = float(fn(y_true, values))
+            except ValueError:
+                # p. ej. roc_auc con una sola clase en el fold
+                row[metric] = np.nan
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def summarize_cv(cv_results: pd.DataFrame, metrics: List[str]) -> List[dict]:
+    """Ranking modelo + métrica con la media (y desvío) entre folds, como el `ranking` de metadata.json."""
+    ranking = []
+    for model_name, group in cv_results.groupby("model", sort=False):
+        for metric in metrics:
+            ranking.append({
+                "model": model_name,
+                "metric": metric,
+                "score": float(group[metric].mean()),
+                "std": float(group[metric].std(ddof=0)),
+            })
+    return ranking
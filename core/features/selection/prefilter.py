@@ -0,0 +1,170 @@
+"""
+prefilter.py
+
+Filtro de redundancia barato antes de la selección con modelos.
+
+Muchas columnas de la matriz son casi duplicados (close_mean_5 / sma_10 /
+ema_10, bb_high / close_max_20, la expansión de autofeat...), y cada una
+encarece todos los ajustes de la CV. Antes de entrenar nada:
+
+1. piso de varianza (descarta columnas constantes) y, opcional, piso de
+   información mutua con el target sobre una submuestra;
+2. matriz de correlación calculada por bloques de columnas (memoria
+   acotada a dos bloques estandarizados, productos con BLAS);
+3. clustering por umbral de |corr|: en orden de relevancia (MI o |corr|
+   con el target), cada feature todavía libre abre un cluster y se queda
+   con todas las libres que superan el umbral contra ella. Sobrevive solo
+   el representante de cada cluster.
+
+La matriz de correlación queda como subproducto para el heatmap.
+
+Lo que usa el target (MI y |corr| con el target) se calcula solo sobre
+`label_rows`: en la selección, el train del primer fold walk-forward, así
+los labels de los tests no deciden qué features llegan a la CV. Varianza y
+correlación entre features no miran el target y usan todas las filas.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_selection import mutual_info_classif
+
+from utils.logger import log
+
+
+@dataclass
+class PrefilterResult:
+    kept: List[str]                                     # representantes, en el orden original de X
+    clusters: Dict[str, List[str]]                      # representante -> miembros (incluido él)
+    low_variance: List[str] = field(default_factory=list)
+    low_mi: List[str] = field(default_factory=list)
+    relevance: pd.Series = None                         # score usado para elegir representantes
+    corr: pd.DataFrame = None                           # correlación entre las features que pasaron los pisos
+
+    def clusters_frame(self) -> pd.DataFrame:
+        """feature, representative, corr (contra el representante), cluster_size."""
+        rows = []
+        for rep, members in self.clusters.items():
+            for member in members:
+                rows.append({"feature": member, "representative": rep,
+                             "corr": float(self.corr.at[rep, member]), "cluster_size": len(members)})
+        return pd.DataFrame(rows)
+
+
+def blocked_correlation(X: np.ndarray, block_size: int = 512) -> np.ndarray:
+    """Correlación de Pearson entre columnas de X (n x p) por bloques de `block_size` columnas."""
+    X = np.asarray(X, dtype=np.float64)
+    n, p = X.shape
+    mean = X.mean(axis=0)
+    std = X.std(axis=0)
+    std[std == 0] = np.inf                              # columna constante: correlación 0
+    corr = np.empty((p, p))
+    starts = range(0, p, block_size)
+    for i in starts:
+        zi = (X[:, i:i + block_size] - mean[i:i + block_size]) / std[i:i + block_size]
+        for j in starts:
+            if j < i:
+                continue
+            zj = zi if j == i else (X[:, j:j + block_size] - mean[j:j + block_size]) / std[j:j + block_size]
+            block = zi.T @ zj / n
+            corr[i:i + block_size, j:j + block_size] = block
+            corr[j:j + block_size, i:i + block_size] = block.T
+    np.clip(corr, -1.0, 1.0, out=corr)
+    return corr
+
+
+def target_correlation(X: np.ndarray, y, block_size: int = 512) -> np.ndarray:
+    """Correlación de cada columna de X con y, por bloques de columnas."""
+    X = np.asarray(X, dtype=np.float64)
+    t = np.asarray(y, dtype=np.float64)
+    t_std = t.std()
+    if t_std == 0:
+        return np.zeros(X.shape[1])
+    t = (t - t.mean()) / t_std
+    out = np.empty(X.shape[1])
+    for i in range(0, X.shape[1], block_size):
+        block = X[:, i:i + block_size]
+        std = block.std(axis=0)
+        std[std == 0] = np.inf
+        out[i:i + block_size] = ((block - block.mean(axis=0)) / std).T @ t / len(t)
+    return out
+
+
+def threshold_clusters(abs_corr: np.ndarray, order: np.ndarray, threshold: float) -> np.ndarray:
+    """Representante (índice de columna) de cada columna; `order` = prioridad para ser representante."""
+    rep = np.full(abs_corr.shape[0], -1)
+    for i in order:
+        if rep[i] >= 0:
+            continue
+        members = (rep < 0) & (abs_corr[i] >= threshold)
+        members[i] = True
+        rep[members] = i
+    return rep
+
+
+def redundancy_prefilter(X: pd.DataFrame, y: pd.Series, corr_threshold: float = 0.95,
+                         variance_floor: float = 0.0, mi_floor: float = None, mi_max_rows: int = 20000,
+                         block_size: int = 512, seed: int = 0, label_rows: np.ndarray = None) -> PrefilterResult:
+    """
+    Aplica los pisos y el clustering por correlación; X sin NaN.
+    `label_rows`: posiciones de las filas donde se mide la relevancia contra
+    y (None = todas).
+    """
+    variances = X.var(axis=0, ddof=0)
+    low_variance = variances.index[variances <= variance_floor].tolist()
+    X = X.drop(columns=low_variance)
+
+    values = X.to_numpy(dtype=np.float64)
+    label_rows = np.arange(len(X)) if label_rows is None else np.asarray(label_rows)
+    y_values = np.asarray(y)
+    low_mi = []
+    if mi_floor is not None:
+        rng = np.random.default_rng(seed)
+        rows = label_rows
+        if len(rows) > mi_max_rows:
+            rows = np.sort(rng.choice(rows, mi_max_rows, replace=False))
+        relevance = pd.Series(mutual_info_classif(values[rows], y_values[rows], random_state=seed),
+                              index=X.columns)
+        low_mi = relevance.index[relevance < mi_floor].tolist()
+        keep = ~relevance.index.isin(low_mi)
+        X, values, relevance = X.loc[:, keep], values[:, keep], relevance[keep]
+    else:
+        # Sin MI: |corr| con el target, sin ajustar nada
+        relevance = pd.Series(np.abs(target_correlation(values[label_rows], y_values[label_rows], block_size)),
+                              index=X.columns)
+
+    corr = blocked_correlation(values, block_size)
+    order = np.argsort(-relevance.to_numpy(), kind="stable")
+    rep = threshold_clusters(np.abs(corr), order, corr_threshold)
+
+    columns = X.columns
+    clusters: Dict[str, List[str]] = {}
+    for i in order:
+        if rep[i] == i:
+            clusters[columns[i]] = columns[rep == i].tolist()
+    kept = [col for col in columns if col in clusters]
+    log.info(f"🧹 [selection] Prefiltro: {len(columns) + len(low_variance) + len(low_mi)} → {len(kept)} features "
+             f"({len(low_variance)} sin varianza, {len(low_mi)} bajo MI, "
+             f"{len(columns) - len(kept)} redundantes con |corr| >= {corr_threshold})")
+    return PrefilterResult(kept, clusters, low_variance, low_mi, relevance,
+                           pd.DataFrame(corr, index=columns, columns=columns))
+
+
+def write_heatmap(corr: pd.DataFrame, path_png, title: str = "Correlación de las top features"):
+    """heatmap.png con seaborn (dependencia del env selection); sin seaborn solo queda el CSV."""
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+    except ImportError:
+        log.warning("⚠️ [selection] Sin matplotlib/seaborn: no se dibuja heatmap.png (queda heatmap.csv)")
+        return
+    size = max(6, 0.35 * len(corr))
+    fig, ax = plt.subplots(figsize=(size, size * 0.8))
+    sns.heatmap(corr, vmin=-1, vmax=1, center=0, cmap="coolwarm", square=True, ax=ax)
+    ax.set_title(title)
+    fig.tight_layout()
+    fig.savefig(path_png, dpi=120)
+    plt.close(fig)
@@ -0,0 +1,173 @@
+"""
+search.py
+
+Búsqueda successive halving sobre la grilla modelo x hiperparámetros.
+
+Evaluar toda la grilla con la CV completa multiplica el costo por el
+número de combinaciones. En cambio, cada candidato (modelo + params)
+arranca en un rung barato: la porción más reciente de la serie (en orden
+temporal, sin barajar) y pocos folds. Solo la mejor fracción 1/eta de
+cada rung pasa al siguiente, con eta veces más filas y más folds; el
+último rung es la CV completa sobre todo el dataset.
+
+Un presupuesto opcional (número de ajustes o segundos de reloj) corta la
+búsqueda: antes de cada rung se estima su costo y, si no entra, gana el
+mejor candidato del último rung completado.
+"""
+import math
+import time
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import ParameterGrid
+
+from core.features.selection.cv import PurgedWalkForward, run_fold_tasks
+from core.features.selection.evaluation import FoldPredictions, score_predictions
+from utils.logger import log
+
+
+@dataclass
+class Candidate:
+    name: str                  # id único, p. ej. "xgboost#2" ("xgboost" si el modelo no tiene grilla)
+    model: str                 # clave de MODELS
+    params: dict
+
+
+@dataclass
+class SearchBudget:
+    max_fits: Optional[int] = None          # ajustes (candidato, fold) en total
+    max_seconds: Optional[float] = None     # tiempo de reloj de toda la búsqueda
+
+    def allows(self, fits_done: int, elapsed: float, next_fits: int, next_seconds: float) -> bool:
+        if self.max_fits is not None and fits_done + next_fits > self.max_fits:
+            return False
+        if self.max_seconds is not None and elapsed + next_seconds > self.max_seconds:
+            return False
+        return True
+
+
+@dataclass
+class SearchResult:
+    best: Candidate
+    best_score: float
+    cv_results: pd.DataFrame                        # todos los rungs (columnas rung y rows)
+    final_results: pd.DataFrame                     # solo el último rung completado
+    rungs: List[dict] = field(default_factory=list)
+    fits: int = 0
+    elapsed_sec: float = 0.0
+    budget_exhausted: bool = False
+    final_predictions: List[FoldPredictions] = field(default_factory=list)   # out-of-fold del último rung
+    final_rows: int = 0                             # el último rung usó las últimas final_rows filas
+    first_predictions: List[FoldPredictions] = field(default_factory=list)   # out-of-fold del rung 0 (todos)
+    first_rows: int = 0                             # el rung 0 usó las últimas first_rows filas
+
+
+def build_candidates(models: List[str], cfg: dict) -> List[Candidate]:
+    """
+    `{modelo}_params` son la base; `search.grid.{modelo}` ({param: [valores]})
+    los pisa con cada combinación. Sin grilla queda un candidato por modelo.
+    """
+    grids = cfg.get("search", {}).get("grid", {}) or {}
+    candidates = []
+    for model in models:
+        base = cfg.get(f"{model}_params", {}) or {}
+        combos = list(ParameterGrid(grids[model])) if grids.get(model) else [{}]
+        for i, combo in enumerate(combos):
+            name = model if len(combos) == 1 else f"{model}#{i}"
+            candidates.append(Candidate(name, model, {**base, **combo}))
+    return candidates
+
+
+def rung_schedule(n_rows: int, n_candidates: int, cv_splits: int, eta: float = 3,
+                  min_rows: int = 2000, min_folds: int = 2) -> List[Tuple[int, int]]:
+    """
+    (filas, folds) de cada rung. Tantos rungs como hacen falta para llegar a
+    un solo candidato, mientras el primero tenga al menos `min_rows` filas;
+    el último siempre es (n_rows, cv_splits).
+    """
+    n_rungs = 1 + (math.ceil(math.log(n_candidates, eta)) if n_candidates > 1 else 0)
+    while n_rungs > 1 and n_rows / eta ** (n_rungs - 1) < min_rows:
+        n_rungs -= 1
+    schedule = []
+    for r in range(n_rungs):
+        shrink = eta ** (n_rungs - 1 - r)
+        folds = min(cv_splits, max(min_folds, math.ceil(cv_splits / shrink)))
+        schedule.append((int(n_rows / shrink), folds))
+    return schedule
+
+
+def _rank_scores(results: pd.DataFrame, metric: str) -> pd.Series:
+    """Media del metric de ranking por candidato; NaN (p. ej. roc_auc sin las dos clases) queda último."""
+    return results.groupby("model", sort=False)[metric].mean().fillna(-np.inf).sort_values(ascending=False)
+
+
+def successive_halving(candidates: List[Candidate], X: pd.DataFrame, y: pd.Series, metrics: List[str],
+                       make_model: Callable, cv_splits: int = 5, cv_cfg: dict = None,
+                       rank_metric: str = None, eta: float = 3, min_rows: int = 2000, min_folds: int = 2,
+                       budget: SearchBudget = None, **run_kwargs) -> SearchResult:
+    """
+    Corre los rungs sobre las últimas `filas` de X/y con PurgedWalkForward.
+    `make_model(ModelName, params)` arma el estimador; `run_kwargs` va a
+    run_fold_tasks (n_workers, threads_per_task, warm_start).
+    """
+    cv_cfg = cv_cfg or {}
+    rank_metric = rank_metric or metrics[0]
+    budget = budget or SearchBudget()
+    schedule = rung_schedule(len(X), len(candidates), cv_splits, eta, min_rows, min_folds)
+    log.info(f"🔎 [selection] Successive halving: {len(candidates)} candidatos, rungs (filas, folds) = {schedule}")
+
+    start = time.perf_counter()
+    alive = list(candidates)
+    by_name = {c.name: c for c in candidates}
+    tables, rungs = [], []
+    fits, last_cost, exhausted = 0, None, False
+    final_preds, final_rows = [], 0
+    first_preds, first_rows = [], 0
+    for r, (rows, folds) in enumerate(schedule):
+        n_fits = len(alive) * folds
+        # costo estimado: segundos por (ajuste x fila) del rung anterior
+        est_sec = 0.0 if last_cost is None else last_cost * n_fits * rows
+        if r > 0 and not budget.allows(fits, time.perf_counter() - start, n_fits, est_sec):
+            log.warning(f"⚠️ [selection] Presupuesto agotado antes del rung {r} ({n_fits} ajustes, ~{est_sec:.0f}s); "
+                        f"gana el mejor del rung {r - 1}")
+            exhausted = True
+            break
+
+        X_r = X.iloc[-rows:].reset_index(drop=True)
+        y_r = y.iloc[-rows:].reset_index(drop=True)
+        splitter = PurgedWalkForward(n_splits=folds, purge=cv_cfg.get("purge", 1),
+                                     embargo=cv_cfg.get("embargo", 0), max_train_size=cv_cfg.get("max_train_size"))
+        makers = {c.name: partial(make_model, c.model, c.params) for c in alive}
+        rung_start = time.perf_counter()
+        preds, usage = run_fold_tasks(makers, X_r, y_r, list(splitter.split(X_r)), **run_kwargs)
+        rung_sec = time.perf_counter() - rung_start
+        fits += n_fits
+        last_cost = rung_sec / (n_fits * rows)
+        final_preds, final_rows = preds, rows
+        if r == 0:
+            # Único rung con todos los candidatos: de acá sale la dispersión entre pruebas
+            first_preds, first_rows = preds, rows
+
+        table = score_predictions(preds, y_r, metrics)
+        table.insert(1, "rung", r)
+        table.insert(2, "rows", rows)
+        tables.append(table)
+        scores = _rank_scores(table, rank_metric)
+        n_keep = max(1, math.ceil(len(alive) / eta)) if r < len(schedule) - 1 else 1
+        rungs.append({"rung": r, "rows": rows, "folds": folds, "candidates": len(alive), "fits": n_fits,
+                      "elapsed_sec": rung_sec, "cpu_utilization": usage["cpu_utilization"],
+                      "scores": {name: float(s) for name, s in scores.items()}})
+        log.info(f"    • Rung {r}: {len(alive)} candidatos x {folds} folds en {rows} filas ({rung_sec:.1f}s); "
+                 f"mejor {scores.index[0]} {rank_metric}={scores.iloc[0]:.4f}")
+        alive = [by_name[name] for name in scores.index[:n_keep]]
+
+    final = tables[-1]
+    best = by_name[_rank_scores(final, rank_metric).index[0]]
+    best_score = float(final.loc[final["model"] == best.name, rank_metric].mean())
+    elapsed = time.perf_counter() - start
+    log.info(f"✅ [selection] Búsqueda: {fits} ajustes en {elapsed:.1f}s; gana {best.name} {best.params}")
+    return SearchResult(best, best_score, pd.concat(tables, ignore_index=True), final, rungs,
+                        fits, elapsed, exhausted, final_preds, final_rows, first_preds, first_rows)
@@ -0,0 +1,194 @@
+"""
+significance.py
+
+Significancia de la selección: bootstrap por bloques de las predicciones
+out-of-fold (ver core/backtest/bootstrap.py).
+
+Las predicciones de todos los folds de cada candidato se concatenan (los
+tests son consecutivos y no se solapan) y se remuestrean con las mismas
+réplicas para todos los candidatos, así las diferencias contra el ganador
+son pareadas. Cada métrica sale de la matriz de conteos de la réplica:
+accuracy, f1 y el sharpe del selector son productos conteos x vector;
+roc_auc se arma con los conteos ordenados por probabilidad (Mann-Whitney
+ponderado, empates a 1/2). Si hay retornos forward, también el Sharpe de
+la estrategia long/short de cada candidato y su deflated Sharpe.
+
+Los puntos de este módulo se calculan sobre la serie out-of-fold completa,
+no como media entre folds (el `score` del ranking).
+"""
+from functools import partial
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from core.backtest.bootstrap import (bootstrap_map, default_block_length, moments_from_counts,
+                                     percentile_interval, sharpe_stats)
+from core.features.selection.evaluation import FoldPredictions
+
+BOOTSTRAP_METRICS = ("accuracy", "f1", "sharpe", "roc_auc")
+
+
+def oof_arrays(folds: List[FoldPredictions], names: List[str]):
+    """(test_index, pred (n, k), proba (n, k) o None) con los folds de cada candidato en orden."""
+    by_model = {name: sorted((f for f in folds if f.model == name), key=lambda f: f.fold) for name in names}
+    test_index = np.concatenate([f.test_index for f in by_model[names[0]]])
+    pred = np.column_stack([np.concatenate([f.pred for f in by_model[name]]) for name in names])
+    has_proba = all(f.proba is not None for name in names for f in by_model[name])
+    proba = np.column_stack([np.concatenate([f.proba for f in by_model[name]]) for name in names]) \
+        if has_proba else None
+    return test_index, pred.astype(np.float64), proba
+
+
+def _strategy_returns(test_index: np.ndarray, pred: np.ndarray, forward_returns) -> np.ndarray:
+    """Retornos de la estrategia long/short (pred 1 → largo, 0 → corto), una columna por candidato."""
+    fwd = np.nan_to_num(np.asarray(forward_returns, dtype=np.float64)[test_index])
+    return (2.0 * pred - 1.0) * fwd[:, None]
+
+
+def strategy_sharpes(folds: List[FoldPredictions], forward_returns) -> Dict[str, float]:
+    """
+    Sharpe por período de la estrategia out-of-fold de cada candidato en
+    `folds`. Son las pruebas del deflated Sharpe: con successive halving se
+    pasan las del rung 0 (todos los candidatos sobre las mismas filas), no
+    solo las de los sobrevivientes, que ya están seleccionados y casi no
+    dispersan.
+    """
+    names = list(dict.fromkeys(f.model for f in folds))
+    test_index, pred, _ = oof_arrays(folds, names)
+    strategy = _strategy_returns(test_index, pred, forward_returns)
+    return {name: sharpe_stats(strategy[:, j])["sharpe"] for j, name in enumerate(names)}
+
+
+def _auc_groups(proba: np.ndarray):
+    """Orden por probabilidad y arranque de cada grupo de valores iguales, por candidato."""
+    out = []
+    for j in range(proba.shape[1]):
+        order = np.argsort(proba[:, j], kind="stable")
+        values = proba[order, j]
+        starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+        out.append((order, starts))
+    return out
+
+
+def weighted_auc(counts: np.ndarray, y: np.ndarray, order: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """roc_auc de cada réplica: P(score positivo > score negativo), con pesos = conteos."""
+    sorted_counts = counts[:, order]
+    y_sorted = y[order]
+    pos = np.add.reduceat(sorted_counts * y_sorted, starts, axis=1)
+    neg = np.add.reduceat(sorted_counts * (1.0 - y_sorted), starts, axis=1)
+    below = np.cumsum(neg, axis=1) - neg                      # negativos con score estrictamente menor
+    num = (pos * (below + 0.5 * neg)).sum(axis=1)
+    den = pos.sum(axis=1) * neg.sum(axis=1)
+    return np.divide(num, den, out=np.full(len(num), np.nan), where=den > 0)
+
+
+def _selection_chunk(y: np.ndarray, pred: np.ndarray, auc_groups, strategy: np.ndarray, metrics: List[str],
+                     counts: np.ndarray, idx: np.ndarray = None) -> Dict[str, np.ndarray]:
+    n, k = pred.shape
+    yc = y[:, None]
+    out = {}
+    if "accuracy" in metrics:
+        acc = counts @ (pred == yc) / n
+        out.update({f"accuracy_{j}": acc[:, j] for j in range(k)})
+    if "f1" in metrics:
+        tp = counts @ (pred * yc)
+        fp = counts @ (pred * (1.0 - yc))
+        fn = counts @ ((1.0 - pred) * yc)
+        den = 2 * tp + fp + fn
+        f1 = np.divide(2 * tp, den, out=np.zeros_like(tp), where=den > 0)
+        out.update({f"f1_{j}": f1[:, j] for j in range(k)})
+    if "sharpe" in metrics:
+        mean, std = moments_from_counts(counts, pred * yc)
+        sharpe = np.divide(mean, std, out=np.zeros_like(mean), where=std > 0)
+        out.update({f"sharpe_{j}": sharpe[:, j] for j in range(k)})
+    if "roc_auc" in metrics and auc_groups is not None:
+        for j, (order, starts) in enumerate(auc_groups):
+            out[f"roc_auc_{j}"] = weighted_auc(counts, y, order, starts)
+    if strategy is not None:
+        mean, std = moments_from_counts(counts, strategy)
+        sharpe = np.divide(mean, std, out=np.zeros_like(mean), where=std > 0)
+        out.update({f"strategy_sharpe_{j}": sharpe[:, j] for j in range(k)})
+    return out
+
+
+def _point(metric: str, y: np.ndarray, pred: np.ndarray, proba: np.ndarray, strategy: np.ndarray) -> float:
+    """Métrica sobre la serie out-of-fold completa (mismas fórmulas que las réplicas, conteos = 1)."""
+    out = _selection_chunk(y, pred[:, None], None if proba is None else _auc_groups(proba[:, None]),
+                           None if strategy is None else strategy[:, None], [metric],
+                           np.ones((1, len(y))))
+    return float(out[f"{metric}_0"][0])
+
+
+def selection_significance(folds: List[FoldPredictions], y: pd.Series, metrics: List[str], winner: str,
+                           rank_metric: str, forward_returns: pd.Series = None, periods_per_year: float = 1.0,
+                           n_trials: int = None, n_boot: int = 2000, block_length: float = None,
+                           method: str = "stationary", alpha: float = 0.05, seed: int = 0,
+                           memory_budget_mb: int = 256, n_workers: int = None,
+                           trial_sharpes: List[float] = None) -> dict:
+    """
+    ICs bootstrap de cada métrica y candidato, diferencia pareada del
+    ganador contra cada rival en `rank_metric` (IC y p-valor de que no sea
+    mejor) y, con `forward_returns`, Sharpe anualizado de la estrategia
+    long/short (pred 1 → largo, 0 → corto) con PSR y deflated Sharpe.
+    `trial_sharpes` (ver strategy_sharpes) da la dispersión entre todas las
+    pruebas; si falta, se usa la de los candidatos de `folds`.
+    """
+    names = list(dict.fromkeys(f.model for f in folds))
+    test_index, pred, proba = oof_arrays(folds, names)
+    y_oof = np.asarray(y, dtype=np.float64)[test_index]
+    boot_metrics = [m for m in metrics if m in BOOTSTRAP_METRICS and (m != "roc_auc" or proba is not None)]
+    strategy = None
+    if forward_returns is not None:
+        strategy = _strategy_returns(test_index, pred, forward_returns)
+
+    block_length = block_length or default_block_length(len(y_oof))
+    fn = partial(_selection_chunk, y_oof, pred, None if proba is None else _auc_groups(proba),
+                 strategy, boot_metrics)
+    reps = bootstrap_map(fn, len(y_oof), n_boot, block_length, method, seed, memory_budget_mb, n_workers)
+
+    candidates = {}
+    for j, name in enumerate(names):
+        entry = {}
+        for metric in boot_metrics:
+            entry[metric] = {
+                "oof": _point(metric, y_oof, pred[:, j], None if proba is None else proba[:, j], None),
+                "ci": percentile_interval(reps[f"{metric}_{j}"], alpha),
+            }
+        candidates[name] = entry
+
+    out = {
+        "method": method,
+        "block_length": float(block_length),
+        "replicates": n_boot,
+        "alpha": alpha,
+        "oof_rows": int(len(y_oof)),
+        "candidates": candidates,
+    }
+
+    # Ganador contra cada rival, con las mismas réplicas
+    key = rank_metric if rank_metric in boot_metrics else None
+    if key is not None and len(names) > 1:
+        w = names.index(winner)
+        versus = {}
+        for j, name in enumerate(names):
+            if j == w:
+                continue
+            diff = reps[f"{key}_{w}"] - reps[f"{key}_{j}"]
+            versus[name] = {"diff_ci": percentile_interval(diff, alpha),
+                            "p_value": float(np.mean(diff <= 0))}
+        out["winner_vs"] = {"metric": key, "winner": winner, "rivals": versus}
+
+    if strategy is not None:
+        scale = np.sqrt(periods_per_year)
+        if trial_sharpes is None:
+            trial_sharpes = [sharpe_stats(strategy[:, j])["sharpe"] for j in range(len(names))]
+        strategies = {}
+        for j, name in enumerate(names):
+            stats = sharpe_stats(strategy[:, j], trial_sharpes, n_trials or len(names))
+            strategies[name] = {**stats,
+                                "sharpe_annual": stats["sharpe"] * scale,
+                                "sharpe_annual_ci": [v * scale for v in
+                                                     percentile_interval(reps[f"strategy_sharpe_{j}"], alpha)]}
+        out["strategy"] = strategies
+    return out
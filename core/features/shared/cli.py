@@ -0,0 +1,36 @@
+import argparse
+import os
+
+from core.features.registry import get_generator
+from core.features.shared.ipc import read_frame, write_frame
+from core.features.shared.utils import load_market_data
+from utils.config_loader import load_yaml
+from utils.logger import log
+
+
+def run_generator_cli(name: str):
+    """
+    Entry point común de core/features/<name>/generate_features.py cuando el
+    grupo corre aislado en su propio venv.
+
+    --input  : frame ya cargado por el orquestador (Arrow IPC); si falta, se
+               cargan las velas desde market_data como antes.
+    --output : destino de las features (.arrow o .csv).
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", required=True)
+    parser.add_argument("--input", default=None)
+    parser.add_argument("--output", default=f"core/features/shared/temp/{name}_features.csv")
+    args = parser.parse_args()
+
+    config = load_yaml(args.config)
+    if args.input:
+        df = read_frame(args.input)
+    else:
+        df = load_market_data(config["market_data"], config.get("quality"))
+
+    df_feat = get_generator(name)(df, config)
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    write_frame(df_feat, args.output)
+    log.info(f"[green]✅ Features {name} guardadas en {args.output} ({df_feat.shape[1]} columnas)[/green]")
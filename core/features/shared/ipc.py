@@ -0,0 +1,25 @@
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.feather as feather
+
+
+def write_frame(df: pd.DataFrame, path: Path):
+    """
+    Escribe un DataFrame para pasarlo entre procesos. `.arrow` usa Arrow IPC
+    sin compresión (se puede memory-mapear del otro lado); otra extensión
+    cae al CSV legado.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == ".arrow":
+        feather.write_feather(df, path, compression="uncompressed")
+    else:
+        df.to_csv(path, index=False)
+
+
+def read_frame(path: Path) -> pd.DataFrame:
+    path = Path(path)
+    if path.suffix == ".arrow":
+        return feather.read_feather(path, memory_map=True)
+    return pd.read_csv(path)
@@ -0,0 +1,205 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+INDEX_COLUMN = "timestamp"
+CANDLES_GROUP = "candles"
+STORAGE_DTYPES = ("float64", "float32")
+
+
+def join_sorted(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Outer join por índice de frames con índice ordenado y único.
+
+    Con índices monótonos pandas usa el merge lineal de libjoin, así que el
+    join es O(n); si todos comparten el índice (el caso normal) no se
+    reindexa nada.
+    """
+    index = frames[0].index
+    for frame in frames[1:]:
+        if not frame.index.equals(index):
+            index = index.join(frame.index, how="outer")
+
+    aligned = []
+    for frame in frames:
+        if frame.index.equals(index):
+            aligned.append(frame)
+            continue
+        _, _, indexer = index.join(frame.index, how="left", return_indexers=True)
+        columns = {}
+        for col in frame.columns:
+            values = frame[col].to_numpy()
+            if values.dtype.kind in "iub":
+                values = values.astype(np.float64)
+            out = values.take(np.maximum(indexer, 0))
+            out[indexer < 0] = np.nan
+            columns[col] = out
+        aligned.append(pd.DataFrame(columns, index=index))
+    return pd.concat(aligned, axis=1)
+
+
+def build_feature_matrix(candles: pd.DataFrame, frames: Dict[str, pd.DataFrame]) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    """
+    Une las velas y las features de cada grupo en una matriz indexada por timestamp.
+
+    Los generadores devuelven frames con el mismo índice que `candles` (o un
+    subconjunto, p. ej. nonlinear tras dropna): ese índice se traduce al
+    timestamp de la vela. Las columnas de las velas (OHLCV, quality_flag)
+    aparecen una sola vez aunque un grupo las devuelva. Devuelve
+    (matriz, {columna: grupo}).
+    """
+    base = candles.set_index(INDEX_COLUMN)
+    groups = {str(col): CANDLES_GROUP for col in base.columns}
+    parts = [base.rename(columns=str)]
+    timestamps = candles[INDEX_COLUMN]
+
+    for group, frame in frames.items():
+        frame = frame.rename(columns=str)
+        if INDEX_COLUMN in frame.columns:
+            frame = frame.set_index(INDEX_COLUMN)
+        else:
+            frame = frame.set_axis(pd.Index(timestamps.loc[frame.index].to_numpy(), name=INDEX_COLUMN), axis=0)
+        frame = frame.drop(columns=[c for c in frame.columns if groups.get(c) == CANDLES_GROUP])
+        clashes = [c for c in frame.columns if c in groups]
+        if clashes:
+            raise ValueError(f"Grupo '{group}': columnas ya generadas por otro grupo {clashes}")
+        groups.update({col: group for col in frame.columns})
+        parts.append(frame.sort_index())
+
+    return join_sorted(parts), groups
+
+
+class FeatureMatrixStore:
+    """
+    Matriz de features en disco, indexada por timestamp.
+
+    Un único archivo Arrow IPC sin compresión (`matrix.arrow`) más
+    `schema.json` con el grupo y dtype de cada columna. El archivo se lee
+    memory-mapeado, así que pedir un subconjunto de columnas o de filas no
+    carga el resto de la matriz.
+    """
+
+    DATA_FILE = "matrix.arrow"
+    SCHEMA_FILE = "schema.json"
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    @property
+    def data_path(self) -> Path:
+        return self.root / self.DATA_FILE
+
+    @property
+    def schema_path(self) -> Path:
+        return self.root / self.SCHEMA_FILE
+
+    def write(self, matrix: pd.DataFrame, groups: Dict[str, str], dtype: str = "float64"):
+        """Guarda la matriz (índice timestamp ordenado); con dtype float32 se castean las columnas float."""
+        writer = self.open_writer(dtype)
+        try:
+            writer.write(matrix, groups)
+        except Exception:
+            writer.abort()
+            raise
+        writer.close()
+
+    def open_writer(self, dtype: str = "float64") -> "FeatureMatrixWriter":
+        """Writer incremental: la matriz se escribe por chunks de filas consecutivas."""
+        return FeatureMatrixWriter(self, dtype)
+
+    def schema(self) -> dict:
+        with open(self.schema_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def columns(self, groups: List[str] = None) -> List[str]:
+        return [c["name"] for c in self.schema()["columns"] if groups is None or c["group"] in groups]
+
+    def read(self, columns: List[str] = None, start=None, end=None) -> pd.DataFrame:
+        """Columnas pedidas (todas por defecto) en [start, end), indexadas por timestamp."""
+        table = feather.read_table(self.data_path, columns=None if columns is None else [INDEX_COLUMN] + list(columns),
+                                   memory_map=True)
+        if start is not None or end is not None:
+            index = table.column(INDEX_COLUMN).to_numpy()
+            lo = 0 if start is None else np.searchsorted(index, np.datetime64(pd.Timestamp(start)), side="left")
+            hi = len(index) if end is None else np.searchsorted(index, np.datetime64(pd.Timestamp(end)), side="left")
+            table = table.slice(lo, hi - lo)
+        return table.to_pandas().set_index(INDEX_COLUMN)
+
+
+class FeatureMatrixWriter:
+    """
+    Escribe la matriz de un FeatureMatrixStore como record batches Arrow, un
+    chunk de filas por vez, sin tenerla entera en memoria. El primer chunk
+    fija las columnas y dtypes; schema.json se escribe al cerrar.
+    """
+
+    def __init__(self, store: FeatureMatrixStore, dtype: str = "float64"):
+        if dtype not in STORAGE_DTYPES:
+            raise ValueError(f"dtype '{dtype}' inválido. Opciones: {STORAGE_DTYPES}")
+        self.store = store
+        self.dtype = dtype
+        self.rows = 0
+        self.schema_columns = None
+        self._arrow_schema = None
+        self._writer = None
+        self._sink = None
+        self._last_ts = None
+        self._tmp_path = store.data_path.with_suffix(".tmp")
+
+    def write(self, matrix: pd.DataFrame, groups: Dict[str, str]):
+        if len(matrix) == 0:
+            return
+        index = matrix.index
+        if not index.is_monotonic_increasing or not index.is_unique:
+            raise ValueError("La matriz de features necesita un índice de timestamps ordenado y sin duplicados")
+        if self._last_ts is not None and index[0] <= self._last_ts:
+            raise ValueError("Los chunks de la matriz de features tienen que llegar en orden de timestamp")
+
+        arrays, names, dtypes = [pa.array(index.to_numpy())], [INDEX_COLUMN], []
+        for col in matrix.columns:
+            values = matrix[col].to_numpy()
+            if values.dtype.kind == "f":
+                values = values.astype(self.dtype, copy=False)
+            arrays.append(pa.array(values))
+            names.append(col)
+            dtypes.append(str(values.dtype))
+        table = pa.Table.from_arrays(arrays, names=names)
+
+        if self._writer is None:
+            self._arrow_schema = table.schema
+            self.schema_columns = [{"name": col, "group": groups.get(col, "unknown"), "dtype": dtype}
+                                   for col, dtype in zip(names[1:], dtypes)]
+            self.store.root.mkdir(parents=True, exist_ok=True)
+            self._sink = pa.OSFile(str(self._tmp_path), "wb")
+            self._writer = pa.ipc.new_file(self._sink, self._arrow_schema)
+        elif names != self._arrow_schema.names:
+            raise ValueError("Las columnas del chunk no coinciden con las del primer chunk")
+
+        self._writer.write_table(table.cast(self._arrow_schema))
+        self.rows += len(matrix)
+        self._last_ts = index[-1]
+
+    def close(self):
+        if self._writer is None:
+            return
+        self._writer.close()
+        self._sink.close()
+        self._writer = None
+        os.replace(self._tmp_path, self.store.data_path)
+        with open(self.store.schema_path, "w", encoding="utf-8") as f:
+            json.dump({"index": INDEX_COLUMN, "rows": self.rows, "columns": self.schema_columns}, f, indent=2)
+
+    def abort(self):
+        """Descarta lo escrito: la matriz anterior (si había) queda intacta."""
+        if self._writer is None:
+            return
+        self._writer.close()
+        self._sink.close()
+        self._writer = None
+        self._tmp_path.unlink(missing_ok=True)
@@ -1,6 +1,14 @@
 from pathlib import Path
 import pandas as pd
 
+from core.data.coverage import CoverageIndex
+from core.data.models import CandleBatch
+from core.data.quality import clean_candles
+from core.data.resample import resample_candles
+from core.data.store import CandleStore, DEFAULT_STORE_ROOT
+from core.data.timeframes import request_range_ms
+from utils.logger import log
+
 
 def build_data_path(symbol: str, interval: str, start_date: str, end_date: str, provider: str) -> Path:
     symbol_clean = symbol.replace("/", "")
@@ -9,9 +17,48 @@ def build_data_path(symbol: str, interval: str, start_date: str, end_date: str,
     return folder / file_name
 
 
-def merge_feature_files(folder: Path) -> pd.DataFrame:
-    dfs = []
-    for file in folder.glob("*_features.csv"):
-        df = pd.read_csv(file)
-        dfs.append(df)
-    return pd.concat(dfs, axis=1)
+def load_market_data(md: dict, quality_cfg: dict = None) -> pd.DataFrame:
+    """
+    Carga las velas de la sección market_data del YAML. Lee del CandleStore
+    (Parquet) si cubre el rango pedido y, si no, cae al CSV legado. Si hay
+    `base_interval`, lee esa serie y la re-muestrea a `interval`.
+
+    Con `quality_cfg` (sección quality del YAML) aplica la etapa de calidad
+    antes de devolver; el reporte queda en df.attrs["quality_report"].
+    """
+    store = CandleStore(md.get("store_path", DEFAULT_STORE_ROOT))
+    start_ms, end_ms = request_range_ms(md["start_date"], md["end_date"])
+    stored_interval = md.get("base_interval") or md["interval"]
+    coverage = CoverageIndex(store, md["provider"], md["symbol"], stored_interval)
+    if coverage.covers(start_ms, end_ms):
+        candles = store.read(md["provider"], md["symbol"], stored_interval, start_ms, end_ms)
+        if stored_interval != md["interval"]:
+            candles = resample_candles(candles, stored_interval, md["interval"])
+    else:
+        data_path = build_data_path(
+            symbol=md["symbol"],
+            interval=md["interval"],
+            start_date=md["start_date"],
+            end_date=md["end_date"],
+            provider=md["provider"]
+        )
+        candles = CandleBatch.from_frame(pd.read_csv(data_path))
+
+    if not quality_cfg or not quality_cfg.get("enabled", True):
+        return candles.to_frame()
+
+    policy = quality_cfg.get("policy", "flag")
+    candles, flags, report = clean_candles(
+        candles, md["interval"], policy=policy, spike_sigma=quality_cfg.get("spike_sigma", 10.0)
+    )
+    df = candles.to_frame()
+    if policy == "flag":
+        df["quality_flag"] = flags
+    df.attrs["quality_report"] = report.to_dict()
+    if not report.is_clean:
+        log.warning(
+            f"⚠️ [quality] {report.duplicates} duplicadas, {report.gaps} huecos ({report.missing_bars} velas), "
+            f"{report.zero_volume} vol=0, {report.spikes} spikes, {report.invalid} inválidas -> política '{policy}'"
+        )
+    return df
+
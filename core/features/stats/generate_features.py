@@ -1,68 +1,67 @@
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
-import argparse
+import numpy as np
 import pandas as pd
-from utils.config_loader import load_yaml
-from core.features.shared.utils import build_data_path
+from core.features.chunked import WindowChunkRunner
+from core.features.registry import register_chunk_runner, register_generator
+from core.features.shared.cli import run_generator_cli
+from core.features.stats.rolling_kernel import RollingMoments, fill_window_stats, kernel_chunk_rows, same_value_run
 from utils.logger import log
 
 
-def generate_stats_features(df: pd.DataFrame, windows: list) -> pd.DataFrame:
-    df_feat = pd.DataFrame(index=df.index)
-
-    for window in windows:
-        # Rolling mean
-        df_feat[f'close_mean_{window}'] = df['close'].rolling(window).mean()
-        df_feat[f'volume_mean_{window}'] = df['volume'].rolling(window).mean()
-
-        # Rolling std
-        df_feat[f'close_std_{window}'] = df['close'].rolling(window).std()
-        df_feat[f'volume_std_{window}'] = df['volume'].rolling(window).std()
-
-        # Z-score
-        df_feat[f'close_zscore_{window}'] = (df['close'] - df_feat[f'close_mean_{window}']) / df_feat[f'close_std_{window}']
-        df_feat[f'volume_zscore_{window}'] = (df['volume'] - df_feat[f'volume_mean_{window}']) / df_feat[f'volume_std_{window}']
-
-        # Min / Max
-        df_feat[f'close_min_{window}'] = df['close'].rolling(window).min()
-        df_feat[f'close_max_{window}'] = df['close'].rolling(window).max()
-
-        # Skewness / Kurtosis
-        df_feat[f'close_skew_{window}'] = df['close'].rolling(window).skew()
-        df_feat[f'close_kurt_{window}'] = df['close'].rolling(window).kurt()
-
-    return df_feat
+STATS_PER_WINDOW = [
+    "close_mean", "volume_mean", "close_std", "volume_std", "close_zscore", "volume_zscore",
+    "close_min", "close_max", "close_skew", "close_kurt",
+]
 
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--config", required=True)
-    args = parser.parse_args()
-
-    config = load_yaml(args.config)
-    md = config["market_data"]
+def generate_stats_features(df: pd.DataFrame, windows: list) -> pd.DataFrame:
+    """
+    Estadísticas rolling de close/volume para cada ventana.
+
+    Todas las ventanas salen de las mismas sumas prefijas (ver rolling_kernel)
+    y se escriben en una única matriz preasignada; los valores coinciden con
+    los `.rolling()` de pandas dentro del error de redondeo.
+    """
+    windows = list(windows)
+    # Posición absoluta de la primera fila (corridas por chunks): ancla la grilla interna del kernel
+    origin = int(df.index[0]) if isinstance(df.index, pd.RangeIndex) and len(df) and df.index.step == 1 else 0
+    columns = [f"{name}_{window}" for window in windows for name in STATS_PER_WINDOW]
+    out = np.empty((len(df), len(columns)), order="F")
+    if windows:
+        close = df["close"].to_numpy(dtype=np.float64)
+        volume = df["volume"].to_numpy(dtype=np.float64)
+        max_window = max(windows)
+        close_m = RollingMoments(close, max_window, order=4, origin=origin)
+        volume_m = RollingMoments(volume, max_window, order=2, origin=origin)
+        close_run, volume_run = same_value_run(close), same_value_run(volume)
+        for i, window in enumerate(windows):
+            block = out[:, i * len(STATS_PER_WINDOW):(i + 1) * len(STATS_PER_WINDOW)]
+            fill_window_stats(close, volume, close_m, volume_m, close_run, volume_run, window, block)
+
+    return pd.DataFrame(out, index=df.index, columns=columns)
+
+
+@register_generator("stats")
+def run(df: pd.DataFrame, config: dict) -> pd.DataFrame:
     stats_cfg = config["features"]["stats"]
     windows = stats_cfg.get("windows", [5, 10, 20])
 
-    data_path = build_data_path(
-        symbol=md["symbol"],
-        interval=md["interval"],
-        start_date=md["start_date"],
-        end_date=md["end_date"],
-        provider=md["provider"]
-    )
-
-    df = pd.read_csv(data_path)
     log.info(f"[cyan]📊 Calculando stats rolling...[/cyan]")
+    return generate_stats_features(df, windows)
+
 
-    df_feat = generate_stats_features(df, windows)
+@register_chunk_runner("stats")
+def chunk_runner(config: dict) -> WindowChunkRunner:
+    # La ventana más larga necesita sus window-1 filas previas
+    windows = config["features"]["stats"].get("windows", [5, 10, 20])
+    max_window = max(windows, default=1)
+    return WindowChunkRunner(run, config, warmup=max_window - 1, align=kernel_chunk_rows(max_window))
 
-    output_file = "core/features/shared/temp/stats_features.csv"
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    df_feat.to_csv(output_file, index=False)
 
-    log.info(f"[green]✅ Features stats guardadas en {output_file} ({df_feat.shape[1]} columnas)[/green]")
+def main():
+    run_generator_cli("stats")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,220 @@
+"""
+Kernel vectorizado de estadísticas rolling para varias ventanas a la vez.
+
+En vez de un `.rolling()` de pandas por estadística y por ventana, cada serie
+se procesa una sola vez:
+
+- RollingMoments arma sumas prefijas de potencias (x - c)^k, k=1..order,
+  que comparten todas las ventanas: la suma de cualquier ventana es una
+  resta de dos prefijos. Para que la resta no pierda precisión la serie se
+  parte en chunks de `chunk_size` filas (más un solapamiento de
+  max_window - 1 filas de warm-up), cada chunk se centra en un valor propio
+  `c` y los prefijos se acumulan con suma compensada (Kahan).
+- rolling_max / rolling_min usan el esquema de bloques de van Herk /
+  Gil-Werman: O(n) por ventana independientemente de su tamaño, en numpy.
+
+Las fórmulas de media, desvío (ddof=1), skew y kurt replican las de las
+agregaciones rolling de pandas, incluido el caso de ventana constante.
+"""
+from typing import Tuple
+
+import numpy as np
+
+
+def same_value_run(x: np.ndarray) -> np.ndarray:
+    """Largo de la racha de valores iguales que termina en cada fila (como pandas)."""
+    n = len(x)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    idx = np.arange(n)
+    starts = np.ones(n, dtype=bool)
+    starts[1:] = x[1:] != x[:-1]
+    run_start = np.maximum.accumulate(np.where(starts, idx, 0))
+    return idx - run_start + 1
+
+
+def _rolling_extreme(x: np.ndarray, window: int, ufunc) -> np.ndarray:
+    n = len(x)
+    out = np.full(n, np.nan)
+    if window > n:
+        return out
+    if window == 1:
+        out[:] = x
+        return out
+    n_blocks = -(-n // window)
+    padded = np.full(n_blocks * window, np.nan)
+    padded[:n] = x
+    blocks = padded.reshape(n_blocks, window)
+    prefix = ufunc.accumulate(blocks, axis=1).ravel()
+    suffix = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    # La ventana [i-w+1, i] es la cola de un bloque más la cabeza del siguiente
+    out[window - 1:] = ufunc(suffix[:n - window + 1], prefix[window - 1:n])
+    return out
+
+
+def rolling_max(x: np.ndarray, window: int) -> np.ndarray:
+    return _rolling_extreme(x, window, np.maximum)
+
+
+def rolling_min(x: np.ndarray, window: int) -> np.ndarray:
+    return _rolling_extreme(x, window, np.minimum)
+
+
+def _kahan_cumsum(values: np.ndarray) -> np.ndarray:
+    """Suma prefija compensada a lo largo del eje 0, vectorizada sobre el resto."""
+    out = np.empty((values.shape[0] + 1,) + values.shape[1:])
+    out[0] = 0.0
+    total = np.zeros(values.shape[1:])
+    comp = np.zeros(values.shape[1:])
+    for k in range(values.shape[0]):
+        y = values[k] - comp
+        t = total + y
+        comp = (t - total) - y
+        total = t
+        out[k + 1] = total
+    return out
+
+
+def kernel_chunk_rows(max_window: int, chunk_size: int = 128) -> int:
+    """Filas por chunk interno de RollingMoments (el solapamiento de warm-up no pasa del 25%)."""
+    return max(chunk_size, 4 * (max_window - 1), 1)
+
+
+class RollingMoments:
+    """
+    Sumas de potencias por ventana de una serie, compartidas entre ventanas.
+
+    `moments(window)` devuelve (media, B, C, D) con las mismas definiciones
+    que pandas: B = varianza poblacional, C = tercer y D = cuarto momento
+    central (C y D solo si order >= 3 / 4). Las filas con menos de `window`
+    valores válidos quedan en NaN, igual que `.rolling(window)`.
+    """
+
+    def __init__(self, values: np.ndarray, max_window: int, order: int = 2, chunk_size: int = 128,
+                 origin: int = 0):
+        x = np.asarray(values, dtype=np.float64)
+        self.n = len(x)
+        self.order = order
+        self.max_window = max_window
+        self.chunk = kernel_chunk_rows(max_window, chunk_size)
+
+        # La grilla de chunks se ancla en la posición absoluta `origin` de values[0]:
+        # así una corrida por tramos alineados a self.chunk da exactamente los mismos números
+        first = origin // self.chunk
+        self.head = origin - first * self.chunk
+        n_chunks = max(-(-(self.head + self.n) // self.chunk), 1)
+        self.n_chunks = n_chunks
+
+        # Serie con max_window-1 filas de warm-up al principio y relleno al final;
+        # cada fila de `ext` es un chunk más su warm-up (vista, sin copiar la serie)
+        lead = max_window - 1
+        padded = np.full(lead + n_chunks * self.chunk, np.nan)
+        padded[lead + self.head:lead + self.head + self.n] = x
+        length = self.chunk + lead
+        ext = np.lib.stride_tricks.sliding_window_view(padded, length)[::self.chunk].T  # (length, n_chunks)
+
+        # Cada chunk se centra en su primer valor de salida (o en la media si falta):
+        # el prefijo de una fila solo depende de las filas anteriores del chunk
+        valid = ~np.isnan(ext)
+        n_valid = valid.sum(axis=0)
+        mean = np.where(n_valid > 0, np.where(valid, ext, 0.0).sum(axis=0) / np.maximum(n_valid, 1), 0.0)
+        self.shift = np.where(valid[lead], ext[lead], mean)
+        y = np.where(valid, ext - self.shift, 0.0)
+
+        powers = np.empty((length, order, n_chunks))
+        powers[:, 0] = y
+        for k in range(1, order):
+            powers[:, k] = powers[:, k - 1] * y
+        # (order, n_chunks, length + 1): las restas de prefijos salen ya en el orden de las filas
+        self.sums = np.ascontiguousarray(_kahan_cumsum(powers).transpose(1, 2, 0))
+        del powers
+        invalid = np.zeros((length + 1, n_chunks), dtype=np.int64)
+        np.cumsum(~valid, axis=0, out=invalid[1:])
+        self.invalid = np.ascontiguousarray(invalid.T)
+
+    def _window(self, window: int) -> Tuple[slice, slice]:
+        end = self.max_window  # índice del prefijo que cierra la primera fila de salida
+        return slice(end, end + self.chunk), slice(end - window, end - window + self.chunk)
+
+    def moments(self, window: int) -> tuple:
+        if not 1 <= window <= self.max_window:
+            raise ValueError(f"Ventana {window} fuera de rango (1..{self.max_window})")
+        hi, lo = self._window(window)
+
+        def mean_power(k):
+            out = self.sums[k, :, hi] - self.sums[k, :, lo]
+            out /= window
+            return out
+
+        a = mean_power(0)
+        result = [a + self.shift[:, None]]
+        if self.order >= 2:
+            a2 = a * a
+            b = mean_power(1)
+            b -= a2
+            result.append(b)
+        if self.order >= 3:
+            c = mean_power(2)
+            c -= a * (a2 + 3 * b)
+            result.append(c)
+        if self.order >= 4:
+            d = mean_power(3)
+            d -= a * (a * (a2 + 6 * b) + 4 * c)
+            result.append(d)
+
+        missing = (self.invalid[:, hi] - self.invalid[:, lo]) > 0
+        flat = []
+        for arr in result:
+            np.copyto(arr, np.nan, where=missing)
+            flat.append(arr.reshape(-1)[self.head:self.head + self.n])
+        return tuple(flat)
+
+
+def fill_window_stats(close: np.ndarray, volume: np.ndarray, close_m: RollingMoments, volume_m: RollingMoments,
+                      close_run: np.ndarray, volume_run: np.ndarray, window: int, out: np.ndarray):
+    """
+    Escribe en `out` (n x 10) las columnas de una ventana en el orden de
+    generate_stats_features: close/volume mean, std, zscore, close min/max, skew, kurt.
+    """
+    w = float(window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        close_moments = close_m.moments(window)
+        for series, (mean, var, *_), run, cols in ((close, close_moments, close_run, (0, 2, 4)),
+                                                   (volume, volume_m.moments(window), volume_run, (1, 3, 5))):
+            const = run >= window
+            # Ventana constante: media exacta y desvío 0, como en pandas
+            np.copyto(mean, series, where=const)
+            if window > 1:
+                std = np.maximum(var, 0.0)
+                std *= w / (w - 1)
+                np.sqrt(std, out=std)
+                np.copyto(std, 0.0, where=const)
+            else:
+                std = np.full_like(var, np.nan)
+            out[:, cols[0]] = mean
+            out[:, cols[1]] = std
+            out[:, cols[2]] = (series - mean) / std
+
+        out[:, 6] = rolling_min(close, window)
+        out[:, 7] = rolling_max(close, window)
+
+        _, b, c, d = close_moments
+        const = close_run >= window
+        flat = b <= 1e-14
+        if window >= 3:
+            skew = np.sqrt(w * (w - 1)) * c / ((w - 2) * b * np.sqrt(b))
+            np.copyto(skew, np.nan, where=flat)
+            np.copyto(skew, 0.0, where=const)
+        else:
+            skew = np.full_like(b, np.nan)
+        if window >= 4:
+            kurt = ((w * w - 1) * d / (b * b) - 3 * (w - 1) ** 2) / ((w - 2) * (w - 3))
+            np.copyto(kurt, np.nan, where=flat)
+            np.copyto(kurt, -3.0, where=const)
+        else:
+            kurt = np.full_like(b, np.nan)
+        missing = np.isnan(b)
+        np.copyto(skew, np.nan, where=missing)
+        np.copyto(kurt, np.nan, where=missing)
+        out[:, 8] = skew
+        out[:, 9] = kurt
@@ -0,0 +1,62 @@
+# Benchmark: List[Candle] + DataFrame vs CandleBatch columnar
+#   python experiments/bench_candle_batch.py [n_velas]
+import sys
+import os
+sys.path.insert(0, os.path.abspath("."))
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from core.data.models import Candle, CandleBatch
+from utils.logger import log
+
+
+def make_raw(n: int) -> list:
+    ts = 1_704_067_200_000 + np.arange(n, dtype=np.int64) * 60_000
+    px = 2300 + np.random.default_rng(0).standard_normal(n).cumsum()
+    return [[int(t), p, p + 1, p - 1, p + 0.5, 10.0] for t, p in zip(ts, px)]
+
+
+def legacy_path(raw: list) -> pd.DataFrame:
+    candles = [
+        Candle(
+            timestamp=datetime.fromtimestamp(e[0] / 1000),
+            open=e[1], high=e[2], low=e[3], close=e[4], volume=e[5],
+        )
+        for e in raw
+    ]
+    return pd.DataFrame([c.__dict__ for c in candles])
+
+
+def columnar_path(raw: list) -> pd.DataFrame:
+    return CandleBatch.from_raw(raw).to_frame()
+
+
+def measure(fn, raw):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    fn(raw)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    raw = make_raw(n)
+    log.info(f"[cyan]⏱️ Benchmark con {n} velas[/cyan]")
+
+    t_old, mem_old = measure(legacy_path, raw)
+    t_new, mem_new = measure(columnar_path, raw)
+
+    log.info(f"    List[Candle] + DataFrame : {t_old:7.2f}s  pico {mem_old:8.1f} MB")
+    log.info(f"    CandleBatch.to_frame     : {t_new:7.2f}s  pico {mem_new:8.1f} MB")
+    log.info(f"[green]✅ Speedup x{t_old / t_new:.1f}, memoria x{mem_old / mem_new:.1f}[/green]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# Memoria pico de la generación de features: historia completa vs por chunks
+# (core/features/chunked.py). Cada modo corre en un proceso aparte para medir su RSS.
+#   python experiments/bench_chunked_features.py [n_velas] [memory_budget_mb]
+import sys
+import os
+sys.path.insert(0, os.path.abspath("."))
+import multiprocessing as mp
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.logger import log
+
+CONFIG = {
+    "features": {
+        "execution": "inprocess",
+        "max_workers": 1,
+        "cache": {"enabled": False},
+        "ohlcv": {"enabled": True, "indicators": "all"},
+        "stats": {"enabled": True, "windows": [5, 10, 20, 50, 100, 200]},
+        "relational": {"enabled": True},
+    }
+}
+
+
+def make_candles(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    close = 2300 * np.exp(np.cumsum(rng.normal(0, 1e-3, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    return pd.DataFrame({
+        "timestamp": pd.date_range("2021-01-01", periods=n, freq="min"),
+        "open": open_,
+        "high": np.maximum(open_, close) * 1.0005,
+        "low": np.minimum(open_, close) * 0.9995,
+        "close": close,
+        "volume": rng.exponential(10, n),
+    })
+
+
+def run_mode(mode: str, n: int, budget_mb: float, queue):
+    from core.features.run_feature_pipeline import build_matrix_chunked, build_matrix_in_memory
+    from core.features.shared.matrix_store import FeatureMatrixStore
+
+    df = make_candles(n)
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    store = FeatureMatrixStore(tempfile.mkdtemp())
+    t0 = time.perf_counter()
+    if mode == "chunked":
+        config = dict(CONFIG, features=dict(CONFIG["features"], chunked={"memory_budget_mb": budget_mb}))
+        build_matrix_chunked(df, config, "", store, {})
+    else:
+        build_matrix_in_memory(df, CONFIG, "", store, {}, Path(tempfile.mkdtemp()) / "X_full.csv")
+    elapsed = time.perf_counter() - t0
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    queue.put((elapsed, base_rss / 1024, peak_mb, store.data_path.stat().st_size / 1024 ** 2))
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    budget_mb = float(sys.argv[2]) if len(sys.argv) > 2 else 256
+    log.info(f"[cyan]⏱️ Features sobre {n:,} velas 1m (presupuesto chunked {budget_mb:.0f} MB)[/cyan]")
+    ctx = mp.get_context("spawn")
+    for mode in ("in-memory", "chunked"):
+        queue = ctx.Queue()
+        proc = ctx.Process(target=run_mode, args=(mode, n, budget_mb, queue))
+        proc.start()
+        elapsed, base_mb, peak_mb, matrix_mb = queue.get()
+        proc.join()
+        log.info(f"    {mode:<9}: {elapsed:7.1f}s  RSS pico {peak_mb:7.0f} MB "
+                 f"(+{peak_mb - base_mb:.0f} MB sobre las velas)  matriz {matrix_mb:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# Benchmark de ejecución de features: subprocess+CSV vs subprocess+Arrow IPC vs in-process
+#   python experiments/bench_feature_execution.py [n_velas]
+#
+# Usa el intérprete actual para los "venvs" (tiene que tener pandas, ta y pyarrow).
+# Los grupos corren secuencialmente (max_workers=1) para comparar solo el mecanismo de ejecución.
+import sys
+import os
+sys.path.insert(0, os.path.abspath("."))
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from core.data.coverage import CoverageIndex
+from core.data.models import CandleBatch, CANDLE_DTYPE
+from core.data.store import CandleStore
+from core.features.run_feature_pipeline import generate_feature_groups, run_env_generator
+from core.features.shared.matrix_store import build_feature_matrix
+from core.features.shared.utils import load_market_data
+from utils.logger import log
+
+GROUPS = ["ohlcv", "stats", "relational"]
+
+
+def make_store(root: Path, n: int) -> dict:
+    rng = np.random.default_rng(0)
+    data = np.empty(n, dtype=CANDLE_DTYPE)
+    data["timestamp"] = 1_704_067_200_000 + np.arange(n, dtype=np.int64) * 60_000
+    close = 2300 * np.exp(np.cumsum(rng.normal(0, 1e-3, n)))
+    data["open"] = np.roll(close, 1)
+    data["close"] = close
+    data["high"] = np.maximum(data["open"], close) * 1.0005
+    data["low"] = np.minimum(data["open"], close) * 0.9995
+    data["volume"] = rng.exponential(10, n)
+    batch = CandleBatch(data)
+
+    store = CandleStore(root)
+    store.write("synthetic", "BENCH/USDT", "1m", batch)
+    coverage = CoverageIndex(store, "synthetic", "BENCH/USDT", "1m")
+    coverage.add(int(data["timestamp"][0]), int(data["timestamp"][-1]) + 60_000)
+    coverage.save()
+
+    days = n // 1440
+    return {
+        "market_data": {
+            "symbol": "BENCH/USDT", "interval": "1m", "provider": "synthetic",
+            "start_date": "2024-01-01",
+            "end_date": str(np.datetime64("2024-01-01") + np.timedelta64(max(days - 1, 0), "D")),
+            "store_path": str(root),
+        },
+        "features": {
+            "max_workers": 1,
+            "ohlcv": {"enabled": True, "indicators": "all"},
+            "stats": {"enabled": True, "windows": [5, 10, 20]},
+            "relational": {"enabled": True},
+        },
+    }
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    n -= n % 1440  # días completos para que la cobertura cierre
+    tmp = Path(tempfile.mkdtemp(prefix="bench_features_"))
+    config = make_store(tmp / "store", n)
+    config_path = tmp / "config.yaml"
+    with open(config_path, "w") as f:
+        yaml.dump(config, f)
+    log.info(f"[cyan]⏱️ Features {GROUPS} sobre {n:,} velas[/cyan]")
+
+    # 1) Legado: cada grupo en su proceso, relee las velas y escribe CSV
+    t0 = time.perf_counter()
+    legacy_dir = tmp / "legacy"
+    for env in GROUPS:
+        run_env_generator(env, "generate_features.py", str(config_path),
+                          extra_args=["--output", str(legacy_dir / f"{env}_features.csv")],
+                          python_exe=sys.executable)
+    # merge legado: concat por posición de los CSV de cada grupo
+    pd.concat([pd.read_csv(path) for path in sorted(legacy_dir.glob("*_features.csv"))], axis=1)
+    t_legacy = time.perf_counter() - t0
+
+    # 2) Aislado con Arrow IPC: una sola carga, hand-off sin parsear texto
+    t0 = time.perf_counter()
+    df = load_market_data(config["market_data"])
+    config["features"]["execution"] = "subprocess"
+    frames, _ = generate_feature_groups(df, config, str(config_path), tmp / "arrow", python_exe=sys.executable)
+    build_feature_matrix(df, frames)
+    t_arrow = time.perf_counter() - t0
+
+    # 3) In-process: generadores como plugins sobre el frame ya cargado
+    t0 = time.perf_counter()
+    df = load_market_data(config["market_data"])
+    config["features"]["execution"] = "inprocess"
+    frames, _ = generate_feature_groups(df, config, str(config_path), tmp)
+    build_feature_matrix(df, frames)
+    t_inproc = time.perf_counter() - t0
+
+    log.info(f"    subprocess + CSV       : {t_legacy:7.2f}s")
+    log.info(f"    subprocess + Arrow IPC : {t_arrow:7.2f}s  (x{t_legacy / t_arrow:.1f})")
+    log.info(f"    in-process             : {t_inproc:7.2f}s  (x{t_legacy / t_inproc:.1f})")
+
+
+if __name__ == "__main__":
+    main()
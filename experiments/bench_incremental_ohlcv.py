@@ -0,0 +1,82 @@
+# Benchmark del motor incremental de indicadores (core/features/ohlcv/incremental.py)
+# contra recalcular todo el grupo ohlcv con `ta` en cada vela nueva.
+#   python experiments/bench_incremental_ohlcv.py [n_historia] [n_velas_vivo]
+import sys
+import os
+sys.path.insert(0, os.path.abspath("."))
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.features.ohlcv.generate_features import generate_ohlcv_features
+from core.features.ohlcv.incremental import IncrementalOHLCVEngine, ALL_INDICATORS
+from utils.logger import log
+
+RTOL = 1e-8
+
+
+def make_candles(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    close = 2300 * np.exp(np.cumsum(rng.normal(0, 1e-3, n)))
+    open_ = np.roll(close, 1)
+    open_[0] = close[0]
+    return pd.DataFrame({
+        "timestamp": pd.date_range("2024-01-01", periods=n, freq="min"),
+        "open": open_,
+        "high": np.maximum(open_, close) * (1 + rng.uniform(0, 1e-3, n)),
+        "low": np.minimum(open_, close) * (1 - rng.uniform(0, 1e-3, n)),
+        "close": close,
+        "volume": rng.exponential(10, n),
+    })
+
+
+def check_against_ta(df: pd.DataFrame):
+    ref = generate_ohlcv_features(df.copy(), ALL_INDICATORS)
+    out = IncrementalOHLCVEngine(ALL_INDICATORS).run(df)
+    worst = 0.0
+    for col in out.columns:
+        a, b = ref[col].to_numpy(dtype=float), out[col].to_numpy()
+        assert (np.isnan(a) == np.isnan(b)).all(), f"{col}: NaN en posiciones distintas"
+        mask = ~np.isnan(a)
+        err = np.max(np.abs(a[mask] - b[mask]) / np.maximum(np.abs(a[mask]), 1.0), initial=0.0)
+        assert err < RTOL, f"{col}: error relativo {err:.2e}"
+        worst = max(worst, err)
+    log.info(f"    ✅ {len(out.columns)} columnas coinciden con ta (error relativo máx {worst:.1e})")
+
+
+def main():
+    n_history = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    n_live = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    df = make_candles(n_history + n_live)
+    history, live = df.iloc[:n_history], df.iloc[n_history:]
+
+    check_against_ta(df.iloc[:20_000])
+
+    engine = IncrementalOHLCVEngine(ALL_INDICATORS)
+    t0 = time.perf_counter()
+    engine.bootstrap(history)
+    log.info(f"[cyan]⏱️ Bootstrap sobre {n_history:,} velas: {time.perf_counter() - t0:.2f}s[/cyan]")
+
+    rows = live[["open", "high", "low", "close", "volume"]].to_numpy().tolist()
+    latencies = np.empty(len(rows))
+    for i, row in enumerate(rows):
+        t0 = time.perf_counter()
+        engine.update(*row)
+        latencies[i] = time.perf_counter() - t0
+    latencies *= 1e6
+    log.info(f"    incremental: p50={np.percentile(latencies, 50):6.1f}µs  "
+             f"p99={np.percentile(latencies, 99):6.1f}µs  media={latencies.mean():6.1f}µs por vela")
+
+    # Alternativa batch: recalcular con ta sobre toda la historia en cada vela
+    repeats = 5
+    t0 = time.perf_counter()
+    for i in range(repeats):
+        generate_ohlcv_features(df.iloc[:n_history + i + 1].copy(), ALL_INDICATORS)
+    batch_us = (time.perf_counter() - t0) / repeats * 1e6
+    log.info(f"    recálculo ta ({n_history:,} velas): {batch_us:,.0f}µs por vela "
+             f"→ {batch_us / np.percentile(latencies, 50):,.0f}x más lento")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# Benchmark de la etapa de calidad (core/data/quality.py)
+#   python experiments/bench_quality.py [n_velas]
+import sys
+import os
+sys.path.insert(0, os.path.abspath("."))
+import time
+
+import numpy as np
+
+from core.data.models import CandleBatch, CANDLE_DTYPE
+from core.data.quality import clean_candles
+from utils.logger import log
+
+
+def make_batch(n: int) -> CandleBatch:
+    rng = np.random.default_rng(0)
+    data = np.empty(n, dtype=CANDLE_DTYPE)
+    data["timestamp"] = 1_704_067_200_000 + np.arange(n, dtype=np.int64) * 60_000
+    close = 2300 * np.exp(np.cumsum(rng.normal(0, 1e-3, n)))
+    data["open"] = np.roll(close, 1)
+    data["close"] = close
+    data["high"] = np.maximum(data["open"], close) * 1.0005
+    data["low"] = np.minimum(data["open"], close) * 0.9995
+    data["volume"] = rng.exponential(10, n)
+
+    # Ensuciamos ~0.1% de las filas: huecos, duplicados, spikes y volumen cero
+    k = max(n // 1000, 1)
+    data["volume"][rng.integers(0, n, k)] = 0
+    spikes = rng.integers(1, n - 1, k)
+    data["close"][spikes] *= 1.5
+    data["high"][spikes] = data["close"][spikes]
+    keep = np.ones(n, dtype=bool)
+    keep[rng.integers(0, n, k)] = False
+    data = np.concatenate([data[keep], data[rng.integers(0, n, k)]])
+    return CandleBatch(data)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000_000
+    batch = make_batch(n)
+    log.info(f"[cyan]⏱️ Etapa de calidad sobre {len(batch):,} velas[/cyan]")
+
+    for policy in ("flag", "drop", "ffill"):
+        t0 = time.perf_counter()
+        _, _, report = clean_candles(batch, "1m", policy=policy)
+        elapsed = time.perf_counter() - t0
+        log.info(f"    {policy:<6}: {elapsed:6.2f}s  ({len(batch) / elapsed / 1e6:5.1f} M velas/s)  "
+                 f"huecos={report.gaps} spikes={report.spikes} vol0={report.zero_volume}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# Benchmark de las features relacionales entre activos (core/features/relational/panel.py):
+# escalado en N símbolos para los N x N pares, contra un loop de pandas por par.
+#   python experiments/bench_relational_panel.py [n_filas]
+# Los bloques del kernel no se acumulan (a N=150, una sola estadística de
+# n x N x N ya pesa GBs); se mide el cómputo, no el armado de la salida.
+import sys
+import os
+sys.path.insert(0, os.path.abspath("."))
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.features.relational.panel import iter_pairwise_blocks
+from utils.logger import log
+
+SYMBOLS = [10, 25, 50, 100, 150]
+WINDOWS = [12, 288]          # 1 hora y 1 día en velas de 5m
+PANDAS_MAX_SYMBOLS = 25      # el loop por par de pandas ya tarda minutos más arriba
+
+
+def panel(n: int, n_symbols: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    market = rng.normal(0, 1e-3, (n, 1))
+    returns = market * rng.uniform(0.5, 1.5, n_symbols) + rng.normal(0, 1e-3, (n, n_symbols))
+    return 100 * np.exp(np.cumsum(returns, axis=0))
+
+
+def pandas_pairs(prices: np.ndarray):
+    log_p = pd.DataFrame(np.log(prices))
+    returns = log_p.diff()
+    for i in log_p.columns:
+        for j in log_p.columns:
+            spread = log_p[i] - log_p[j]
+            for window in WINDOWS:
+                ri, rj = returns[i].rolling(window), returns[j]
+                ri.corr(rj)
+                ri.cov(rj) / rj.rolling(window).var()
+                roll = spread.rolling(window)
+                (spread - roll.mean()) / roll.std()
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 8640   # 30 días de 5m
+    log.info(f"[cyan]⏱️ Pares rolling (corr, beta, spread, z-spread) x {len(WINDOWS)} ventanas, {n:,} filas[/cyan]")
+    for n_symbols in SYMBOLS:
+        prices = panel(n, n_symbols)
+        pairs = n_symbols * n_symbols
+        t0 = time.perf_counter()
+        for _ in iter_pairwise_blocks(prices, WINDOWS):
+            pass
+        t_kernel = time.perf_counter() - t0
+        line = (f"    N={n_symbols:4d} ({pairs:6,} pares): kernel {t_kernel:7.2f}s  "
+                f"{n * pairs / t_kernel / 1e6:6.1f} M par-filas/s")
+        if n_symbols <= PANDAS_MAX_SYMBOLS:
+            t0 = time.perf_counter()
+            pandas_pairs(prices)
+            t_pandas = time.perf_counter() - t0
+            line += f"  | pandas {t_pandas:7.2f}s → {t_pandas / t_kernel:.0f}x"
+        log.info(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,4 @@
 import yaml
-import pandas as pd
 from core.data.fetcher_factory import get_provider
 from core.data.models import MarketDataRequest
 from utils.config_loader import load_yaml
@@ -13,7 +12,7 @@ def main():
         symbol=md["symbol"],
         interval=md["interval"],
         start_date=md["start_date"],
-        end_date=md["end_date"],  # aún no usado, ccxt solo toma start
+        end_date=md["end_date"],
         provider=md["provider"],
     )
 
@@ -21,7 +20,7 @@ def main():
     candles = provider.get_historical_data(request)
 
     # Convertir a DataFrame para visualización o guardado
-    df = pd.DataFrame([c.__dict__ for c in candles])
+    df = candles.to_frame()
 
     print(df.head())
 
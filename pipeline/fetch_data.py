@@ -1,11 +1,12 @@
 # pipeline/fetch_data.py
 
+from core.data.cache import CandleCache
 from core.data.fetcher_factory import get_provider
 from core.data.models import MarketDataRequest
+from core.data.store import CandleStore, DEFAULT_STORE_ROOT
 from utils.config_loader import load_yaml
 from utils.logger import log 
 from pathlib import Path
-import pandas as pd
 
 
 def get_output_path(request: MarketDataRequest) -> Path:
@@ -28,13 +29,19 @@ def main():
         provider=md["provider"],
     )
 
-    provider = get_provider(request.provider)
     log.info(f"[cyan]Obteniendo datos de {request.symbol} desde {request.provider}...[/cyan]")
 
-    candles = provider.get_historical_data(request)
-    df = pd.DataFrame([c.__dict__ for c in candles])
-
-    log.info(f"[green]{len(df)} registros descargados.[/green]")
+    if md.get("save_to_store", True):
+        # La caché solo descarga los tramos que faltan y los mergea en el store
+        store = CandleStore(md.get("store_path", DEFAULT_STORE_ROOT))
+        candles = CandleCache(request.provider, store, base_interval=md.get("base_interval")).get(request)
+        log.info(f"[bold green]✅ Store actualizado en {store.series_dir(request.provider, request.symbol, request.interval)}[/bold green]")
+    else:
+        provider = get_provider(request.provider)
+        candles = provider.get_historical_data(request)
+    df = candles.to_frame()
+
+    log.info(f"[green]{len(df)} registros disponibles.[/green]")
     log.debug(df.head())
 
     if md.get("save_to_csv", False):
@@ -0,0 +1,61 @@
+# pipeline/migrate_csv_to_store.py
+#
+# Migra los CSV legados ({start}_to_{end}_{provider}.csv) al CandleStore Parquet.
+#   python pipeline/migrate_csv_to_store.py [carpeta_csv ...] [--store shared/store] [--delete]
+import sys
+import os
+sys.path.insert(0, os.path.abspath("."))
+import argparse
+from pathlib import Path
+
+import pandas as pd
+
+from core.data.coverage import CoverageIndex
+from core.data.models import CandleBatch
+from core.data.store import CandleStore, DEFAULT_STORE_ROOT
+from core.data.timeframes import interval_to_ms
+from utils.logger import log
+
+DEFAULT_SOURCES = ["shared/data", "core/features/shared/data"]
+
+
+def parse_csv_path(path: Path):
+    """<root>/<SYMBOL>/<interval>/<start>_to_<end>_<provider>.csv -> (symbol, interval, provider)"""
+    provider = path.stem.rsplit("_", 1)[-1]
+    interval = path.parent.name
+    symbol = path.parent.parent.name
+    return symbol, interval, provider
+
+
+def migrate(sources, store: CandleStore, delete: bool = False) -> int:
+    total = 0
+    for source in sources:
+        for csv_path in sorted(Path(source).glob("*/*/*_to_*_*.csv")):
+            symbol, interval, provider = parse_csv_path(csv_path)
+            batch = CandleBatch.from_frame(pd.read_csv(csv_path))
+            rows = store.write(provider, symbol, interval, batch)
+            if rows:
+                # Marcamos como cubierto solo lo que el CSV trae realmente
+                coverage = CoverageIndex(store, provider, symbol, interval)
+                coverage.add(int(batch.timestamps.min()), int(batch.timestamps.max()) + interval_to_ms(interval))
+                coverage.save()
+            total += rows
+            log.info(f"[green]📦 {csv_path} -> {store.series_dir(provider, symbol, interval)} ({rows} filas)[/green]")
+            if delete:
+                csv_path.unlink()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migra los CSV de velas al CandleStore Parquet")
+    parser.add_argument("sources", nargs="*", default=DEFAULT_SOURCES)
+    parser.add_argument("--store", default=DEFAULT_STORE_ROOT)
+    parser.add_argument("--delete", action="store_true", help="borra cada CSV después de migrarlo")
+    args = parser.parse_args()
+
+    total = migrate(args.sources, CandleStore(args.store), delete=args.delete)
+    log.info(f"[bold green]✅ Migración completa: {total} velas[/bold green]")
+
+
+if __name__ == "__main__":
+    main()
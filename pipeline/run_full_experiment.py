@@ -1,14 +1,14 @@
 import sys
 import os
 sys.path.insert(0, os.path.abspath("."))
-from core.data.fetcher_factory import get_provider
+from core.data.cache import CandleCache
 from core.data.models import MarketDataRequest
+from core.data.store import CandleStore, DEFAULT_STORE_ROOT
 from utils.config_loader import load_yaml
 from utils.logger import log
 
 from subprocess import run
 from pathlib import Path
-import pandas as pd
 
 
 def build_data_path(symbol: str, interval: str, start_date: str, end_date: str, provider: str) -> Path:
@@ -25,7 +25,8 @@ def build_output_path(symbol: str, interval: str) -> Path:
     return folder
 
 
-def fetch_data_if_needed(request: MarketDataRequest, save_to_csv: bool) -> Path:
+def fetch_data_if_needed(request: MarketDataRequest, save_to_csv: bool, store_path: str = DEFAULT_STORE_ROOT,
+                         base_interval: str = None) -> Path:
     path = build_data_path(
         symbol=request.symbol,
         interval=request.interval,
@@ -33,18 +34,13 @@ def fetch_data_if_needed(request: MarketDataRequest, save_to_csv: bool) -> Path:
         end_date=request.end_date,
         provider=request.provider
     )
-    if path.exists():
-        log.info(f"[yellow]🟡 Datos ya existen en {path}, se omite descarga.[/yellow]")
-        return path
-
-    log.info(f"[cyan]🔍 Datos no encontrados, descargando desde {request.provider}...[/cyan]")
-    provider = get_provider(request.provider)
-    candles = provider.get_historical_data(request)
-    df = pd.DataFrame([c.__dict__ for c in candles])
-
-    log.info(f"[green]⬇️  {len(df)} registros descargados.[/green]")
-    if save_to_csv:
-        df.to_csv(path, index=False)
+    # La caché calcula los tramos faltantes según el índice de cobertura y
+    # solo descarga esos; el resto se sirve desde el store local.
+    cache = CandleCache(request.provider, CandleStore(store_path), base_interval=base_interval)
+    candles = cache.get(request)
+
+    if save_to_csv and not path.exists():
+        candles.to_frame().to_csv(path, index=False)
         log.info(f"[bold green]✅ Guardado en {path}[/bold green]")
     return path
 
@@ -63,7 +59,12 @@ def main(config_path: str):
         provider=md["provider"],
     )
 
-    fetch_data_if_needed(request, save_to_csv=md.get("save_to_csv", True))
+    fetch_data_if_needed(
+        request,
+        save_to_csv=md.get("save_to_csv", True),
+        store_path=md.get("store_path", DEFAULT_STORE_ROOT),
+        base_interval=md.get("base_interval")
+    )
 
     output_path = build_output_path(request.symbol, request.interval)
     config["output_path"] = str(output_path)